@@ -0,0 +1,20 @@
+"""Shared setup for the scripts in ``benchmarks/``.
+
+Puts the repository root on ``sys.path`` and provides the same dummy
+settings as ``tests/conftest.py`` so ``schedule_app`` imports without real
+credentials.
+"""
+
+from __future__ import annotations
+
+import os
+import pathlib
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("GCP_PROJECT", "dummy-project")
+os.environ.setdefault("GOOGLE_CLIENT_ID", "dummy-client-id")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
@@ -0,0 +1,60 @@
+"""Microbenchmark for :mod:`schedule_app.services.metrics`.
+
+Measures the cost of recording a sample and compares a ``/api/health``
+request with and without the request-timing hooks::
+
+    python benchmarks/bench_metrics.py [--number N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+
+import _common  # noqa: F401 - sys.path and dummy settings
+
+from schedule_app import create_app  # noqa: E402
+from schedule_app.services.metrics import Registry  # noqa: E402
+
+
+def _bare_app():
+    app = create_app(testing=True)
+    # init_metrics のフックだけを外した比較用アプリ
+    hooks = {"start_request_timer", "observe_request_duration", "end_request_timer"}
+    for registry in (app.before_request_funcs, app.after_request_funcs, app.teardown_request_funcs):
+        registry[None] = [f for f in registry.get(None, []) if f.__name__ not in hooks]
+    return app
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000, help="iterations per case")
+    args = parser.parse_args(argv)
+
+    reg = Registry()
+    counter = reg.counter("bench_total", "Bench.", ("endpoint",))
+    hist = reg.histogram("bench_seconds", "Bench.", ("method", "endpoint", "status"))
+    primitives = [
+        ("counter.inc", lambda: counter.inc(endpoint="health")),
+        ("histogram.observe", lambda: hist.observe(0.012, method="GET", endpoint="health", status=200)),
+    ]
+    print(f"{'case':<22}{'ns/op':>10}")
+    for name, fn in primitives:
+        best = min(timeit.repeat(fn, number=args.number * 50, repeat=3))
+        print(f"{name:<22}{best / (args.number * 50) * 1e9:>10.0f}")
+
+    timed = create_app(testing=True).test_client()
+    bare = _bare_app().test_client()
+
+    print(f"\n{'request':<22}{'µs/op':>10}")
+    results = {}
+    for name, client in (("without hooks", bare), ("with hooks", timed)):
+        best = min(timeit.repeat(lambda: client.get("/api/health"), number=args.number, repeat=5))
+        results[name] = best / args.number * 1e6
+        print(f"{name:<22}{results[name]:>10.1f}")
+    overhead = results["with hooks"] - results["without hooks"]
+    print(f"{'overhead':<22}{overhead:>10.1f}  ({overhead / results['without hooks']:.1%})")
+
+
+if __name__ == "__main__":
+    main()
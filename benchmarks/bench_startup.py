@@ -0,0 +1,173 @@
+"""Cold-start benchmark for ``schedule_app``.
+
+Every sample runs in a fresh interpreter and the best of ``--repeat`` runs is
+kept for each metric:
+
+``import_ms``
+    Cumulative time of ``import schedule_app`` reported by
+    ``python -X importtime``.
+``first_response_ms``
+    From interpreter start-up to the first ``GET /api/health`` answered by a
+    test client of ``create_app()`` (package import included).
+``rss_mb``
+    Peak resident set size after that first response.
+
+``--save`` writes the results to ``benchmarks/baselines/startup.json``;
+``--check`` compares them with that file and exits non-zero when a metric
+exceeds its baseline by more than the tolerance in :data:`TOLERANCE`::
+
+    python benchmarks/bench_startup.py [--repeat N] [--save | --check]
+
+The baseline is machine-specific: re-record it with ``--repeat 5 --save`` on
+the reference machine, while it is otherwise idle, after an intended change.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+
+import _common
+
+BASELINE = _common.ROOT / "benchmarks" / "baselines" / "startup.json"
+
+# metric → (相対許容, 絶対許容)。baseline * (1 + rel) + abs を超えたら退行
+TOLERANCE = {
+    "import_ms": (0.5, 20.0),
+    "first_response_ms": (0.5, 150.0),
+    "rss_mb": (0.25, 10.0),
+}
+
+# パッケージの import だけでは読み込まれてはならないモジュール
+HEAVY_MODULES = ("flask", "werkzeug", "google_auth_oauthlib", "requests", "pytz")
+
+_IMPORT_PROBE = f"""
+import json, sys
+import schedule_app
+print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))
+schedule_app.create_app()
+"""
+
+_FIRST_RESPONSE_PROBE = """
+import json, resource, sys, time
+t0 = time.perf_counter()
+from schedule_app import create_app
+resp = create_app().test_client().get("/api/health")
+elapsed = (time.perf_counter() - t0) * 1e3
+assert resp.status_code == 200, resp.status_code
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+# Linux は KiB、macOS はバイト単位
+rss_mb = rss / (1 << 20) if sys.platform == "darwin" else rss / 1024
+print(json.dumps({"first_response_ms": elapsed, "rss_mb": rss_mb}))
+"""
+
+
+def _run(args: list[str]) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=_common.ROOT,
+        env=os.environ.copy(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def parse_importtime(stderr: str) -> dict[str, tuple[int, int]]:
+    """Return ``{module: (self_us, cumulative_us)}`` from ``-X importtime`` output."""
+    result = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if self_us.strip().isdigit():
+            result[name.strip()] = (int(self_us), int(cumulative_us))
+    return result
+
+
+def probe() -> dict:
+    """Return the metrics of one cold start, measured in new interpreters."""
+    proc = _run(["-X", "importtime", "-c", _IMPORT_PROBE])
+    imports = parse_importtime(proc.stderr)
+    sample = json.loads(_run(["-c", _FIRST_RESPONSE_PROBE]).stdout)
+    sample["import_ms"] = imports["schedule_app"][1] / 1e3
+    sample["heavy_modules"] = json.loads(proc.stdout)
+    # create_app() までに読み込まれ、自前の時間が大きいモジュール
+    by_self = sorted(imports.items(), key=lambda item: -item[1][0])
+    sample["slowest"] = [(name, self_us / 1e3) for name, (self_us, _cum) in by_self[:8]]
+    return sample
+
+
+def measure(repeat: int = 3) -> dict:
+    """Return the best value of every metric over ``repeat`` cold starts."""
+    samples = [probe() for _ in range(repeat)]
+    best = {metric: round(min(s[metric] for s in samples), 2) for metric in TOLERANCE}
+    return {
+        "python": platform.python_version(),
+        "platform": sys.platform,
+        "metrics": best,
+        "heavy_modules": samples[0]["heavy_modules"],
+        "slowest": samples[0]["slowest"],
+    }
+
+
+def regressions(result: dict, baseline: dict) -> list[str]:
+    """Return a message for every metric of ``result`` over its allowed limit."""
+    failures = []
+    for metric, (rel, abs_) in TOLERANCE.items():
+        base = baseline["metrics"].get(metric)
+        if base is None:
+            continue
+        limit = base * (1 + rel) + abs_
+        value = result["metrics"][metric]
+        if value > limit:
+            failures.append(f"{metric}: {value:.1f} > {limit:.1f} (baseline {base:.1f})")
+    return failures
+
+
+def load_baseline() -> dict:
+    with open(BASELINE, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="cold starts per metric")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--save", action="store_true", help=f"write the results to {BASELINE.name}")
+    mode.add_argument("--check", action="store_true", help=f"fail on a regression against {BASELINE.name}")
+    args = parser.parse_args(argv)
+
+    result = measure(args.repeat)
+    baseline = load_baseline() if args.check or BASELINE.exists() else None
+
+    print(f"{'metric':<20}{'best':>10}{'baseline':>10}")
+    for metric, value in result["metrics"].items():
+        base = baseline["metrics"].get(metric) if baseline else None
+        print(f"{metric:<20}{value:>10.1f}{'-' if base is None else f'{base:.1f}':>10}")
+    print(f"\nheavy modules after import: {', '.join(result['heavy_modules']) or '-'}")
+    print("slowest imports up to create_app() (self ms):")
+    for name, ms in result["slowest"]:
+        print(f"  {name:<40}{ms:>8.2f}")
+
+    if args.save:
+        BASELINE.parent.mkdir(parents=True, exist_ok=True)
+        with open(BASELINE, "w", encoding="utf-8") as fh:
+            json.dump({k: result[k] for k in ("python", "platform", "metrics")}, fh, indent=2)
+            fh.write("\n")
+        print(f"\nsaved {BASELINE.relative_to(_common.ROOT)}")
+    if args.check:
+        failures = regressions(result, baseline)
+        failures += [f"{m} is imported by schedule_app" for m in result["heavy_modules"]]
+        if failures:
+            print("\nregressed:", *failures, sep="\n  ")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Microbenchmark for :mod:`schedule_app.utils.timecodec`.
+
+Compares the shared codec with the hand-rolled parsing and formatting it
+replaced, on a workload shaped like a Calendar page (a few hundred events
+whose timestamps repeat across instances)::
+
+    python benchmarks/bench_timecodec.py [--number N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import _common  # noqa: F401 - sys.path and dummy settings
+
+from schedule_app.utils.timecodec import format_utc, parse_utc, to_utc  # noqa: E402
+
+UTC = timezone.utc
+
+
+def _legacy_parse(value: str) -> datetime:
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=UTC)
+    return dt.astimezone(UTC)
+
+
+def _legacy_to_utc(info: dict) -> datetime:
+    dt = datetime.fromisoformat(info["dateTime"].replace("Z", "+00:00"))
+    tz = ZoneInfo(info["timeZone"])
+    dt = dt.replace(tzinfo=tz) if dt.tzinfo is None else dt.astimezone(tz)
+    return dt.astimezone(UTC)
+
+
+def _legacy_format(dt: datetime) -> str:
+    return dt.astimezone(UTC).isoformat(timespec="seconds").replace("+00:00", "Z")
+
+
+def _workload(events: int = 300) -> tuple[list[str], list[dict], list[datetime]]:
+    base = datetime(2025, 1, 6, tzinfo=UTC)
+    # 繰り返し予定を想定し、開始時刻は 30 分刻みの 48 通りに偏らせる
+    starts = [base + timedelta(minutes=30 * (i % 48)) for i in range(events)]
+    strings = [s.isoformat().replace("+00:00", "Z") for s in starts]
+    infos = [
+        {"dateTime": s.astimezone(timezone(timedelta(hours=9))).replace(tzinfo=None).isoformat(), "timeZone": "Asia/Tokyo"}
+        for s in starts
+    ]
+    return strings, infos, starts
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=200, help="iterations per case")
+    args = parser.parse_args(argv)
+
+    strings, infos, values = _workload()
+    cases = [
+        ("parse Z", lambda: [_legacy_parse(s) for s in strings], lambda: [parse_utc(s) for s in strings]),
+        ("calendar to_utc", lambda: [_legacy_to_utc(i) for i in infos], lambda: [to_utc(i) for i in infos]),
+        (
+            "format",
+            lambda: [_legacy_format(v) for v in values],
+            lambda: [format_utc(v, timespec="seconds") for v in values],
+        ),
+    ]
+
+    print(f"{'case':<18}{'legacy µs':>12}{'codec µs':>12}{'speedup':>10}")
+    for name, legacy, codec in cases:
+        assert [str(x) for x in legacy()] == [str(x) for x in codec()], name
+        per_call = len(strings) * args.number / 1e6
+        old = min(timeit.repeat(legacy, number=args.number, repeat=3)) / per_call
+        new = min(timeit.repeat(codec, number=args.number, repeat=3)) / per_call
+        print(f"{name:<18}{old:>12.3f}{new:>12.3f}{old / new:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
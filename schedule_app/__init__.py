@@ -1,33 +1,61 @@
 """Minimal Flask application factory.
 
-This module avoids importing Flask at module import time when the package is
-used purely for utilities (e.g. during unit tests).  The heavy import occurs
-only inside :func:`create_app`.
+Importing the package is kept cheap: Flask, the API blueprints and the Google
+client are imported inside :func:`create_app`, the OAuth ``Flow`` class
+(``google_auth_oauthlib`` pulls in ``requests`` and ``cryptography``) when
+``/login`` or ``/callback`` first needs it, and the module-level ``app`` that
+``flask --app schedule_app`` and WSGI servers look up is only built on first
+access. CLI commands and unit tests that only need utilities therefore pay
+for none of it. ``benchmarks/bench_startup.py`` measures the import time.
 """
 
 from __future__ import annotations
 
 import os
-from werkzeug.exceptions import HTTPException
+import threading
+from typing import TYPE_CHECKING, Any
 
-from schedule_app.errors import InvalidBlockRow
-from schedule_app.exceptions import APIError
-from schedule_app.services.google_client import GoogleClient, SCOPES
+if TYPE_CHECKING:  # pragma: no cover
+    from flask import Flask
+    from google_auth_oauthlib.flow import Flow
 
-ERROR_TYPE_MAP = {
-    InvalidBlockRow: "invalid-block-row",
-}
+# WSGI environ key holding the request deadline's reset token
+_DEADLINE_TOKEN = "schedule_app.deadline_token"
 
-try:  # Flask may be absent in some test environments
-    from flask import Flask  # type: ignore
-except ModuleNotFoundError:  # pragma: no cover - optional dependency
-    Flask = None  # type: ignore
+_APP_LOCK = threading.Lock()
 
-try:
-    from google_auth_oauthlib.flow import Flow  # type: ignore
-    from flask import session, redirect, url_for, abort  # type: ignore
-except ModuleNotFoundError:  # pragma: no cover - optional dependency
-    Flow = None  # type: ignore
+
+def _flow_class() -> Any:
+    """Return ``google_auth_oauthlib``'s ``Flow`` (``None`` if not installed)."""
+    try:
+        return globals()["Flow"]
+    except KeyError:
+        pass
+    try:
+        from google_auth_oauthlib.flow import Flow  # type: ignore
+    except ModuleNotFoundError:  # pragma: no cover - optional dependency
+        Flow = None  # type: ignore
+    # 以後はモジュール属性として参照・差し替えできる (テストの patch 用)
+    globals()["Flow"] = Flow
+    return Flow
+
+
+def _default_app() -> Flask:
+    with _APP_LOCK:
+        app = globals().get("app")
+        if app is None:
+            app = globals()["app"] = create_app()
+        return app
+
+
+def __getattr__(name: str) -> Any:
+    # 重いモジュールは初回アクセス時まで読み込まない (PEP 562)
+    if name == "Flow":
+        return _flow_class()
+    # `flask --app schedule_app run` や WSGI サーバが参照するエントリ
+    if name == "app":
+        return _default_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def _get_setting(name: str) -> str | None:
@@ -40,7 +68,10 @@ def _get_setting(name: str) -> str | None:
 
 def _build_flow(*, redirect_uri: str) -> Flow:
     """Return an OAuth2 Flow object."""
-    if Flow is None:
+    from schedule_app.services.google_client import SCOPES
+
+    flow_cls = _flow_class()
+    if flow_cls is None:
         raise RuntimeError("google-auth-oauthlib is required")
 
     client_id = _get_setting("GOOGLE_CLIENT_ID")
@@ -57,7 +88,7 @@ def _build_flow(*, redirect_uri: str) -> Flow:
     }
 
     # OAuth2 認証スコープ
-    return Flow.from_client_config(
+    return flow_cls.from_client_config(
         client_config,
         scopes=SCOPES,
         redirect_uri=redirect_uri,
@@ -71,12 +102,25 @@ def create_app(*, testing: bool = False) -> Flask:  # type: ignore[name-defined]
     testing:
         When ``True``, enable Flask testing mode and disable CSRF protection.
     """
-    if Flask is None:  # pragma: no cover - import guard for tests
-        raise RuntimeError("Flask is required to create the application")
-
-    from flask import jsonify, render_template, request
+    try:
+        from flask import Flask, abort, jsonify, redirect, render_template, request, session, url_for
+    except ModuleNotFoundError as exc:  # pragma: no cover - import guard for tests
+        raise RuntimeError("Flask is required to create the application") from exc
+    from werkzeug.exceptions import HTTPException
+
+    from schedule_app.config import cfg
+    from schedule_app.errors import ERROR_TYPE_MAP
+    from schedule_app.exceptions import APIError
+    from schedule_app.services import deadline as request_deadline
+    from schedule_app.services.google_client import GoogleClient
 
     app = Flask(__name__)
+    # orjson があれば JSON のエンコード／デコードを差し替える
+    from schedule_app.utils import fastjson
+
+    if fastjson.available():
+        app.json = fastjson.OrjsonProvider(app)
+
     # SECRET_KEY environment variable overrides the development key
     app.secret_key = os.getenv("SECRET_KEY", "dev-secret-key")
 
@@ -86,7 +130,71 @@ def create_app(*, testing: bool = False) -> Flask:  # type: ignore[name-defined]
     if testing:
         app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
 
-    from schedule_app.api import calendar_bp, tasks_bp, schedule_bp
+    # リクエスト毎の処理期限。Google I/O はこの残り時間をタイムアウトに使う
+    app.config.setdefault("REQUEST_DEADLINE_MS", cfg.REQUEST_DEADLINE_MS)
+
+    # /api/schedule/stream: 連続した編集をまとめる待ち時間・心拍・接続の寿命
+    app.config.setdefault(
+        "SCHEDULE_STREAM_DEBOUNCE_MS", int(os.getenv("SCHEDULE_STREAM_DEBOUNCE_MS", "200"))
+    )
+    app.config.setdefault(
+        "SCHEDULE_STREAM_HEARTBEAT_SEC", float(os.getenv("SCHEDULE_STREAM_HEARTBEAT_SEC", "15"))
+    )
+    app.config.setdefault(
+        "SCHEDULE_STREAM_MAX_SEC", float(os.getenv("SCHEDULE_STREAM_MAX_SEC", "300"))
+    )
+
+    @app.before_request
+    def start_request_deadline():
+        budget_ms = app.config.get("REQUEST_DEADLINE_MS")
+        if budget_ms:
+            # g ではなくリクエスト単位で保持する（ストリーム中の別リクエストが
+            # 同じアプリコンテキストを共有しても取り違えない）
+            request.environ[_DEADLINE_TOKEN] = request_deadline.start(budget_ms / 1000)
+
+    @app.teardown_request
+    def end_request_deadline(_exc):
+        token = request.environ.pop(_DEADLINE_TOKEN, None)
+        if token is not None:
+            try:
+                request_deadline.reset(token)
+            except ValueError:  # pragma: no cover - token from another context
+                pass
+
+    # リクエスト → ストア → スケジューラ → Google I/O のトレース（オプトイン）
+    from schedule_app.services.tracing import init_tracing
+
+    app.config.setdefault("TRACE_EXPORTER", os.getenv("TRACE_EXPORTER", ""))
+    app.config.setdefault("TRACE_FILE", os.getenv("TRACE_FILE", "traces.jsonl"))
+    app.config.setdefault(
+        "TRACE_OTLP_ENDPOINT", os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+    )
+    app.config.setdefault("TRACE_SAMPLE_RATE", float(os.getenv("TRACE_SAMPLE_RATE", "0.1")))
+    init_tracing(app)
+
+    # エンドポイント毎のレイテンシ計測と /api/metrics
+    from schedule_app.services.metrics import init_metrics
+
+    init_metrics(app)
+
+    # 翌朝のコールドスタートを避けるバックグラウンド先読み（オプトイン）
+    app.config.setdefault("WARMER_ENABLED", os.getenv("WARMER_ENABLED", "0") == "1")
+    if app.config["WARMER_ENABLED"]:
+        from flask import session as flask_session
+
+        from schedule_app.services.warmer import get_warmer
+
+        warmer = get_warmer(create=True)
+        app.extensions["warmer"] = warmer
+        if not testing:
+            warmer.start()
+
+        @app.before_request
+        def remember_warm_user():
+            if flask_session.get("credentials"):
+                warmer.remember(flask_session)
+
+    from schedule_app.api import calendar_bp, tasks_bp, schedule_bp, refresh_bp
     from schedule_app.api.blocks import init_blocks_api
 
     if calendar_bp is not None:
@@ -98,14 +206,38 @@ def create_app(*, testing: bool = False) -> Flask:  # type: ignore[name-defined]
     if schedule_bp is not None:
         app.register_blueprint(schedule_bp)
 
+    if refresh_bp is not None:
+        app.register_blueprint(refresh_bp)
+
     # blocks API
     init_blocks_api(app)
 
+    # レスポンス圧縮と静的ファイルの事前圧縮
+    from schedule_app.compression import init_compression
+
+    app.config.setdefault("COMPRESS_MIN_BYTES", int(os.getenv("COMPRESS_MIN_BYTES", "1024")))
+    app.config.setdefault("COMPRESS_LEVEL", int(os.getenv("COMPRESS_LEVEL", "6")))
+    init_compression(app)
+
     # ヘルスチェック用エンドポイント
     @app.get("/api/health")
     def health():
         return jsonify(status="ok")
 
+    # レディネス: ウォーマーの先読み状況を返す
+    @app.get("/api/ready")
+    def ready():
+        from schedule_app.services.warmer import status as warmer_status
+
+        return jsonify(status="ready", warmer=warmer_status())
+
+    # キャッシュ統計 (ヒット率・エントリ数・概算バイト数)
+    @app.get("/api/cache/stats")
+    def cache_stats_view():
+        from schedule_app.services.cache import cache_stats
+
+        return jsonify(cache_stats())
+
     # 暫定トップページ
     @app.get("/")
     def index():
@@ -166,11 +298,27 @@ def create_app(*, testing: bool = False) -> Flask:  # type: ignore[name-defined]
             "detail": exc.description,
             "instance": request.path,
         }
+        if getattr(exc, "errors", None):
+            payload["errors"] = exc.errors
         response = jsonify(payload)
         response.status_code = status
         response.mimetype = "application/problem+json"
         return response
 
+    @app.errorhandler(request_deadline.DeadlineExceeded)
+    def handle_deadline_exceeded(exc: APIError):
+        payload = {
+            "type": "https://schedule.app/errors/gateway-timeout",
+            "title": "Gateway Timeout",
+            "status": 504,
+            "detail": getattr(exc, "description", str(exc)),
+            "instance": request.path,
+        }
+        response = jsonify(payload)
+        response.status_code = 504
+        response.mimetype = "application/problem+json"
+        return response
+
     @app.errorhandler(APIError)
     def handle_api_error(exc: APIError):
         payload = {
@@ -186,10 +334,3 @@ def create_app(*, testing: bool = False) -> Flask:  # type: ignore[name-defined]
         return response
 
     return app
-
-
-# `flask --app schedule_app run` で自動検出されるエントリ
-if Flask is not None:  # pragma: no cover - optional in test env
-    app = create_app()
-else:  # keep a stub for type checkers
-    app = None  # type: ignore
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 # Explicitly export optional blueprints
-__all__ = ["calendar_bp", "tasks_bp", "schedule_bp"]
+__all__ = ["calendar_bp", "tasks_bp", "schedule_bp", "refresh_bp"]
 
 try:
     from .calendar import calendar_bp  # type: ignore
@@ -19,3 +19,8 @@ try:
     from .schedule import bp as schedule_bp  # type: ignore
 except Exception:  # pragma: no cover - optional blueprint
     schedule_bp = None  # type: ignore
+
+try:
+    from .refresh import bp as refresh_bp  # type: ignore
+except Exception:  # pragma: no cover - optional blueprint
+    refresh_bp = None  # type: ignore
@@ -13,8 +13,8 @@ Block CRUD REST API  (/api/blocks …)
 from __future__ import annotations
 
 import uuid
-from dataclasses import asdict
-from datetime import datetime, timezone
+from dataclasses import fields
+from datetime import datetime
 from typing import Any
 
 from flask import Blueprint, Response, jsonify, request, url_for
@@ -24,10 +24,16 @@ from schedule_app.models import Block
 from schedule_app.config import cfg
 from schedule_app.services.google_client import (
     fetch_blocks_from_sheet,
+    fetch_blocks_from_sheet_async,
     invalidate_blocks_cache,
 )
 from schedule_app.exceptions import APIError
 from schedule_app.errors import InvalidBlockRow
+from schedule_app.services import changes, schedule
+from schedule_app.services.metrics import log_metric
+from schedule_app.services.store_diff import apply_diff
+from schedule_app.utils.fastjson import array_response, fragment_cache, fragment_response
+from schedule_app.utils.timecodec import format_utc, parse_utc
 
 __all__ = ["blocks_bp", "init_blocks_api"]
 
@@ -45,15 +51,13 @@ def _parse_iso8601(value: str, field: str) -> datetime:
     """`2025-01-01T00:00:00Z` → aware UTC datetime."""
     if not isinstance(value, str):
         raise BadRequest(problem_detail(f"{field} must be string"))
-    if value.endswith("Z"):
-        value = value[:-1] + "+00:00"
     try:
-        dt = datetime.fromisoformat(value)
+        dt = parse_utc(value)
     except ValueError as exc:
         raise BadRequest(problem_detail(f"{field} is not RFC 3339")) from exc
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
-    return dt.astimezone(timezone.utc)
+    if dt is None:
+        raise BadRequest(problem_detail(f"{field} is not RFC 3339"))
+    return dt
 
 
 def problem_detail(detail: str, status: int = 422) -> dict[str, Any]:
@@ -66,20 +70,40 @@ def problem_detail(detail: str, status: int = 422) -> dict[str, Any]:
     }
 
 
+_BLOCK_FIELDS = tuple(f.name for f in fields(Block))
+
+
 def _block_to_dict(block: Block) -> dict[str, Any]:
     """Dataclass → JSON 変換。datetime は RFC 3339(秒, Z) に整形。"""
-    d = asdict(block)
-    d["start_utc"] = block.start_utc.replace(tzinfo=timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
-    d["end_utc"] = block.end_utc.replace(tzinfo=timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+    d = {name: getattr(block, name) for name in _BLOCK_FIELDS}
+    if d.get("rrule") is None:
+        d.pop("rrule", None)
+    d["start_utc"] = format_utc(block.start_utc, timespec="seconds")
+    d["end_utc"] = format_utc(block.end_utc, timespec="seconds")
     return d
 
 
+# Block は不変なのでエンコード済み JSON を値ごとに使い回す
+_block_json = fragment_cache(_block_to_dict)
+
+
 def _load_sheet_blocks() -> list[Block]:
     """Return blocks fetched from Google Sheets."""
 
     try:
         return fetch_blocks_from_sheet(cfg.BLOCKS_SHEET_ID, cfg.SHEETS_BLOCK_RANGE)
-    except InvalidBlockRow:
+    except (InvalidBlockRow, APIError):
+        raise
+    except Exception as exc:  # pragma: no cover - network errors
+        raise APIError(str(exc))
+
+
+async def _load_sheet_blocks_async() -> list[Block]:
+    """Awaitable :func:`_load_sheet_blocks`."""
+
+    try:
+        return await fetch_blocks_from_sheet_async(cfg.BLOCKS_SHEET_ID, cfg.SHEETS_BLOCK_RANGE)
+    except (InvalidBlockRow, APIError):
         raise
     except Exception as exc:  # pragma: no cover - network errors
         raise APIError(str(exc))
@@ -94,7 +118,7 @@ blocks_bp = Blueprint("blocks", __name__, url_prefix="/api/blocks")
 @blocks_bp.get("")
 def list_blocks() -> Response:
     """GET /api/blocks → 200 Block[]"""
-    return jsonify([_block_to_dict(b) for b in BLOCKS.values()])
+    return array_response(_block_json(b) for b in BLOCKS.values())
 
 
 @blocks_bp.get("/import")
@@ -102,18 +126,40 @@ def import_blocks() -> Response:
     """GET /api/blocks/import → 200 Block[]"""
 
     blocks = _load_sheet_blocks()
-    return jsonify([_block_to_dict(b) for b in blocks])
+    return array_response(_block_json(b) for b in blocks)
 
 
 @blocks_bp.post("/import")
 def import_blocks_post() -> Response:
-    """POST /api/blocks/import → 204"""
+    """POST /api/blocks/import → 204
+
+    差分のみ反映し、変更があった日の busy map だけを破棄する。
+    """
 
     blocks = _load_sheet_blocks()
 
-    BLOCKS.clear()
-    for b in blocks:
-        BLOCKS[b.id] = b
+    return _apply_import(blocks)
+
+
+async def import_blocks_async() -> Response:
+    """Async :func:`import_blocks` used by :mod:`schedule_app.asgi`."""
+
+    blocks = await _load_sheet_blocks_async()
+    return array_response(_block_json(b) for b in blocks)
+
+
+async def import_blocks_post_async() -> tuple[str, int]:
+    """Async :func:`import_blocks_post` used by :mod:`schedule_app.asgi`."""
+
+    blocks = await _load_sheet_blocks_async()
+    return _apply_import(blocks)
+
+
+def _apply_import(blocks: list[Block]) -> tuple[str, int]:
+    diff = apply_diff(BLOCKS, blocks)
+    if diff:
+        changes.publish("blocks", days=schedule.span_days(diff.touched))
+    log_metric("blocks_import", diff.counts())
 
     return ("", 204)
 
@@ -134,8 +180,9 @@ def create_block() -> tuple[Response, int, dict[str, str]]:
     block_id = uuid.uuid4().hex
     block = Block(id=block_id, start_utc=start, end_utc=end)
     BLOCKS[block_id] = block
+    changes.publish("blocks", days=schedule.span_days([block]))
     headers = {"Location": url_for("blocks.get_block", id_=block_id, _external=True)}
-    return jsonify(_block_to_dict(block)), 201, headers
+    return fragment_response(_block_json(block)), 201, headers
 
 
 @blocks_bp.get("/<id_>")
@@ -143,7 +190,7 @@ def get_block(id_: str) -> Response:
     """取得（テスト用）"""
     if id_ not in BLOCKS:
         raise NotFound()
-    return jsonify(_block_to_dict(BLOCKS[id_]))
+    return fragment_response(_block_json(BLOCKS[id_]))
 
 
 @blocks_bp.put("/<id_>")
@@ -162,8 +209,10 @@ def update_block(id_: str) -> Response:
     if start >= end:
         return jsonify(problem_detail("start_utc must be earlier than end_utc")), 422
 
+    old = BLOCKS[id_]
     BLOCKS[id_] = Block(id=id_, start_utc=start, end_utc=end)
-    return jsonify(_block_to_dict(BLOCKS[id_]))
+    changes.publish("blocks", days=schedule.span_days([old, BLOCKS[id_]]))
+    return fragment_response(_block_json(BLOCKS[id_]))
 
 
 @blocks_bp.delete("/<id_>")
@@ -171,7 +220,8 @@ def delete_block(id_: str) -> Response:
     """DELETE /api/blocks/<id> → 204 / 404"""
     if id_ not in BLOCKS:
         raise NotFound()
-    del BLOCKS[id_]
+    old = BLOCKS.pop(id_)
+    changes.publish("blocks", days=schedule.span_days([old]))
     return ("", 204)
 
 
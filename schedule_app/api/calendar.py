@@ -1,10 +1,8 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+from datetime import datetime
 from http import HTTPStatus
-from dataclasses import asdict
-from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
-import pytz
+from dataclasses import fields
 
 from schedule_app.models import Event
 from schedule_app.config import cfg
@@ -15,7 +13,15 @@ from schedule_app.services.google_client import (
     GoogleClient,
     APIError,
     GoogleAPIUnauthorized,
+    load_day_events,
+    load_day_events_async,
+    stale_day_events,
 )
+from schedule_app.services import changes, schedule
+from schedule_app.services.deadline import DeadlineExceeded
+from schedule_app.services.resilience import CircuitOpenError
+from schedule_app.utils.fastjson import array_response, fragment_cache
+from schedule_app.utils.timecodec import format_utc, localize
 
 
 bp = Blueprint("calendar_bp", __name__)
@@ -25,27 +31,6 @@ calendar_bp = bp
 EVENTS: dict[str, Event] = {}
 
 
-def to_utc(info: dict) -> datetime:
-    """Return a UTC datetime from a Google Calendar event time dict."""
-    raw = info.get("dateTime") or info.get("date")
-    if not raw:
-        return datetime.min.replace(tzinfo=timezone.utc)
-    dt = datetime.fromisoformat(raw.replace("Z", "+00:00"))
-    tzid = info.get("timeZone")
-    if tzid:
-        try:
-            tz = ZoneInfo(tzid)
-        except ZoneInfoNotFoundError:
-            tz = pytz.timezone(tzid)
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=tz)
-        else:
-            dt = dt.astimezone(tz)
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
-    return dt.astimezone(timezone.utc)
-
-
 def _problem(status: int, code: str, detail: str):
     """Return a JSON Problem response."""
     try:
@@ -66,21 +51,22 @@ def _problem(status: int, code: str, detail: str):
     return response
 
 
+_EVENT_FIELDS = tuple(f.name for f in fields(Event))
+
+
 def _event_to_dict(ev: Event) -> dict:
-    d = asdict(ev)
-    d["start_utc"] = ev.start_utc.isoformat().replace("+00:00", "Z")
-    d["end_utc"] = ev.end_utc.isoformat().replace("+00:00", "Z")
+    d = {name: getattr(ev, name) for name in _EVENT_FIELDS}
+    d["start_utc"] = format_utc(ev.start_utc)
+    d["end_utc"] = format_utc(ev.end_utc)
     return d
 
 
-@bp.get("/api/calendar")
-def get_calendar():
-    """Return events for the given day.
+# Event は不変なのでエンコード済み JSON を値ごとに使い回す
+_event_json = fragment_cache(_event_to_dict)
 
-    The required ``date`` query parameter accepts an ISO 8601 datetime or
-    ``YYYY-MM-DD``. Naive values are interpreted using ``cfg.TIMEZONE`` before
-    being normalized to UTC.
-    """
+
+def _calendar_args():
+    """Return ``(date, credentials)`` of the request or a Problem response."""
     date_str = request.args.get("date")
     if not date_str:
         return _problem(400, "bad-request", "missing date")
@@ -91,26 +77,90 @@ def get_calendar():
         return _problem(400, "bad-request", "invalid date")
 
     if date_obj.tzinfo is None:
-        date_obj = pytz.timezone(cfg.TIMEZONE).localize(date_obj)
+        date_obj = localize(date_obj, cfg.TIMEZONE)
 
     creds = session.get("credentials")
     if not creds:
         return _problem(401, "unauthorized", "missing credentials")
+    return date_obj, creds
+
+
+def _google_error(e: APIError, date_obj: datetime, token: str | None):
+    """Return the response for a failed Google load of ``date_obj``."""
+    if isinstance(e, GoogleAPIUnauthorized):
+        return _problem(401, "unauthorized", str(e))
+    if isinstance(e, (CircuitOpenError, DeadlineExceeded)):
+        # Google への呼び出しを遮断中・期限切れの場合は、このユーザーの前回の予定で応答する
+        cached = stale_day_events(token, date_obj)
+        if cached is None:
+            if isinstance(e, DeadlineExceeded):
+                return _problem(504, "gateway-timeout", f"google_api: {e}")
+            return _problem(502, "bad-gateway", f"google_api: {e}")
+        response = array_response(_event_json(ev) for ev in cached)
+        response.headers["X-Cache"] = "stale"
+        return response, 200
+    return _problem(502, "bad-gateway", f"google_api: {e}")
+
+
+def remember_events(events: list[Event]) -> bool:
+    """Store ``events`` in ``EVENTS``; return ``True`` if anything changed."""
+    touched: list[Event] = []
+    for ev in events:
+        old = EVENTS.get(ev.id)
+        if old != ev:
+            EVENTS[ev.id] = ev
+            touched.append(ev)
+            if old is not None:
+                touched.append(old)
+    if touched:
+        changes.publish("events", days=schedule.span_days(touched))
+    return bool(touched)
+
+
+def _events_response(google_events: list[Event]):
+    remember_events(google_events)
+    return array_response(_event_json(e) for e in google_events), 200
+
+
+@bp.get("/api/calendar")
+def get_calendar():
+    """Return events for the given day.
+
+    The required ``date`` query parameter accepts an ISO 8601 datetime or
+    ``YYYY-MM-DD``. Naive values are interpreted using ``cfg.TIMEZONE`` before
+    being normalized to UTC.
+    """
+    args = _calendar_args()
+    if not isinstance(args, tuple):
+        return args
+    date_obj, creds = args
 
     client = GoogleClient(creds)
     try:
-        google_events = client.list_events(date=date_obj)
-    except GoogleAPIUnauthorized as e:
-        return _problem(401, "unauthorized", str(e))
+        # ウォーマーや直前のリクエストが取得済みならキャッシュから返す
+        google_events = load_day_events(client, date_obj, token=creds.get("access_token"))
     except APIError as e:
-        return _problem(502, "bad-gateway", f"google_api: {e}")
+        return _google_error(e, date_obj, creds.get("access_token"))
+
+    return _events_response(google_events)
+
 
-    day_events: list[Event] = []
-    for ev in google_events:
-        EVENTS[ev.id] = ev
-        day_events.append(ev)
+async def get_calendar_async():
+    """Async :func:`get_calendar` used by :mod:`schedule_app.asgi`."""
+    args = _calendar_args()
+    if not isinstance(args, tuple):
+        return args
+    date_obj, creds = args
+
+    client = GoogleClient(creds)
+    try:
+        google_events = await load_day_events_async(
+            client, date_obj, token=creds.get("access_token")
+        )
+    except APIError as e:
+        return _google_error(e, date_obj, creds.get("access_token"))
 
-    return jsonify([_event_to_dict(e) for e in day_events]), 200
+    return _events_response(google_events)
 
 
-__all__ = ["calendar_bp"]
+__all__ = ["calendar_bp", "remember_events"]
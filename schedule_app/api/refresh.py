@@ -0,0 +1,215 @@
+"""
+Concurrent refresh API  (/api/refresh …)
+
+Calendar / Tasks シート / Blocks シートの 3 ソースを同時に取得し、
+すべて成功した場合のみ各ストアへまとめて反映する。
+"""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http import HTTPStatus
+from typing import Any, Callable
+
+from flask import Blueprint, jsonify, request, session
+
+from schedule_app.api.blocks import BLOCKS
+from schedule_app.api.calendar import remember_events
+from schedule_app.api.tasks import TASKS
+from schedule_app.config import cfg
+from schedule_app.errors import InvalidBlockRow
+from schedule_app.services import changes, schedule
+from schedule_app.services.deadline import DeadlineExceeded
+from schedule_app.services.google_client import (
+    GoogleAPIUnauthorized,
+    GoogleClient,
+    fetch_blocks_from_sheet,
+    store_day_events,
+)
+from schedule_app.services.sheets_tasks import (
+    InvalidSheetRowError,
+    fetch_tasks_and_blocks,
+    fetch_tasks_from_sheet,
+)
+from schedule_app.services.store_diff import apply_diff
+from schedule_app.utils.timecodec import get_zone, localize
+
+bp = Blueprint("refresh", __name__, url_prefix="/api/refresh")
+refresh_bp = bp
+
+__all__ = ["bp", "refresh_bp"]
+
+# 3 ソース分のワーカーを常駐させ、リクエスト毎のスレッド生成を避ける
+_EXECUTOR = ThreadPoolExecutor(max_workers=3, thread_name_prefix="refresh")
+
+# ストアへの反映を直列化する
+_APPLY_LOCK = threading.Lock()
+
+
+# ---------------------------------------------------------------------------
+# 内部ユーティリティ
+# ---------------------------------------------------------------------------
+
+
+def _problem(status: int, code: str, detail: str, **extra: Any):
+    """Return a Problem Details response with optional extension members."""
+    payload = {
+        "type": f"https://schedule.app/errors/{code}",
+        "title": HTTPStatus(status).phrase,
+        "status": status,
+        "detail": detail,
+        "instance": request.path,
+    }
+    payload.update(extra)
+    response = jsonify(payload)
+    response.status_code = status
+    response.mimetype = "application/problem+json"
+    return response
+
+
+def _timed(fn: Callable[[], Any]) -> tuple[Any, Exception | None, float]:
+    """Run ``fn`` and return ``(result, error, elapsed_ms)``."""
+    started = time.perf_counter()
+    try:
+        result = fn()
+    except Exception as exc:  # noqa: BLE001 - reported per source
+        return None, exc, (time.perf_counter() - started) * 1000
+    return result, None, (time.perf_counter() - started) * 1000
+
+
+def _classify(errors: dict[str, Exception]) -> tuple[int, str]:
+    """Map per-source failures to a single HTTP status and error code."""
+    excs = list(errors.values())
+    if any(
+        isinstance(e, GoogleAPIUnauthorized)
+        or (isinstance(e, RuntimeError) and str(e) == "missing credentials")
+        for e in excs
+    ):
+        return 401, "unauthorized"
+    if any(isinstance(e, (InvalidSheetRowError, InvalidBlockRow)) for e in excs):
+        return 422, "invalid-field"
+    if any(isinstance(e, DeadlineExceeded) for e in excs):
+        return 504, "gateway-timeout"
+    return 502, "bad-gateway"
+
+
+def _error_detail(exc: Exception) -> str:
+    return getattr(exc, "description", None) or str(exc) or type(exc).__name__
+
+
+# ---------------------------------------------------------------------------
+# ルーティング
+# ---------------------------------------------------------------------------
+
+
+@bp.post("")
+def refresh_all():
+    """POST /api/refresh?date= → 200 combined status / 4xx・502 Problem.
+
+    Calendar, the tasks sheet and the blocks sheet are fetched in parallel so
+    the wall-clock time is bounded by the slowest source. Results are applied
+    to ``EVENTS``, ``TASKS`` and ``BLOCKS`` only when every source succeeded.
+    """
+    date_str = request.args.get("date")
+    if not date_str:
+        return _problem(400, "bad-request", "missing date")
+
+    try:
+        date_obj = datetime.fromisoformat(date_str)
+    except ValueError:
+        return _problem(400, "bad-request", "invalid date")
+
+    if date_obj.tzinfo is None:
+        date_obj = localize(date_obj, cfg.TIMEZONE)
+
+    creds = session.get("credentials")
+    if not creds:
+        return _problem(401, "unauthorized", "missing credentials")
+
+    # Flask の session はリクエストコンテキスト外で参照できないため複製して渡す
+    session_copy = dict(session)
+    client = GoogleClient(creds)
+
+    jobs: dict[str, Callable[[], Any]] = {
+        "calendar": lambda: client.list_events(date=date_obj),
+    }
+    batched = bool(cfg.SHEETS_TASKS_SSID) and cfg.SHEETS_TASKS_SSID == cfg.BLOCKS_SHEET_ID
+    if batched:
+        # 同一スプレッドシートなら batchGet 1 回で両レンジを取得する
+        jobs["sheets"] = lambda: fetch_tasks_and_blocks(session_copy, force=True)
+    else:
+        jobs["tasks"] = lambda: fetch_tasks_from_sheet(session_copy, force=True)
+        jobs["blocks"] = lambda: fetch_blocks_from_sheet(
+            cfg.BLOCKS_SHEET_ID, cfg.SHEETS_BLOCK_RANGE, force=True
+        )
+
+    started = time.perf_counter()
+    # リクエストの処理期限をワーカースレッドへ引き継ぐ
+    futures = {
+        name: _EXECUTOR.submit(contextvars.copy_context().run, _timed, fn)
+        for name, fn in jobs.items()
+    }
+
+    results: dict[str, list] = {}
+    errors: dict[str, Exception] = {}
+    sources: dict[str, dict[str, Any]] = {}
+    for name, fut in futures.items():
+        result, exc, elapsed_ms = fut.result()
+        if name == "sheets":
+            names = ("tasks", "blocks")
+            parts = result if exc is None else (None, None)
+        else:
+            names = (name,)
+            parts = (result,)
+        for part_name, part in zip(names, parts):
+            status: dict[str, Any] = {"elapsed_ms": round(elapsed_ms, 1)}
+            if name == "sheets":
+                status["batched"] = True
+            if exc is None:
+                results[part_name] = part or []
+                status.update(status="ok", count=len(results[part_name]))
+            else:
+                errors[part_name] = exc
+                status.update(status="error", detail=_error_detail(exc))
+                if getattr(exc, "errors", None):
+                    status["errors"] = exc.errors
+            sources[part_name] = status
+    total_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    if errors:
+        code_status, code = _classify(errors)
+        failed = ", ".join(sorted(errors))
+        return _problem(
+            code_status,
+            code,
+            f"refresh failed: {failed}",
+            sources=sources,
+            elapsed_ms=total_ms,
+        )
+
+    with _APPLY_LOCK:
+        store_day_events(creds.get("access_token"), date_obj, results["calendar"])
+        remember_events(results["calendar"])
+
+        task_diff = apply_diff(TASKS, results["tasks"])
+        if task_diff:
+            changes.publish("tasks")
+        sources["tasks"].update(task_diff.counts())
+
+        block_diff = apply_diff(BLOCKS, results["blocks"])
+        if block_diff:
+            changes.publish("blocks", days=schedule.span_days(block_diff.touched))
+        sources["blocks"].update(block_diff.counts())
+
+    local_day = date_obj.astimezone(get_zone(cfg.TIMEZONE)).date()
+    return jsonify(
+        {
+            "date": local_day.isoformat(),
+            "elapsed_ms": total_ms,
+            "sources": sources,
+        }
+    )
@@ -1,17 +1,19 @@
 from __future__ import annotations
 
-from datetime import datetime
-from flask import Blueprint, abort, jsonify, request
+from datetime import date, datetime
+from flask import Blueprint, Response, abort, current_app, jsonify, request, session, stream_with_context
 
-from schedule_app.services import schedule
+from schedule_app.config import cfg
+from schedule_app.services import schedule, schedule_format, schedule_stream
+from schedule_app.services.google_client import GoogleAPIUnauthorized, GoogleClient
+from schedule_app.utils.timecodec import parse_utc
 
 bp = Blueprint("schedule", __name__, url_prefix="/api/schedule")
 schedule_bp = bp
 
 
-@bp.route("/generate", methods=["POST", "GET"])
-def generate_schedule():  # noqa: D401 - simple endpoint
-    """Generate a schedule grid for the specified date."""
+def _target_day() -> date:
+    """Return the local day named by the ``date`` query parameter."""
     date_str = request.args.get("date")
     if not date_str:
         abort(400, description="date parameter required")
@@ -20,13 +22,10 @@ def generate_schedule():  # noqa: D401 - simple endpoint
 
     if "T" in date_str:
         try:
-            dt = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
+            dt = parse_utc(date_str, zone=cfg.TIMEZONE)
         except ValueError:
             abort(400, description="invalid date format")
 
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=tz)
-
         local_dt = dt.astimezone(tz)
     else:
         try:
@@ -36,17 +35,87 @@ def generate_schedule():  # noqa: D401 - simple endpoint
 
         local_dt = local_dt.replace(tzinfo=tz)
 
-    local_day = local_dt.date()
+    return local_dt.date()
+
 
+def _algo() -> str:
     algo = request.args.get("algo", "greedy")
     if algo not in {"greedy", "compact"}:
         abort(400, description="invalid algo")
+    return algo
+
+
+@bp.route("/generate", methods=["POST", "GET"])
+def generate_schedule():  # noqa: D401 - simple endpoint
+    """Generate a schedule grid for the specified date."""
+    local_day = _target_day()
+    algo = _algo()
+
+    source = request.args.get("source", "events")
+    if source not in {"events", "freebusy"}:
+        abort(400, description="invalid source")
+
+    fmt = request.args.get("format")
+    if fmt is None:
+        # Accept で選択（*/* や application/json は従来の slots 形式）
+        best = request.accept_mimetypes.best_match(list(schedule_format.MEDIA_TYPES.values()))
+        fmt = next((k for k, v in schedule_format.MEDIA_TYPES.items() if v == best), "slots")
+    elif fmt not in schedule_format.FORMATS:
+        abort(400, description="invalid format")
+
+    busy = None
+    if source == "freebusy":
+        # 予定本文は不要なので freeBusy の busy 区間だけを取得する
+        creds = session.get("credentials")
+        if not creds:
+            abort(401, description="missing credentials")
+        start_utc, end_utc = schedule.day_window(local_day)
+        try:
+            busy = GoogleClient(creds).free_busy(
+                time_min=start_utc, time_max=end_utc, calendar_ids=cfg.CALENDAR_IDS
+            )
+        except GoogleAPIUnauthorized:
+            abort(401, description="unauthorized")
+
+    # debug=1 でフェーズ毎の所要時間と探索量をレスポンスに含める
+    debug = request.args.get("debug", "0") not in {"", "0", "false"}
 
-    result = schedule.generate_schedule(target_day=local_day, algo=algo)
+    result = schedule.generate_schedule(target_day=local_day, algo=algo, busy=busy, fmt=fmt, debug=debug)
     result.pop("algo", None)
     result["date"] = local_day.isoformat()
 
-    return jsonify(result)
+    response = jsonify(result)
+    response.mimetype = schedule_format.MEDIA_TYPES[fmt]
+    response.vary.add("Accept")
+    return response
+
+
+@bp.get("/stream")
+def stream_schedule():
+    """Push the schedule of ``date`` as Server-Sent Events.
+
+    See :mod:`schedule_app.services.schedule_stream` for the events sent.
+    """
+    local_day = _target_day()
+    algo = _algo()
+    fmt = request.args.get("format", "slots")
+    if fmt not in schedule_format.FORMATS:
+        abort(400, description="invalid format")
+
+    config = current_app.config
+    events = schedule_stream.schedule_events(
+        local_day,
+        algo=algo,
+        fmt=fmt,
+        debounce=config["SCHEDULE_STREAM_DEBOUNCE_MS"] / 1000,
+        heartbeat=config["SCHEDULE_STREAM_HEARTBEAT_SEC"],
+        lifetime=config["SCHEDULE_STREAM_MAX_SEC"],
+    )
+    response = Response(stream_with_context(events), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    # nginx などのプロキシにバッファリングさせない
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
 
 
 __all__ = ["bp", "schedule_bp"]
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import asdict
-from datetime import timezone
+from dataclasses import fields
 from typing import Any
 import uuid
 
@@ -10,12 +9,19 @@ from http import HTTPStatus
 
 from schedule_app.models import Task
 from schedule_app.exceptions import APIError
+from schedule_app.services import changes
+from schedule_app.services.google_client import GoogleAPIUnauthorized
+from schedule_app.services.metrics import log_metric
 from schedule_app.services.sheets_tasks import (
     fetch_tasks_from_sheet,
+    fetch_tasks_from_sheet_async,
     InvalidSheetRowError,
     invalidate_cache,
 )
-from schedule_app.utils.validation import _parse_dt, _validate_durations
+from schedule_app.services.store_diff import apply_diff
+from schedule_app.utils.fastjson import array_response, fragment_cache, fragment_response
+from schedule_app.utils.timecodec import format_utc, parse_utc
+from schedule_app.utils.validation import _validate_durations
 
 bp = Blueprint("tasks", __name__, url_prefix="/api/tasks")
 
@@ -29,18 +35,18 @@ __all__ = ["bp", "TASKS"]
 # ---------------------------------------------------------------------------
 
 
-def _problem(status: int, code: str, detail: str) -> None:
+def _problem(status: int, code: str, detail: str, **extra: Any) -> None:
     """Problem Details 仕様フォーマットで abort する。"""
     title = "Validation failed" if status == 422 else HTTPStatus(status).phrase
-    response = jsonify(
-        {
-            "type": f"https://schedule.app/errors/{code}",
-            "title": title,
-            "status": status,
-            "detail": detail,
-            "instance": request.path,
-        }
-    )
+    payload = {
+        "type": f"https://schedule.app/errors/{code}",
+        "title": title,
+        "status": status,
+        "detail": detail,
+        "instance": request.path,
+    }
+    payload.update(extra)
+    response = jsonify(payload)
     response.status_code = status
     response.mimetype = "application/problem+json"
     abort(response)
@@ -67,7 +73,7 @@ def _task_from_json(data: dict[str, Any]) -> Task:
         _problem(422, "invalid-field", "Priority must be 'A' or 'B'.")
 
     try:
-        es_utc = _parse_dt(data.get("earliest_start_utc"))
+        es_utc = parse_utc(data.get("earliest_start_utc"))
     except ValueError:
         _problem(422, "invalid-field", "Invalid datetime format.")
 
@@ -82,28 +88,48 @@ def _task_from_json(data: dict[str, Any]) -> Task:
     )
 
 
+_TASK_FIELDS = tuple(f.name for f in fields(Task))
+
+
 def _serialize(task: Task) -> dict[str, Any]:
-    d = asdict(task)
+    # asdict の再帰コピーは不要（フィールドはすべてスカラー）
+    d = {name: getattr(task, name) for name in _TASK_FIELDS}
     if d["earliest_start_utc"] is not None:
-        d["earliest_start_utc"] = (
-            d["earliest_start_utc"].astimezone(timezone.utc)
-            .isoformat(timespec="seconds")
-            .replace("+00:00", "Z")
-        )
+        d["earliest_start_utc"] = format_utc(d["earliest_start_utc"], timespec="seconds")
     return d
 
 
+# Task は不変なのでエンコード済み JSON を値ごとに使い回す
+_task_json = fragment_cache(_serialize)
+
+
 def _load_sheet_tasks(*, force: bool = False) -> list[Task]:
     try:
         return fetch_tasks_from_sheet(session, force=force)
-    except InvalidSheetRowError as exc:
-        _problem(422, "invalid-field", str(exc))
-    except RuntimeError as exc:
+    except Exception as exc:
+        _sheet_error(exc)
+
+
+async def _load_sheet_tasks_async(*, force: bool = False) -> list[Task]:
+    try:
+        return await fetch_tasks_from_sheet_async(session, force=force)
+    except Exception as exc:
+        _sheet_error(exc)
+
+
+def _sheet_error(exc: Exception) -> None:
+    """Translate a failed sheet load into an HTTP or API error."""
+    if isinstance(exc, InvalidSheetRowError):
+        _problem(422, "invalid-field", str(exc), errors=exc.errors)
+    if isinstance(exc, RuntimeError):
         if str(exc) == "missing credentials":
             _problem(401, "unauthorized", "missing credentials")
         _problem(422, "invalid-field", str(exc))
-    except Exception as exc:  # pragma: no cover - network errors
-        raise APIError(str(exc))
+    if isinstance(exc, GoogleAPIUnauthorized):
+        _problem(401, "unauthorized", str(exc))
+    if isinstance(exc, APIError):
+        raise exc
+    raise APIError(str(exc)) from exc  # pragma: no cover - network errors
 
 
 # ---------------------------------------------------------------------------
@@ -114,7 +140,7 @@ def _load_sheet_tasks(*, force: bool = False) -> list[Task]:
 @bp.get("")
 def list_tasks():
     """すべての Task を返す."""
-    return jsonify([_serialize(t) for t in TASKS.values()])
+    return array_response(_task_json(t) for t in TASKS.values())
 
 
 @bp.post("")
@@ -123,8 +149,9 @@ def create_task():
     data["id"] = str(uuid.uuid4())
     task = _task_from_json(data)
     TASKS[task.id] = task
+    changes.publish("tasks")
 
-    resp = jsonify(_serialize(task))
+    resp = fragment_response(_task_json(task))
     resp.status_code = 201
     resp.headers["Location"] = url_for(".get_task", id=task.id)
     return resp
@@ -135,7 +162,7 @@ def get_task(id: str):
     task = TASKS.get(id)
     if task is None:
         _problem(404, "not-found", "Task not found.")
-    return jsonify(_serialize(task))
+    return fragment_response(_task_json(task))
 
 
 @bp.put("/<id>")
@@ -147,7 +174,8 @@ def update_task(id: str):
     data["id"] = id  # ID の整合性を保証
     task = _task_from_json(data)
     TASKS[id] = task
-    return jsonify(_serialize(task))
+    changes.publish("tasks")
+    return fragment_response(_task_json(task))
 
 
 @bp.delete("/<id>")
@@ -155,6 +183,7 @@ def delete_task(id: str):
     if id not in TASKS:
         _problem(404, "not-found", "Task not found.")
     del TASKS[id]
+    changes.publish("tasks")
     return ("", 204)
 
 
@@ -163,17 +192,38 @@ def import_tasks():
     """Fetch tasks from Google Sheets and return them."""
     tasks = _load_sheet_tasks()
 
-    return jsonify([_serialize(t) for t in tasks])
+    return array_response(_task_json(t) for t in tasks)
 
 
 @bp.post("/import")
 def import_tasks_post():
-    """Fetch tasks from Google Sheets and replace existing tasks."""
+    """Fetch tasks from Google Sheets and replace existing tasks.
+
+    Only added, changed and removed tasks are touched; tasks do not feed the
+    per-day busy maps, so no schedule cache needs to be dropped.
+    """
     tasks = _load_sheet_tasks(force=True)
+    return _apply_import(tasks)
+
+
+async def import_tasks_async():
+    """Async :func:`import_tasks` used by :mod:`schedule_app.asgi`."""
+    tasks = await _load_sheet_tasks_async()
+
+    return array_response(_task_json(t) for t in tasks)
+
+
+async def import_tasks_post_async():
+    """Async :func:`import_tasks_post` used by :mod:`schedule_app.asgi`."""
+    tasks = await _load_sheet_tasks_async(force=True)
+    return _apply_import(tasks)
+
 
-    TASKS.clear()
-    for t in tasks:
-        TASKS[t.id] = t
+def _apply_import(tasks: list[Task]) -> tuple[str, int]:
+    diff = apply_diff(TASKS, tasks)
+    if diff:
+        changes.publish("tasks")
+    log_metric("tasks_import", diff.counts())
 
     return ("", 204)
 
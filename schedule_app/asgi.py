@@ -0,0 +1,226 @@
+"""ASGI entry point serving the Google-bound endpoints asynchronously.
+
+Run with any ASGI server, e.g. ``uvicorn schedule_app.asgi:app``.
+
+Requests to the endpoints in :data:`ASYNC_ENDPOINTS` (``/api/calendar``,
+``/api/tasks/import`` and ``/api/blocks/import``) run their async view on the
+event loop. Their Google calls run in worker threads via
+:func:`asyncio.to_thread` and are awaited, so one worker process keeps many
+Google round trips in flight without holding a WSGI thread for each. The
+view still runs inside a normal Flask request context: ``before_request`` /
+``after_request`` hooks, the session and the error handlers all apply.
+
+Every other request is handed to the Flask WSGI application on a small
+thread pool (``ASGI_THREADS``, default ``8``), so the rest of the API behaves
+exactly as under a WSGI server. Streamed bodies (``/api/schedule/stream``)
+are forwarded chunk by chunk; note that each open stream keeps one pool
+thread while it waits for changes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+from typing import Any, Awaitable, Callable, Iterable, Iterator
+
+from werkzeug.exceptions import HTTPException
+
+__all__ = ["ASYNC_ENDPOINTS", "AsgiApp", "app", "create_asgi_app"]
+
+# Flask endpoint → async view ("module:function")
+ASYNC_ENDPOINTS = {
+    "calendar_bp.get_calendar": "schedule_app.api.calendar:get_calendar_async",
+    "tasks.import_tasks": "schedule_app.api.tasks:import_tasks_async",
+    "tasks.import_tasks_post": "schedule_app.api.tasks:import_tasks_post_async",
+    "blocks.import_blocks": "schedule_app.api.blocks:import_blocks_async",
+    "blocks.import_blocks_post": "schedule_app.api.blocks:import_blocks_post_async",
+}
+
+Scope = dict[str, Any]
+Receive = Callable[[], Awaitable[dict[str, Any]]]
+Send = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+def _resolve(target: str) -> Callable[..., Awaitable[Any]]:
+    module, name = target.split(":")
+    return getattr(import_module(module), name)
+
+
+def _environ(scope: Scope, body: bytes) -> dict[str, Any]:
+    """Return a WSGI environ for the HTTP ``scope`` and request ``body``."""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ: dict[str, Any] = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode().decode("latin-1"),
+        "PATH_INFO": scope["path"].encode().decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for raw_name, raw_value in scope.get("headers", []):
+        name = raw_name.decode("latin-1").upper().replace("-", "_")
+        value = raw_value.decode("latin-1")
+        if name == "CONTENT_LENGTH":
+            continue
+        key = name if name == "CONTENT_TYPE" else f"HTTP_{name}"
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def _read_body(receive: Receive) -> bytes:
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    return bytes(body)
+
+
+class AsgiApp:
+    """ASGI application wrapping a Flask app created by ``create_app``."""
+
+    def __init__(self, flask_app: Any, *, threads: int = 8) -> None:
+        self.flask_app = flask_app
+        self.async_views = {ep: _resolve(target) for ep, target in ASYNC_ENDPOINTS.items()}
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="wsgi")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            raise RuntimeError(f"unsupported ASGI scope: {scope['type']}")
+
+        environ = _environ(scope, await _read_body(receive))
+        try:
+            endpoint, args = self.flask_app.url_map.bind_to_environ(environ).match()
+        except HTTPException:
+            endpoint, args = None, {}
+        view = self.async_views.get(endpoint)
+        if view is None:
+            await self._call_wsgi(environ, receive, send)
+            return
+        status, headers, body = await self._call_async(view, args, environ)
+        await _start(send, status, headers)
+        await send({"type": "http.response.body", "body": body})
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self._executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _call_async(
+        self, view: Callable[..., Awaitable[Any]], args: dict[str, Any], environ: dict[str, Any]
+    ) -> tuple[int, list[tuple[str, str]], bytes]:
+        """Run ``view`` like ``Flask.full_dispatch_request`` but awaiting it."""
+        flask_app = self.flask_app
+        with flask_app.request_context(environ):
+            try:
+                try:
+                    rv = flask_app.preprocess_request()
+                    if rv is None:
+                        rv = await view(**args)
+                except Exception as exc:
+                    rv = flask_app.handle_user_exception(exc)
+                response = flask_app.finalize_request(rv)
+            except Exception as exc:
+                response = flask_app.handle_exception(exc)
+            return response.status_code, list(response.headers.items()), response.get_data()
+
+    async def _call_wsgi(self, environ: dict[str, Any], receive: Receive, send: Send) -> None:
+        """Run the WSGI app on the pool and forward each body chunk as it comes.
+
+        Streamed responses (``/api/schedule/stream``) therefore reach the
+        client as they are produced; a client disconnect stops the iteration
+        after the chunk in progress. Every step of one response runs in the
+        same :class:`contextvars.Context`, whichever pool thread picks it up,
+        so ``stream_with_context`` generators keep their request context.
+        """
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        started: list[Any] = []
+        written: list[bytes] = []
+
+        def start_response(status: str, headers: list[tuple[str, str]], exc_info: Any = None):
+            started[:] = [status, headers]
+            return written.append
+
+        def first_chunk() -> tuple[Any, Iterator[bytes], bytes | None]:
+            result = self.flask_app.wsgi_app(environ, start_response)
+            chunks = iter(result)
+            return result, chunks, next(chunks, None)
+
+        result, chunks, chunk = await loop.run_in_executor(self._executor, ctx.run, first_chunk)
+        disconnected = asyncio.ensure_future(_wait_disconnect(receive))
+        try:
+            status, headers = started
+            await _start(send, int(status.split(" ", 1)[0]), headers)
+            while chunk is not None and not disconnected.done():
+                data = b"".join(written) + chunk
+                written.clear()
+                if data:
+                    await send({"type": "http.response.body", "body": data, "more_body": True})
+                chunk = await loop.run_in_executor(self._executor, ctx.run, next, chunks, None)
+            await send({"type": "http.response.body", "body": b"".join(written)})
+        finally:
+            disconnected.cancel()
+            close = getattr(result, "close", None)
+            if close is not None:
+                await loop.run_in_executor(self._executor, ctx.run, close)
+
+
+async def _start(send: Send, status: int, headers: Iterable[tuple[str, str]]) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers],
+        }
+    )
+
+
+async def _wait_disconnect(receive: Receive) -> None:
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+def create_asgi_app(flask_app: Any = None, *, threads: int | None = None) -> AsgiApp:
+    """Return an :class:`AsgiApp` for ``flask_app`` (a new app by default)."""
+    if flask_app is None:
+        from schedule_app import create_app
+
+        flask_app = create_app()
+    if threads is None:
+        threads = int(os.getenv("ASGI_THREADS", "8"))
+    return AsgiApp(flask_app, threads=threads)
+
+
+# `uvicorn schedule_app.asgi:app` のエントリ（WSGI 用に作られたアプリを共有する）
+from schedule_app import app as _flask_app  # noqa: E402
+
+app = create_asgi_app(_flask_app) if _flask_app is not None else None
@@ -0,0 +1,188 @@
+"""Response compression and precompressed static assets.
+
+:func:`init_compression` is called from ``create_app`` and installs two
+pieces:
+
+* an ``after_request`` hook that gzip/brotli-compresses text-like responses
+  (HTML, CSS, JavaScript, JSON) of at least ``COMPRESS_MIN_BYTES`` bytes,
+  choosing the encoding from ``Accept-Encoding``;
+* a replacement ``static`` view serving bodies compressed once at startup.
+  Each file gets a content hash; ``asset_url()`` (a template global) appends
+  it as ``?v=<hash>`` and such versioned URLs are cached for a year as
+  ``immutable``. Unversioned URLs are revalidated through the ``ETag``.
+
+Brotli is used only when the optional :mod:`brotli` package is importable;
+otherwise gzip is the only encoding offered.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+import os
+from dataclasses import dataclass, field
+from typing import Any
+
+from flask import Flask, Response, abort, request
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+__all__ = [
+    "StaticAsset",
+    "choose_encoding",
+    "compress",
+    "compressible",
+    "init_compression",
+    "load_static_assets",
+]
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# 圧縮しても縮まない／ストリームを壊すものは除外する
+_TEXT_TYPES = {
+    "application/json",
+    "application/javascript",
+    "application/problem+json",
+    "application/xml",
+    "image/svg+xml",
+}
+
+
+def compressible(mimetype: str | None) -> bool:
+    """Return ``True`` if responses of ``mimetype`` are worth compressing."""
+    if not mimetype or mimetype == "text/event-stream":
+        return False
+    return mimetype.startswith("text/") or mimetype in _TEXT_TYPES or mimetype.endswith("+json")
+
+
+def choose_encoding(accept: Any, available: tuple[str, ...] | None = None) -> str | None:
+    """Return the preferred content coding from ``accept`` or ``None``.
+
+    ``accept`` is ``request.accept_encodings``. Ties (including a bare
+    ``*``) favour brotli over gzip; ``q=0`` excludes an encoding.
+    """
+    if available is None:
+        available = ("br", "gzip") if brotli is not None else ("gzip",)
+    best, best_q = None, 0.0
+    for coding in available:
+        q = accept[coding]
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(data: bytes, encoding: str, level: int = 6) -> bytes:
+    """Return ``data`` compressed with ``encoding`` (``"gzip"`` or ``"br"``)."""
+    if encoding == "br":
+        return brotli.compress(data, quality=min(max(level, 0), 11))
+    # mtime=0 で同じ入力からは常に同じバイト列になる
+    return gzip.compress(data, compresslevel=min(max(level, 1), 9), mtime=0)
+
+
+@dataclass(frozen=True)
+class StaticAsset:
+    """A static file with its content hash and precompressed bodies."""
+
+    path: str
+    mimetype: str
+    digest: str
+    bodies: dict[str, bytes] = field(default_factory=dict)
+
+
+def load_static_assets(folder: str, *, min_bytes: int = 1024, level: int = 9) -> dict[str, StaticAsset]:
+    """Return ``{relative path: StaticAsset}`` for every file under ``folder``.
+
+    Files of at least ``min_bytes`` bytes with a compressible type also get
+    gzip (and brotli) bodies, kept only when they are actually smaller.
+    """
+    assets: dict[str, StaticAsset] = {}
+    if not os.path.isdir(folder):
+        return assets
+    for root, _dirs, files in os.walk(folder):
+        for name in files:
+            path = os.path.join(root, name)
+            rel = os.path.relpath(path, folder).replace(os.sep, "/")
+            with open(path, "rb") as fh:
+                data = fh.read()
+            mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            bodies = {"identity": data}
+            if len(data) >= min_bytes and compressible(mimetype):
+                for coding in ("br", "gzip") if brotli is not None else ("gzip",):
+                    packed = compress(data, coding, level)
+                    if len(packed) < len(data):
+                        bodies[coding] = packed
+            digest = hashlib.sha256(data).hexdigest()[:12]
+            assets[rel] = StaticAsset(rel, mimetype, digest, bodies)
+    return assets
+
+
+def _compress_response(response: Response, *, min_bytes: int, level: int) -> Response:
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or response.status_code < 200
+        or response.status_code in (204, 304)
+        or "Content-Encoding" in response.headers
+        or not compressible(response.mimetype)
+    ):
+        return response
+    response.vary.add("Accept-Encoding")
+    data = response.get_data()
+    if len(data) < min_bytes:
+        return response
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+    response.set_data(compress(data, encoding, level))
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def init_compression(app: Flask) -> None:
+    """Install response compression and the precompressed static view."""
+    min_bytes = int(app.config["COMPRESS_MIN_BYTES"])
+    level = int(app.config["COMPRESS_LEVEL"])
+
+    @app.after_request
+    def compress_response(response: Response) -> Response:
+        return _compress_response(response, min_bytes=min_bytes, level=level)
+
+    if not app.has_static_folder:  # pragma: no cover - always present here
+        return
+
+    # 起動時に一度だけハッシュ計算と圧縮を済ませる
+    assets = load_static_assets(app.static_folder, min_bytes=min_bytes)
+    app.extensions["static_assets"] = assets
+
+    def asset_url(filename: str) -> str:
+        asset = assets.get(filename)
+        url = f"{app.static_url_path}/{filename}"
+        return f"{url}?v={asset.digest}" if asset else url
+
+    app.add_template_global(asset_url, "asset_url")
+
+    def static(filename: str) -> Response:
+        asset = assets.get(filename)
+        if asset is None:
+            abort(404)
+        encoding = choose_encoding(
+            request.accept_encodings, tuple(c for c in ("br", "gzip") if c in asset.bodies)
+        ) or "identity"
+        response = app.response_class(asset.bodies[encoding], mimetype=asset.mimetype)
+        if encoding != "identity":
+            response.headers["Content-Encoding"] = encoding
+        if len(asset.bodies) > 1:
+            response.vary.add("Accept-Encoding")
+        # 圧縮形式ごとに別の表現なので弱くない ETag を分ける
+        response.set_etag(asset.digest if encoding == "identity" else f"{asset.digest}-{encoding}")
+        if request.args.get("v") == asset.digest:
+            response.headers["Cache-Control"] = IMMUTABLE
+        else:
+            response.headers["Cache-Control"] = "no-cache"
+        return response.make_conditional(request)
+
+    app.view_functions["static"] = static
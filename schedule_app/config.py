@@ -49,9 +49,52 @@ class _Config:
     SHEETS_TASKS_SSID: str | None = os.getenv("SHEETS_TASKS_SSID")
     SHEETS_TASKS_RANGE: str = os.getenv("SHEETS_TASKS_RANGE", "Tasks!A:F")
     SHEETS_CACHE_SEC: int = int(os.getenv("SHEETS_CACHE_SEC", "300"))
+    # 期限切れ後も古い値を返しつつ裏で再取得する秒数 (stale-while-revalidate)
+    SHEETS_STALE_SEC: int = int(os.getenv("SHEETS_STALE_SEC", "300"))
+    # Google 障害時に古い値で応答し続ける秒数 (stale-if-error)
+    SHEETS_STALE_IF_ERROR_SEC: int = int(os.getenv("SHEETS_STALE_IF_ERROR_SEC", "3600"))
+    # キャッシュ上限（エントリ数 / 概算バイト数）。超過分は LRU で破棄
+    SHEETS_CACHE_MAX_ENTRIES: int = int(os.getenv("SHEETS_CACHE_MAX_ENTRIES", "64"))
+    SHEETS_CACHE_MAX_BYTES: int = int(os.getenv("SHEETS_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
     BLOCKS_SHEET_ID: str | None = os.getenv("BLOCKS_SHEET_ID")
     SHEETS_BLOCK_RANGE: str = os.getenv("SHEETS_BLOCK_RANGE", "Blocks!A2:C")
 
+    # --- Google Calendar ---
+    # 予定を取得するカレンダー ID（カンマ区切り）。先頭ほど重複排除で優先される
+    CALENDAR_IDS: tuple[str, ...] = tuple(
+        c.strip() for c in os.getenv("CALENDAR_IDS", "primary").split(",") if c.strip()
+    ) or ("primary",)
+    # 複数カレンダーを同時取得するワーカー数の上限
+    CALENDAR_FETCH_WORKERS: int = int(os.getenv("CALENDAR_FETCH_WORKERS", "4"))
+    # 日毎の予定キャッシュ（秒）。/api/calendar とウォーマーが共有する
+    CALENDAR_CACHE_SEC: int = int(os.getenv("CALENDAR_CACHE_SEC", "60"))
+    # Google が使えない（遮断中・期限切れ）間、そのユーザーの前回の予定を返してよい期間（秒）
+    CALENDAR_STALE_IF_ERROR_SEC: int = int(os.getenv("CALENDAR_STALE_IF_ERROR_SEC", "3600"))
+    # 繰り返し予定をマスターだけ取得し RRULE をローカルで展開する（python-dateutil が必要）
+    CALENDAR_EXPAND_LOCALLY: bool = os.getenv("CALENDAR_EXPAND_LOCALLY", "0") == "1"
+
+    # --- Background warmer ---
+    # 指定時刻 (TIMEZONE, HH:MM カンマ区切り) に当日〜WARMER_DAYS_AHEAD 日先のデータを先読みする
+    WARMER_ENABLED: bool = os.getenv("WARMER_ENABLED", "0") == "1"
+    WARMER_TIMES: tuple[str, ...] = tuple(
+        t.strip() for t in os.getenv("WARMER_TIMES", "06:00").split(",") if t.strip()
+    )
+    WARMER_DAYS_AHEAD: int = int(os.getenv("WARMER_DAYS_AHEAD", "1"))
+    # ユーザー間で空ける間隔（Google へのバースト抑制）
+    WARMER_PAUSE_MS: int = int(os.getenv("WARMER_PAUSE_MS", "200"))
+
+    # --- Request deadline ---
+    # 1 リクエストの処理時間上限。Google 呼び出しのタイムアウトはこの残り時間から決まる
+    REQUEST_DEADLINE_MS: int = int(os.getenv("REQUEST_DEADLINE_MS", "3000"))
+
+    # --- Google API resilience ---
+    GOOGLE_HTTP_TIMEOUT_SEC: float = float(os.getenv("GOOGLE_HTTP_TIMEOUT_SEC", "10"))
+    GOOGLE_RETRY_ATTEMPTS: int = int(os.getenv("GOOGLE_RETRY_ATTEMPTS", "3"))
+    GOOGLE_RETRY_BASE_MS: int = int(os.getenv("GOOGLE_RETRY_BASE_MS", "100"))
+    GOOGLE_RETRY_MAX_MS: int = int(os.getenv("GOOGLE_RETRY_MAX_MS", "2000"))
+    GOOGLE_BREAKER_FAILURES: int = int(os.getenv("GOOGLE_BREAKER_FAILURES", "5"))
+    GOOGLE_BREAKER_RESET_SEC: float = float(os.getenv("GOOGLE_BREAKER_RESET_SEC", "30"))
+
     # 追加があった場合はここへ…
 
     # ---- パス系（自動計算） ----
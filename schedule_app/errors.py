@@ -4,10 +4,24 @@ from werkzeug.exceptions import HTTPException
 
 
 class InvalidBlockRow(HTTPException):
-    """Raised when a block row contains invalid data."""
+    """Raised when a block row contains invalid data.
+
+    ``errors`` lists every invalid cell of a sheet import as
+    ``{"row", "field", "detail"}`` dictionaries.
+    """
 
     code = 422
     description = "Block row validation failed"
 
+    def __init__(self, description: str | None = None, *, errors: list[dict] | None = None) -> None:
+        super().__init__(description)
+        self.errors = errors or []
+
+
+# 例外クラス → Problem Details の type に使うエラーコード
+ERROR_TYPE_MAP = {
+    InvalidBlockRow: "invalid-block-row",
+}
+
 
-__all__ = ["InvalidBlockRow"]
+__all__ = ["ERROR_TYPE_MAP", "InvalidBlockRow"]
@@ -29,9 +29,14 @@ class Task:
 
 @dataclass(slots=True, frozen=True)
 class Block:
-    """User-defined busy period with an optional label."""
+    """User-defined busy period with an optional label.
+
+    ``rrule`` is an optional iCalendar recurrence rule (e.g.
+    ``FREQ=WEEKLY;BYDAY=MO,WE``); the block then repeats from ``start_utc``.
+    """
 
     id: str
     start_utc: datetime
     end_utc: datetime
     title: str | None = None
+    rrule: str | None = None
@@ -0,0 +1,540 @@
+"""Caching helpers shared by the Google Sheets loaders.
+
+:class:`TTLCache` is a keyed, size-bounded in-memory cache with TTL expiry,
+LRU eviction and the stale-while-revalidate / stale-if-error policy used for
+Google data. Every instance registers itself so :func:`cache_stats` can report
+on all of them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait as futures_wait
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Hashable
+
+from schedule_app.services import tracing
+
+__all__ = ["ParseMemo", "SingleFlight", "TTLCache", "approx_size", "cache_stats", "payload_digest"]
+
+# バックグラウンド再検証を流す共有プール。キーごとにスレッドを立てない
+REFRESH_WORKERS = 4
+
+_REFRESH_EXECUTOR: ThreadPoolExecutor | None = None
+_REFRESH_EXECUTOR_LOCK = threading.Lock()
+
+
+def _refresh_executor() -> ThreadPoolExecutor:
+    global _REFRESH_EXECUTOR
+    with _REFRESH_EXECUTOR_LOCK:
+        if _REFRESH_EXECUTOR is None:
+            _REFRESH_EXECUTOR = ThreadPoolExecutor(
+                max_workers=REFRESH_WORKERS, thread_name_prefix="singleflight"
+            )
+        return _REFRESH_EXECUTOR
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into a single execution.
+
+    The first caller for a key (the *leader*) runs the function; callers that
+    arrive while it is in flight wait for and share its result or exception.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Future] = {}
+
+    def _claim(self, key: Hashable) -> tuple[Future, bool]:
+        with self._lock:
+            fut = self._calls.get(key)
+            if fut is not None:
+                return fut, False
+            fut = Future()
+            self._calls[key] = fut
+            return fut, True
+
+    def _run(self, key: Hashable, fut: Future, fn: Callable[[], Any]) -> None:
+        try:
+            result = fn()
+        except BaseException as exc:  # noqa: BLE001 - handed to the waiters
+            with self._lock:
+                self._calls.pop(key, None)
+            fut.set_exception(exc)
+        else:
+            with self._lock:
+                self._calls.pop(key, None)
+            fut.set_result(result)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run ``fn`` for ``key`` unless already in flight and return its result."""
+        fut, leader = self._claim(key)
+        if leader:
+            self._run(key, fut, fn)
+        return fut.result()
+
+    def do_async(self, key: Hashable, fn: Callable[[], Any]) -> Future:
+        """Start ``fn`` for ``key`` in the background unless already in flight.
+
+        Calls run on a small shared pool of :data:`REFRESH_WORKERS` threads;
+        further keys queue until a worker is free.
+        """
+        fut, leader = self._claim(key)
+        if leader:
+            _refresh_executor().submit(self._run, key, fut, fn)
+        return fut
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Return ``True`` while a call for ``key`` is running."""
+        with self._lock:
+            return key in self._calls
+
+    def wait(self, key: Hashable, timeout: float | None = None) -> None:
+        """Block until the call for ``key`` (if any) has finished."""
+        with self._lock:
+            fut = self._calls.get(key)
+        if fut is not None:
+            futures_wait([fut], timeout=timeout)
+
+
+def approx_size(value: Any) -> int:
+    """Return an approximate deep size of ``value`` in bytes.
+
+    Lists, tuples, dicts and ``__slots__`` dataclasses are walked one level per
+    container; leaves are measured with :func:`sys.getsizeof`.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(approx_size(v) for v in value)
+    if isinstance(value, dict):
+        return size + sum(approx_size(k) + approx_size(v) for k, v in value.items())
+    slots = getattr(type(value), "__slots__", None)
+    if slots and not isinstance(value, (str, bytes)):
+        return size + sum(
+            sys.getsizeof(getattr(value, name, None))
+            for name in slots
+            if name != "__weakref__"
+        )
+    return size
+
+
+@dataclass(slots=True)
+class _Entry:
+    value: Any
+    expires_at: float
+    size: int
+    # hold() で延ばした stale 期限。窓の設定より短くはしない
+    held_until: float = 0.0
+
+
+_REGISTRY: dict[str, "TTLCache"] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def _no_stale() -> tuple[float, float, float]:
+    return 300.0, 0.0, 0.0
+
+
+class TTLCache:
+    """Keyed TTL cache with LRU eviction, size accounting and SWR loading.
+
+    Parameters
+    ----------
+    name:
+        Name reported by :func:`cache_stats`.
+    maxsize:
+        Maximum number of entries kept.
+    max_bytes:
+        Optional upper bound on the summed :func:`approx_size` of all values.
+    windows:
+        Callable returning ``(ttl, stale, stale_if_error)`` seconds. It is
+        evaluated on every access so configuration reloads take effect.
+    sizeof:
+        Function used to account for the size of each cached value.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        maxsize: int = 128,
+        max_bytes: int | None = None,
+        windows: Callable[[], tuple[float, float, float]] = _no_stale,
+        sizeof: Callable[[Any], int] = approx_size,
+    ) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._windows = windows
+        self._sizeof = sizeof
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._generation = 0
+        self._flight = SingleFlight()
+        self._tasks: dict[Hashable, asyncio.Task] = {}
+        self._counters = dict.fromkeys(
+            ("hits", "misses", "stale_hits", "stale_errors", "loads", "load_errors", "evictions"),
+            0,
+        )
+        with _REGISTRY_LOCK:
+            _REGISTRY[name] = self
+
+    # ------------------------------------------------------------------
+    # basic mapping operations
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def _lookup(self, key: Hashable) -> _Entry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the fresh value for ``key`` or ``default``."""
+        entry = self._lookup(key)
+        if entry is None or time.time() >= entry.expires_at:
+            return default
+        return entry.value
+
+    def get_stale(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value for ``key`` within its *stale_if_error* window.
+
+        For callers that handle a failed load themselves and want to answer
+        with the last good value; ``default`` when there is none.
+        """
+        entry = self._lookup(key)
+        if entry is None:
+            return default
+        stale_if_error = self._windows()[2]
+        if time.time() >= max(entry.expires_at + stale_if_error, entry.held_until):
+            return default
+        self._count("stale_errors")
+        return entry.value
+
+    def set(self, key: Hashable, value: Any, *, ttl: float | None = None) -> None:
+        """Store ``value`` under ``key`` and evict entries beyond the limits."""
+        if ttl is None:
+            ttl = self._windows()[0]
+        entry = _Entry(value=value, expires_at=time.time() + ttl, size=self._sizeof(value))
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[key] = entry
+            self._bytes += entry.size
+            self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.maxsize
+            or (self.max_bytes is not None and self._bytes > self.max_bytes and len(self._entries) > 1)
+        ):
+            _key, old = self._entries.popitem(last=False)
+            self._bytes -= old.size
+            self._counters["evictions"] += 1
+
+    def invalidate(self, key: Hashable | None = None) -> None:
+        """Drop ``key`` or, when omitted, every entry.
+
+        Loads that are in flight when the cache is invalidated do not store
+        their result.
+        """
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+                self._bytes = 0
+            else:
+                old = self._entries.pop(key, None)
+                if old is not None:
+                    self._bytes -= old.size
+
+    clear = invalidate
+
+    def hold(self, key: Hashable, seconds: float) -> bool:
+        """Keep the entry for ``key`` servable as stale for ``seconds`` from now.
+
+        Once the entry expires it is returned immediately while a background
+        load refreshes it, as within the *stale* window. Used by the cache
+        warmer so that prefetched data is still usable when the first request
+        arrives. A later load stores a normal entry. Returns ``False`` when
+        ``key`` is not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            entry.held_until = max(entry.held_until, time.time() + seconds)
+            return True
+
+    # ------------------------------------------------------------------
+    # loading
+    # ------------------------------------------------------------------
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        with self._lock:
+            generation = self._generation
+        try:
+            value = loader()
+        except Exception:
+            self._count("load_errors")
+            raise
+        self._count("loads")
+        with self._lock:
+            current = self._generation == generation
+        if current:
+            self.set(key, value)
+        return value
+
+    def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        *,
+        force: bool = False,
+        passthrough: tuple[type[BaseException], ...] = (),
+    ) -> Any:
+        """Return the value for ``key``, calling ``loader`` when needed.
+
+        * fresh entry → returned directly
+        * expired but within the *stale* window (or held, see :meth:`hold`)
+          → returned while ``loader`` runs in the background
+        * otherwise ``loader`` runs (once for all concurrent callers); if it
+          fails with an exception not in ``passthrough`` and the entry is
+          within the *stale_if_error* window the old value is returned.
+
+        ``force`` skips the cached value but still joins an in-flight load.
+        """
+        now = time.time()
+        _ttl, stale, stale_if_error = self._windows()
+        entry = self._lookup(key)
+
+        if entry is not None and not force:
+            if now < entry.expires_at:
+                self._count("hits")
+                return entry.value
+            if now < max(entry.expires_at + stale, entry.held_until):
+                self._count("stale_hits")
+                self._flight.do_async(key, lambda: self._load(key, loader))
+                return entry.value
+
+        self._count("misses")
+        try:
+            return self._flight.do(key, lambda: self._load(key, loader))
+        except passthrough:
+            raise
+        except Exception:
+            if entry is not None and now < entry.expires_at + stale_if_error:
+                self._count("stale_errors")
+                return entry.value
+            raise
+
+    async def _load_async(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        with self._lock:
+            generation = self._generation
+        try:
+            value = await loader()
+        except Exception:
+            self._count("load_errors")
+            raise
+        self._count("loads")
+        with self._lock:
+            current = self._generation == generation
+        if current:
+            self.set(key, value)
+        return value
+
+    def _load_task(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            task = self._tasks.get(key)
+            if task is not None and not task.done() and task.get_loop() is loop:
+                return task
+            task = loop.create_task(self._load_async(key, loader))
+            self._tasks[key] = task
+
+        def forget(done: asyncio.Task) -> None:
+            with self._lock:
+                if self._tasks.get(key) is done:
+                    del self._tasks[key]
+            if not done.cancelled():
+                done.exception()  # バックグラウンド更新の失敗はログに出さない
+
+        task.add_done_callback(forget)
+        return task
+
+    async def get_or_load_async(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        *,
+        force: bool = False,
+        passthrough: tuple[type[BaseException], ...] = (),
+    ) -> Any:
+        """Awaitable :meth:`get_or_load` for coroutine ``loader`` functions.
+
+        Same freshness rules; concurrent callers on one event loop share a
+        single load task, and a stale entry is refreshed by a background task.
+        Async and blocking loads of the same key are not collapsed together.
+        """
+        now = time.time()
+        _ttl, stale, stale_if_error = self._windows()
+        entry = self._lookup(key)
+
+        if entry is not None and not force:
+            if now < entry.expires_at:
+                self._count("hits")
+                return entry.value
+            if now < max(entry.expires_at + stale, entry.held_until):
+                self._count("stale_hits")
+                self._load_task(key, loader)
+                return entry.value
+
+        self._count("misses")
+        try:
+            # 待ち手がキャンセルされても共有のロードは止めない
+            return await asyncio.shield(self._load_task(key, loader))
+        except passthrough:
+            raise
+        except Exception:
+            if entry is not None and now < entry.expires_at + stale_if_error:
+                self._count("stale_errors")
+                return entry.value
+            raise
+
+    def loading(self, key: Hashable) -> bool:
+        """Return ``True`` while a load for ``key`` is in flight."""
+        return self._flight.in_flight(key)
+
+    def wait(self, key: Hashable, timeout: float | None = None) -> None:
+        """Block until a background load for ``key`` (if any) has finished."""
+        self._flight.wait(key, timeout=timeout)
+
+    # ------------------------------------------------------------------
+    # introspection
+    # ------------------------------------------------------------------
+
+    def stats(self) -> dict[str, Any]:
+        """Return counters and size information for this cache."""
+        with self._lock:
+            data: dict[str, Any] = dict(self._counters)
+            data.update(
+                entries=len(self._entries),
+                bytes=self._bytes,
+                maxsize=self.maxsize,
+                max_bytes=self.max_bytes,
+            )
+        lookups = data["hits"] + data["stale_hits"] + data["misses"]
+        data["hit_ratio"] = round((data["hits"] + data["stale_hits"]) / lookups, 3) if lookups else None
+        return data
+
+
+def payload_digest(payload: Any) -> str:
+    """Return a short digest of a JSON-compatible ``payload``."""
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode()
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+@dataclass(slots=True)
+class _Parsed:
+    digest: str
+    etag: str | None
+    value: Any
+
+
+class ParseMemo:
+    """Reuse parsed objects while the raw payload they came from is unchanged.
+
+    Each key remembers the digest (and HTTP ETag, when the API sent one) of the
+    last payload together with its parsed value. :meth:`parse` returns the
+    previous value untouched when the digest matches, so object identities —
+    including generated IDs — survive a refresh of identical data.
+    """
+
+    def __init__(self, maxsize: int = 64) -> None:
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._items: OrderedDict[Hashable, _Parsed] = OrderedDict()
+        self.reused = 0
+        self.parsed = 0
+
+    def etag(self, key: Hashable) -> str | None:
+        """Return the ETag stored for ``key`` to send as ``If-None-Match``."""
+        with self._lock:
+            item = self._items.get(key)
+            return item.etag if item is not None else None
+
+    def reuse(self, key: Hashable) -> Any:
+        """Return the stored value for ``key`` after a ``304 Not Modified``.
+
+        Returns ``None`` when the entry was cleared or evicted after
+        :meth:`etag` was read; the caller then has to fetch and parse again.
+        """
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            self._items.move_to_end(key)
+            self.reused += 1
+            return item.value
+
+    def parse(
+        self,
+        key: Hashable,
+        payload: Any,
+        parser: Callable[[Any], Any],
+        *,
+        etag: str | None = None,
+    ) -> Any:
+        """Return ``parser(payload)``, reusing the previous result if unchanged."""
+        with tracing.span("sheets.parse") as span:
+            digest = payload_digest(payload)
+            with self._lock:
+                item = self._items.get(key)
+                if item is not None and item.digest == digest:
+                    item.etag = etag or item.etag
+                    self._items.move_to_end(key)
+                    self.reused += 1
+                    span.set_attribute("reused", True)
+                    return item.value
+
+            value = parser(payload)
+            with self._lock:
+                self._items[key] = _Parsed(digest=digest, etag=etag, value=value)
+                self._items.move_to_end(key)
+                while len(self._items) > self.maxsize:
+                    self._items.popitem(last=False)
+                self.parsed += 1
+            span.set_attributes(reused=False, rows=len(payload))
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+def cache_stats() -> dict[str, dict[str, Any]]:
+    """Return :meth:`TTLCache.stats` for every registered cache by name."""
+    with _REGISTRY_LOCK:
+        caches = list(_REGISTRY.values())
+    return {c.name: c.stats() for c in caches}
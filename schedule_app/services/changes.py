@@ -0,0 +1,81 @@
+"""Change notifications for the in-memory stores.
+
+Writers call :func:`publish` after changing ``TASKS``, ``BLOCKS`` or
+``EVENTS``. Every call bumps a process-wide version number; readers remember
+the version they have seen and block in :func:`wait` until it moves on.
+``GET /api/schedule/stream`` uses this to push a regenerated schedule after
+each edit instead of having the browser poll. Caches derived from the stores
+register a callback with :func:`subscribe` to drop their entries.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import date
+from typing import Callable, Iterable
+
+__all__ = ["publish", "settle", "subscribe", "version", "wait"]
+
+_COND = threading.Condition()
+_VERSION = 0
+_LISTENERS: list[Callable[[str, frozenset[date] | None], None]] = []
+
+
+def version() -> int:
+    """Return the current store version."""
+    with _COND:
+        return _VERSION
+
+
+def subscribe(listener: Callable[[str, frozenset[date] | None], None]) -> None:
+    """Call ``listener(source, days)`` on every :func:`publish`.
+
+    Listeners run in the publishing thread before waiters are woken, so a
+    reader woken by the change never sees a cache entry from before it.
+    """
+    _LISTENERS.append(listener)
+
+
+def publish(source: str, *, days: Iterable[date] | None = None) -> int:
+    """Record a change of store ``source`` and wake all waiters.
+
+    ``source`` is ``"tasks"``, ``"blocks"`` or ``"events"``. ``days`` are the
+    UTC grid days the change covers (``None``: unknown or every day), see
+    :func:`schedule_app.services.schedule.span_days`. Returns the new version.
+    """
+    global _VERSION
+    covered = None if days is None else frozenset(days)
+    for listener in list(_LISTENERS):
+        listener(source, covered)
+    with _COND:
+        _VERSION += 1
+        _COND.notify_all()
+        return _VERSION
+
+
+def wait(after: int, timeout: float | None = None) -> int:
+    """Block until the version is greater than ``after`` and return it.
+
+    Returns the unchanged version when ``timeout`` seconds pass first.
+    """
+    with _COND:
+        _COND.wait_for(lambda: _VERSION > after, timeout)
+        return _VERSION
+
+
+def settle(latest: int, quiet: float, *, limit: float) -> int:
+    """Wait until no change follows ``latest`` for ``quiet`` seconds.
+
+    Returns the last version seen, at the latest ``limit`` seconds after the
+    call, so a burst of edits is handled as a single change.
+    """
+    give_up = time.monotonic() + limit
+    while True:
+        left = give_up - time.monotonic()
+        if left <= 0:
+            return latest
+        current = wait(latest, min(quiet, left))
+        if current == latest:
+            return latest
+        latest = current
@@ -0,0 +1,81 @@
+"""Per-request deadline carried in a context variable.
+
+``create_app`` starts a deadline for every request. Google I/O reads it to
+derive socket timeouts (:func:`clamp_timeout`) and to stop retrying once the
+budget is spent. Work submitted to thread pools must be run inside
+``contextvars.copy_context()`` to see the caller's deadline.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Iterator
+
+from schedule_app.exceptions import APIError
+
+__all__ = [
+    "DeadlineExceeded",
+    "check",
+    "clamp_timeout",
+    "deadline",
+    "remaining",
+    "reset",
+    "start",
+]
+
+# monotonic timestamp at which the current request must be answered
+_DEADLINE: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(APIError):
+    """Raised when the request budget runs out before Google I/O completes."""
+
+    def __init__(self, description: str = "request deadline exceeded") -> None:
+        super().__init__(description)
+
+
+def start(budget_sec: float) -> Token:
+    """Set a deadline ``budget_sec`` seconds from now and return the reset token."""
+    return _DEADLINE.set(time.monotonic() + budget_sec)
+
+
+def reset(token: Token) -> None:
+    """Restore the deadline that was active before :func:`start`."""
+    _DEADLINE.reset(token)
+
+
+@contextmanager
+def deadline(budget_sec: float) -> Iterator[None]:
+    """Run the ``with`` block under a deadline of ``budget_sec`` seconds."""
+    token = start(budget_sec)
+    try:
+        yield
+    finally:
+        reset(token)
+
+
+def remaining() -> float | None:
+    """Return seconds left before the deadline, or ``None`` without one."""
+    at = _DEADLINE.get()
+    if at is None:
+        return None
+    return at - time.monotonic()
+
+
+def check() -> None:
+    """Raise :class:`DeadlineExceeded` if the current deadline has passed."""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded()
+
+
+def clamp_timeout(timeout: float) -> float:
+    """Return ``timeout`` shortened to the time left before the deadline."""
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded()
+    return min(timeout, left)
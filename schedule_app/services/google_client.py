@@ -8,26 +8,41 @@ UTC range for a given day before calling :meth:`fetch_calendar_events`.
 
 from __future__ import annotations
 
-from typing import Any
+import asyncio
+import contextvars
+import gzip
+import hashlib
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import Any, Iterable, Iterator
 from urllib import parse, request
 from urllib.error import HTTPError
 import os
+import threading
 
 try:
     import schedule_app.config as config_module
 except Exception:  # pragma: no cover - missing env vars in some test runs
     config_module = None
 import json
-from datetime import datetime, time as dt_time, timedelta, timezone
-import pytz
+from datetime import date as dt_date, datetime, time as dt_time, timedelta, timezone
 
 from schedule_app.models import Event, Block
 from schedule_app.exceptions import APIError
-from schedule_app.utils.validation import _parse_dt
 from schedule_app.errors import InvalidBlockRow
+from schedule_app.services import recurrence
+from schedule_app.services.cache import ParseMemo, TTLCache
+from schedule_app.services import tracing
+from schedule_app.services.resilience import call_google, call_google_async, http_timeout
 from schedule_app.services.rounding import quantize
-import uuid
-import time
+from schedule_app.utils.sheet_rows import (
+    Columns,
+    parse_datetime_column,
+    range_first_row,
+    row_ids,
+)
+from schedule_app.utils.timecodec import format_utc, get_zone, localize, parse_date, parse_utc, to_utc
 
 
 class GoogleAPIUnauthorized(APIError):
@@ -50,89 +65,464 @@ SCOPES = [
     SPREADSHEETS_READONLY_SCOPE,
 ]
 
-# ---------------------------------------------------------------------------
-# Sheet helpers
-# ---------------------------------------------------------------------------
+SHEETS_API_URL = "https://sheets.googleapis.com/v4/spreadsheets"
+CALENDAR_API_URL = "https://www.googleapis.com/calendar/v3"
 
+# events.list で受け取るフィールド。_to_event が読む項目だけに絞る
+EVENT_FIELDS = "nextPageToken,items(id,iCalUID,summary,start,end)"
+# singleEvents=false の場合は繰り返しルールと例外インスタンスの情報も受け取る
+RECURRING_EVENT_FIELDS = (
+    "nextPageToken,items(id,iCalUID,status,summary,start,end,"
+    "recurrence,recurringEventId,originalStartTime)"
+)
 
-def _to_block(data: dict[str, str]) -> Block:
-    """Convert a sheet row ``data`` to a :class:`Block`."""
+# Google は User-Agent に "gzip" を含むリクエストにだけ圧縮レスポンスを返す
+_COMPRESSED_HEADERS = {"Accept-Encoding": "gzip", "User-Agent": "schedule-app (gzip)"}
 
-    start_raw = (data.get("start_utc") or "").strip()
-    end_raw = (data.get("end_utc") or "").strip()
-    if not start_raw or not end_raw:
-        raise InvalidBlockRow()
 
-    try:
-        start_dt = _parse_dt(start_raw)
-        end_dt = _parse_dt(end_raw)
-    except ValueError as exc:  # pragma: no cover - invalid data
-        raise InvalidBlockRow() from exc
+def _calendar_ids() -> tuple[str, ...]:
+    if config_module is None:
+        return ("primary",)
+    return tuple(config_module.cfg.CALENDAR_IDS) or ("primary",)
 
-    if start_dt is None or end_dt is None or start_dt >= end_dt:
-        raise InvalidBlockRow()
 
-    start_dt = quantize(start_dt, up=False)
-    end_dt = quantize(end_dt, up=True)
+def _expand_locally() -> bool:
+    if config_module is None or not config_module.cfg.CALENDAR_EXPAND_LOCALLY:
+        return False
+    return recurrence.available()
 
-    title = (data.get("title") or "").strip() or None
 
-    return Block(id=uuid.uuid4().hex, start_utc=start_dt, end_utc=end_dt, title=title)
+def _calendar_workers() -> int:
+    if config_module is None:
+        return 4
+    return max(1, int(config_module.cfg.CALENDAR_FETCH_WORKERS))
 
 
-def fetch_blocks_from_sheet(spreadsheet_id: str | None, cell_range: str) -> list[Block]:
-    """Return blocks fetched from Google Sheets."""
+# 複数カレンダーの同時取得用。リクエスト毎のスレッド生成を避けるため常駐させるが、
+# import 時には作らず最初の複数カレンダー取得で作る
+_CALENDAR_EXECUTOR: ThreadPoolExecutor | None = None
+_CALENDAR_EXECUTOR_LOCK = threading.Lock()
 
-    if not spreadsheet_id:
-        return []
 
-    global _BLOCK_CACHE
+def _calendar_executor() -> ThreadPoolExecutor:
+    global _CALENDAR_EXECUTOR
+    with _CALENDAR_EXECUTOR_LOCK:
+        if _CALENDAR_EXECUTOR is None:
+            _CALENDAR_EXECUTOR = ThreadPoolExecutor(
+                max_workers=_calendar_workers(), thread_name_prefix="calendar"
+            )
+        return _CALENDAR_EXECUTOR
 
-    now = time.time()
-    if _BLOCK_CACHE is not None:
-        blocks, expiry = _BLOCK_CACHE
-        if now < expiry:
-            return blocks
 
-    encoded_range = parse.quote(cell_range, safe="")
-    url = (
-        "https://sheets.googleapis.com/v4/spreadsheets/"
-        f"{spreadsheet_id}/values/{encoded_range}"
-    )
+def merge_event_streams(
+    streams: Iterable[Iterable[tuple[Event, dict]]],
+) -> Iterator[tuple[Event, dict]]:
+    """k-way merge per-calendar ``(event, item)`` streams sorted by start.
+
+    Events sharing an ``iCalUID`` and start time (the same meeting seen
+    through several calendars) are yielded once; ties keep the stream listed
+    first. Instances of one recurring series share their ``iCalUID`` but not
+    their start, so they are all kept.
+    """
+
+    seen: set[tuple[str, datetime]] = set()
+    merged = heapq.merge(*streams, key=lambda pair: (pair[0].start_utc, pair[0].end_utc))
+    for ev, item in merged:
+        key = (item.get("iCalUID") or item.get("id") or ev.id, ev.start_utc)
+        if key in seen:
+            continue
+        seen.add(key)
+        yield ev, item
+
+
+def _read_json(resp: Any) -> Any:
+    """Decode the JSON body of ``resp``, inflating it when gzip-encoded."""
+
+    raw = resp.read()
+    headers = getattr(resp, "headers", None)
+    if headers is not None and (headers.get("Content-Encoding") or "").lower() == "gzip":
+        raw = gzip.decompress(raw)
+    return json.loads(raw)
+
+
+def fetch_sheet_values(
+    spreadsheet_id: str,
+    ranges: list[str],
+    *,
+    token: str | None = None,
+    etag: str | None = None,
+) -> tuple[list[list[list[str]]] | None, str | None]:
+    """Return ``(rows per range, etag)`` for ``ranges`` of a spreadsheet.
+
+    A single range is read with ``values.get``; several ranges of the same
+    spreadsheet are fetched in one HTTP call with ``values:batchGet``. When
+    ``etag`` is given it is sent as ``If-None-Match`` and a ``304`` response
+    yields ``(None, etag)``.
+    """
+
+    req = _sheet_values_request(spreadsheet_id, ranges, token=token, etag=etag)
 
-    req = request.Request(url)
     try:
-        with request.urlopen(req) as resp:  # pragma: no cover - network stubbed
-            data = json.loads(resp.read().decode())
+        data, new_etag = call_google("sheets.values", lambda: _sheet_exchange(req))
     except HTTPError as e:  # pragma: no cover - network stubbed
+        if e.code == 304 and etag:
+            return None, etag
+        if e.code in (401, 403):
+            raise GoogleAPIUnauthorized() from e
+        raise
+
+    return _sheet_values(data, ranges), new_etag
+
+
+async def fetch_sheet_values_async(
+    spreadsheet_id: str,
+    ranges: list[str],
+    *,
+    token: str | None = None,
+    etag: str | None = None,
+) -> tuple[list[list[list[str]]] | None, str | None]:
+    """Awaitable :func:`fetch_sheet_values`.
+
+    The blocking exchange runs in a worker thread (:func:`asyncio.to_thread`,
+    which carries the request deadline along), so the event loop stays free.
+    """
+
+    req = _sheet_values_request(spreadsheet_id, ranges, token=token, etag=etag)
+
+    try:
+        data, new_etag = await call_google_async(
+            "sheets.values", lambda: asyncio.to_thread(_sheet_exchange, req)
+        )
+    except HTTPError as e:
+        if e.code == 304 and etag:
+            return None, etag
         if e.code in (401, 403):
             raise GoogleAPIUnauthorized() from e
         raise
 
-    rows = data.get("values", [])
+    return _sheet_values(data, ranges), new_etag
+
+
+def _sheet_exchange(req: request.Request) -> tuple[dict, str | None]:
+    with request.urlopen(req, timeout=http_timeout()) as resp:  # pragma: no cover - network stubbed
+        return _read_json(resp), _etag_of(resp)
+
+
+def _sheet_values_request(
+    spreadsheet_id: str, ranges: list[str], *, token: str | None, etag: str | None
+) -> request.Request:
+    base = f"{SHEETS_API_URL}/{parse.quote(spreadsheet_id, safe='')}"
+    if len(ranges) == 1:
+        url = f"{base}/values/{parse.quote(ranges[0], safe='')}"
+    else:
+        query = parse.urlencode([("ranges", r) for r in ranges])
+        url = f"{base}/values:batchGet?{query}"
+
+    headers = dict(_COMPRESSED_HEADERS)
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    if etag:
+        headers["If-None-Match"] = etag
+    return request.Request(url, headers=headers)
+
+
+def _etag_of(resp: Any) -> str | None:
+    headers = getattr(resp, "headers", None)
+    return headers.get("ETag") if headers is not None else None
+
+
+def _sheet_values(data: dict, ranges: list[str]) -> list[list[list[str]]]:
+    if len(ranges) == 1:
+        return [data.get("values", [])]
+
+    # valueRanges は要求順に返る（range 名は正規化されるため位置で対応付ける）
+    value_ranges = data.get("valueRanges", [])
+    result = [vr.get("values", []) for vr in value_ranges[: len(ranges)]]
+    result.extend([] for _ in range(len(ranges) - len(result)))
+    return result
+
+
+def read_sheet_ranges(
+    spreadsheet_id: str, ranges: list[str], *, token: str | None = None
+) -> list[list[list[str]]]:
+    """Return the cell rows of each range in ``ranges``, in request order."""
+
+    values, _etag = fetch_sheet_values(spreadsheet_id, ranges, token=token)
+    return values or [[] for _ in ranges]
+
+
+def parse_block_rows(rows: list[list[str]], *, first_row: int = 1) -> list[Block]:
+    """Return blocks parsed from raw sheet ``rows`` (header row first).
+
+    Columns are parsed in bulk; every invalid row is collected and reported
+    together through :class:`InvalidBlockRow` ``errors``. ``first_row`` is the
+    sheet row number of the header, used in those reports.
+    """
+
+    cols = Columns(rows, first_row=first_row)
+    starts = parse_datetime_column(cols, "start_utc", required=True)
+    ends = parse_datetime_column(cols, "end_utc", required=True)
+    titles = [(t or "").strip() or None for t in cols.column("title")]
+    rrules = cols.column("rrule")
+    ids = cols.column("id")
+
     blocks: list[Block] = []
-    if rows:
-        headers = [str(h).strip().lower() for h in rows[0]]
-        for row in rows[1:]:
-            item = {headers[i]: row[i] for i in range(min(len(headers), len(row)))}
-            blocks.append(_to_block(item))
+    keys: list[tuple[Any, ...]] = []
+    for i, (start_dt, end_dt) in enumerate(zip(starts, ends)):
+        if start_dt is not None and end_dt is not None and start_dt >= end_dt:
+            cols.error(i, "end_utc", "end must be after start")
+        if not cols.ok(i):
+            continue
+        start_dt = quantize(start_dt, up=False)
+        keys.append((titles[i], start_dt.isoformat()))
+        rrule = (rrules[i] or "").strip() or None
+        blocks.append(
+            Block(
+                id=(ids[i] or "").strip(),
+                start_utc=start_dt,
+                end_utc=quantize(end_dt, up=True),
+                title=titles[i],
+                rrule=rrule,
+            )
+        )
+
+    if cols.errors:
+        raise InvalidBlockRow(cols.summary(), errors=[e.to_dict() for e in cols.errors])
+    # id 列が空の行はタイトルと開始時刻から決定的に ID を作る
+    return [
+        blk if blk.id else replace(blk, id=generated.hex)
+        for blk, generated in zip(blocks, row_ids("block", keys))
+    ]
+
 
-    cache_sec = 300
+def _block_parser(cell_range: str):
+    first_row = range_first_row(cell_range)
+    return lambda rows: parse_block_rows(rows, first_row=first_row)
+
+
+def _cache_windows() -> tuple[int, int, int]:
+    """Return ``(ttl, stale, stale_if_error)`` seconds for the sheet caches."""
+
+    if config_module is None:
+        return 300, 300, 3600
+    cfg = config_module.cfg
+    return cfg.SHEETS_CACHE_SEC, cfg.SHEETS_STALE_SEC, cfg.SHEETS_STALE_IF_ERROR_SEC
+
+
+def new_sheet_cache(name: str) -> TTLCache:
+    """Return a :class:`TTLCache` sized and timed from the Sheets settings."""
+
+    maxsize, max_bytes = 64, 8 * 1024 * 1024
     if config_module is not None:
-        cache_sec = config_module.cfg.SHEETS_CACHE_SEC
-    _BLOCK_CACHE = (blocks, now + cache_sec)
+        maxsize = config_module.cfg.SHEETS_CACHE_MAX_ENTRIES
+        max_bytes = config_module.cfg.SHEETS_CACHE_MAX_BYTES
+    return TTLCache(name, maxsize=maxsize, max_bytes=max_bytes, windows=_cache_windows)
+
+
+# blocks sheet cache keyed by (user, spreadsheet id, range). The blocks sheet
+# is read without user credentials, so the user part is always ``None``.
+_BLOCK_CACHE = new_sheet_cache("sheets.blocks")
+
+# last raw rows (digest / ETag) and their parsed blocks, per cache key
+_BLOCK_PARSED = ParseMemo()
+
+
+def blocks_cache_key(spreadsheet_id: str, cell_range: str) -> tuple[None, str, str]:
+    return (None, spreadsheet_id, cell_range)
+
+
+@tracing.traced("sheets.blocks")
+def fetch_blocks_from_sheet(
+    spreadsheet_id: str | None, cell_range: str, *, force: bool = False
+) -> list[Block]:
+    """Return blocks fetched from Google Sheets.
+
+    Results are cached per spreadsheet and range in :data:`_BLOCK_CACHE`,
+    which also applies the stale-while-revalidate and stale-if-error windows
+    and collapses concurrent reads into a single request. Rows identical to
+    the previous read are not parsed again (see :data:`_BLOCK_PARSED`).
+    ``force`` skips the cached value but still joins an in-flight request.
+    """
+
+    if not spreadsheet_id:
+        return []
+
+    key = blocks_cache_key(spreadsheet_id, cell_range)
+
+    def load() -> list[Block]:
+        values, etag = fetch_sheet_values(
+            spreadsheet_id, [cell_range], etag=_BLOCK_PARSED.etag(key)
+        )
+        if values is None:
+            cached = _BLOCK_PARSED.reuse(key)
+            if cached is not None:
+                return cached
+            # 304 の後でメモが消えていた。ETag なしで読み直す
+            values, etag = fetch_sheet_values(spreadsheet_id, [cell_range])
+        return _BLOCK_PARSED.parse(key, values[0], _block_parser(cell_range), etag=etag)
+
+    return _BLOCK_CACHE.get_or_load(
+        key,
+        load,
+        force=force,
+        passthrough=(InvalidBlockRow, GoogleAPIUnauthorized),
+    )
+
+
+@tracing.traced("sheets.blocks")
+async def fetch_blocks_from_sheet_async(
+    spreadsheet_id: str | None, cell_range: str, *, force: bool = False
+) -> list[Block]:
+    """Awaitable :func:`fetch_blocks_from_sheet` sharing the same caches."""
+
+    if not spreadsheet_id:
+        return []
+
+    key = blocks_cache_key(spreadsheet_id, cell_range)
+
+    async def load() -> list[Block]:
+        values, etag = await fetch_sheet_values_async(
+            spreadsheet_id, [cell_range], etag=_BLOCK_PARSED.etag(key)
+        )
+        if values is None:
+            cached = _BLOCK_PARSED.reuse(key)
+            if cached is not None:
+                return cached
+            # 304 の後でメモが消えていた。ETag なしで読み直す
+            values, etag = await fetch_sheet_values_async(spreadsheet_id, [cell_range])
+        return _BLOCK_PARSED.parse(key, values[0], _block_parser(cell_range), etag=etag)
+
+    return await _BLOCK_CACHE.get_or_load_async(
+        key,
+        load,
+        force=force,
+        passthrough=(InvalidBlockRow, GoogleAPIUnauthorized),
+    )
+
+
+def store_blocks_rows(
+    spreadsheet_id: str, cell_range: str, rows: list[list[str]]
+) -> list[Block]:
+    """Parse ``rows`` read elsewhere and populate the blocks cache with them."""
+
+    key = blocks_cache_key(spreadsheet_id, cell_range)
+    blocks = _BLOCK_PARSED.parse(key, rows, _block_parser(cell_range))
+    _BLOCK_CACHE.set(key, blocks)
     return blocks
 
 
-# blocks sheet cache: list of Block objects and expiry timestamp
-_BLOCK_CACHE: tuple[list[Block], float] | None = None
+def hold_blocks(spreadsheet_id: str | None, cell_range: str, seconds: float) -> bool:
+    """Keep the cached blocks servable for ``seconds`` (see :meth:`TTLCache.hold`)."""
+
+    if not spreadsheet_id:
+        return False
+    return _BLOCK_CACHE.hold(blocks_cache_key(spreadsheet_id, cell_range), seconds)
 
 
 def invalidate_blocks_cache() -> None:
     """Clear the in-memory blocks cache."""
 
-    global _BLOCK_CACHE
-    _BLOCK_CACHE = None
+    _BLOCK_CACHE.invalidate()
+
+
+def user_key(token: str | None) -> str | None:
+    """Return a stable, non-reversible cache key for the session user."""
+
+    if not token:
+        return None
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
+def _events_windows() -> tuple[int, int, int]:
+    """Return ``(ttl, stale, stale_if_error)`` seconds for the events cache.
+
+    Loads never fall back to old data on their own; ``/api/calendar`` asks
+    for the user's last copy with :func:`stale_day_events` while Google is
+    unavailable, within the *stale_if_error* window.
+    """
+
+    if config_module is None:
+        return 60, 0, 3600
+    cfg = config_module.cfg
+    return cfg.CALENDAR_CACHE_SEC, 0, cfg.CALENDAR_STALE_IF_ERROR_SEC
+
+
+# calendar events cache keyed by (user, calendar ids, local day)
+_EVENT_CACHE = TTLCache("calendar.events", maxsize=64, windows=_events_windows)
+
+
+def _timezone_name() -> str:
+    if config_module is not None:
+        return config_module.cfg.TIMEZONE
+    return os.getenv("TIMEZONE", "Asia/Tokyo")
+
+
+def _local_day_start(date: datetime) -> datetime:
+    """Return local midnight of ``date``; naive values are treated as JST."""
+
+    tz = get_zone(_timezone_name())
+    if date.tzinfo is None:
+        # naive → JST
+        return localize(datetime.combine(date.date(), dt_time.min), tz)
+    # すでに aware なら JST に合わせる
+    return date.astimezone(tz).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def events_cache_key(token: str | None, date: datetime) -> tuple[str | None, tuple[str, ...], str]:
+    return (user_key(token), _calendar_ids(), _local_day_start(date).date().isoformat())
+
+
+def load_day_events(
+    client: "GoogleClient", date: datetime, *, token: str | None, force: bool = False
+) -> list[Event]:
+    """Return ``client.list_events(date=date)`` through the events cache.
+
+    Concurrent loads for the same user and day are collapsed into one call;
+    ``force`` bypasses a fresh entry.
+    """
+
+    key = events_cache_key(token, date)
+    return _EVENT_CACHE.get_or_load(
+        key, lambda: client.list_events(date=date), force=force, passthrough=(Exception,)
+    )
+
+
+async def load_day_events_async(
+    client: "GoogleClient", date: datetime, *, token: str | None, force: bool = False
+) -> list[Event]:
+    """Awaitable :func:`load_day_events` using :meth:`GoogleClient.list_events_async`."""
+
+    key = events_cache_key(token, date)
+    return await _EVENT_CACHE.get_or_load_async(
+        key, lambda: client.list_events_async(date=date), force=force, passthrough=(Exception,)
+    )
+
+
+def store_day_events(token: str | None, date: datetime, events: list[Event]) -> None:
+    """Populate the events cache with ``events`` fetched elsewhere."""
+
+    _EVENT_CACHE.set(events_cache_key(token, date), list(events))
+
+
+def stale_day_events(token: str | None, date: datetime) -> list[Event] | None:
+    """Return this user's last cached events of ``date`` for an error fallback.
+
+    ``None`` when nothing within the *stale_if_error* window is cached.
+    """
+
+    return _EVENT_CACHE.get_stale(events_cache_key(token, date))
+
+
+def hold_day_events(token: str | None, date: datetime, seconds: float) -> bool:
+    """Keep the cached events of ``date`` servable for ``seconds`` (see :meth:`TTLCache.hold`)."""
+
+    return _EVENT_CACHE.hold(events_cache_key(token, date), seconds)
+
+
+def invalidate_events_cache() -> None:
+    """Clear the in-memory calendar events cache."""
+
+    _EVENT_CACHE.invalidate()
 
 
 class GoogleClient:
@@ -160,8 +550,21 @@ class GoogleClient:
             return creds["access_token"]
         raise APIError("missing_token")
 
-    def fetch_calendar_events(self, *, time_min: str, time_max: str) -> list[dict]:
-        """Fetch calendar events within the given time range.
+    @tracing.traced("calendar.fetch_events")
+    def fetch_calendar_events(
+        self,
+        *,
+        time_min: str,
+        time_max: str,
+        calendar_id: str = "primary",
+        single_events: bool = True,
+    ) -> list[dict]:
+        """Fetch events of one calendar within the given time range.
+
+        Only the fields in :data:`EVENT_FIELDS` are requested and responses
+        are gzip-compressed, which keeps payloads small for calendars with
+        long descriptions or many attendees. All result pages are followed
+        and items are ordered by start time.
 
         Parameters
         ----------
@@ -169,37 +572,143 @@ class GoogleClient:
             ISO 8601 start datetime in UTC.
         time_max: str
             ISO 8601 end datetime in UTC.
+        calendar_id: str
+            Calendar to read; ``"primary"`` by default.
+        single_events: bool
+            When ``False`` recurring events are returned once as masters with
+            their ``recurrence`` rules (see :mod:`.recurrence`) and items are
+            not sorted.
         """
 
+        headers, params = self._events_query(time_min, time_max, single_events)
+        items: list[dict] = []
+        page_token: str | None = None
+        while True:
+            req = _events_request(calendar_id, params, page_token, headers)
+            try:
+                data = call_google("calendar.events", lambda: _events_exchange(req))
+            except HTTPError as e:  # pragma: no cover - network stubbed
+                if e.code in (401, 403):
+                    raise GoogleAPIUnauthorized() from e
+                raise
+            items.extend(data.get("items", []))
+            page_token = data.get("nextPageToken")
+            if not page_token:
+                return items
+
+    @tracing.traced("calendar.fetch_events")
+    async def fetch_calendar_events_async(
+        self,
+        *,
+        time_min: str,
+        time_max: str,
+        calendar_id: str = "primary",
+        single_events: bool = True,
+    ) -> list[dict]:
+        """Awaitable :meth:`fetch_calendar_events`; each page is read in a worker thread."""
+
+        headers, params = self._events_query(time_min, time_max, single_events)
+        items: list[dict] = []
+        page_token: str | None = None
+        while True:
+            req = _events_request(calendar_id, params, page_token, headers)
+            try:
+                data = await call_google_async(
+                    "calendar.events", lambda: asyncio.to_thread(_events_exchange, req)
+                )
+            except HTTPError as e:
+                if e.code in (401, 403):
+                    raise GoogleAPIUnauthorized() from e
+                raise
+            items.extend(data.get("items", []))
+            page_token = data.get("nextPageToken")
+            if not page_token:
+                return items
+
+    def _events_query(
+        self, time_min: str, time_max: str, single_events: bool
+    ) -> tuple[dict[str, str], dict[str, str]]:
+        """Return ``(headers, params)`` for an ``events.list`` request."""
+
         token = self._get_token()
+        headers = {"Authorization": f"Bearer {token}", **_COMPRESSED_HEADERS}
+        params = {
+            "timeMin": time_min,
+            "timeMax": time_max,
+            "singleEvents": "true",
+            "orderBy": "startTime",
+            "maxResults": "2500",
+            "fields": EVENT_FIELDS,
+        }
+        if not single_events:
+            # orderBy=startTime は singleEvents=true の場合しか指定できない
+            del params["orderBy"]
+            params.update(singleEvents="false", fields=RECURRING_EVENT_FIELDS)
+        return headers, params
+
+    @tracing.traced("calendar.free_busy")
+    def free_busy(
+        self,
+        *,
+        time_min: datetime,
+        time_max: datetime,
+        calendar_ids: list[str] | tuple[str, ...] = ("primary",),
+    ) -> list[tuple[datetime, datetime]]:
+        """Return busy ``(start_utc, end_utc)`` ranges via ``freeBusy.query``.
+
+        All ``calendar_ids`` are queried in a single request. The response
+        carries only busy intervals, so this is much cheaper than listing
+        events when the caller just needs to know which time is taken.
+        """
 
-        query = parse.urlencode(
+        token = self._get_token()
+        body = json.dumps(
             {
-                "timeMin": time_min,
-                "timeMax": time_max,
-                "singleEvents": "true",
+                "timeMin": format_utc(time_min),
+                "timeMax": format_utc(time_max),
+                "items": [{"id": cid} for cid in calendar_ids],
             }
-        )
-        url = "https://www.googleapis.com/calendar/v3/calendars/primary/events?" + query
-        req = request.Request(url, headers={"Authorization": f"Bearer {token}"})
+        ).encode()
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+            **_COMPRESSED_HEADERS,
+        }
+        req = request.Request(f"{CALENDAR_API_URL}/freeBusy", data=body, headers=headers, method="POST")
+
+        def exchange() -> dict:
+            with request.urlopen(req, timeout=http_timeout()) as resp:  # pragma: no cover - network stubbed
+                return _read_json(resp)
+
         try:
-            with request.urlopen(req) as resp:  # pragma: no cover - network stubbed
-                data = json.loads(resp.read().decode())
+            data = call_google("calendar.freebusy", exchange)
         except HTTPError as e:  # pragma: no cover - network stubbed
             if e.code in (401, 403):
                 raise GoogleAPIUnauthorized() from e
             raise
-        return data.get("items", [])
+
+        ranges: list[tuple[datetime, datetime]] = []
+        for cid, cal in (data.get("calendars") or {}).items():
+            errors = cal.get("errors") or []
+            if errors:
+                reason = errors[0].get("reason", "unknown")
+                raise APIError(f"freebusy {cid}: {reason}")
+            for period in cal.get("busy") or []:
+                start_dt = parse_utc(period.get("start"))
+                end_dt = parse_utc(period.get("end"))
+                if start_dt is not None and end_dt is not None and start_dt < end_dt:
+                    ranges.append((start_dt, end_dt))
+        ranges.sort()
+        return ranges
 
     def _to_event(self, data: dict) -> Event:
         """Convert a Google Calendar event dictionary to an :class:`Event`."""
 
         start_info = data.get("start", {})
         end_info = data.get("end", {})
-        start_raw = start_info.get("dateTime") or start_info.get("date")
-        end_raw = end_info.get("dateTime") or end_info.get("date")
-        start_dt = _parse_dt(start_raw) or datetime.min.replace(tzinfo=timezone.utc)
-        end_dt = _parse_dt(end_raw) or start_dt
+        start_dt = to_utc(start_info)
+        has_end = end_info.get("dateTime") or end_info.get("date")
+        end_dt = to_utc(end_info) if has_end else start_dt
         all_day = "date" in start_info or "date" in end_info
         return Event(
             id=data.get("id", ""),
@@ -209,76 +718,165 @@ class GoogleClient:
             all_day=all_day,
         )
 
-    def list_events(self, *, date: datetime) -> list[Event]:
+    def _calendar_stream(
+        self, calendar_id: str, *, time_min: str, time_max: str
+    ) -> list[tuple[Event, dict]]:
+        """Return ``(event, item)`` pairs of one calendar sorted by start."""
+
+        if _expand_locally():
+            items = self.fetch_calendar_events(
+                time_min=time_min,
+                time_max=time_max,
+                calendar_id=calendar_id,
+                single_events=False,
+            )
+            items = recurrence.expand_items(items, parse_utc(time_min), parse_utc(time_max))
+        else:
+            items = self.fetch_calendar_events(
+                time_min=time_min, time_max=time_max, calendar_id=calendar_id
+            )
+        return self._sorted_pairs(items)
+
+    async def _calendar_stream_async(
+        self, calendar_id: str, *, time_min: str, time_max: str
+    ) -> list[tuple[Event, dict]]:
+        expand = _expand_locally()
+        items = await self.fetch_calendar_events_async(
+            time_min=time_min,
+            time_max=time_max,
+            calendar_id=calendar_id,
+            single_events=not expand,
+        )
+        if expand:
+            items = recurrence.expand_items(items, parse_utc(time_min), parse_utc(time_max))
+        return self._sorted_pairs(items)
+
+    def _sorted_pairs(self, items: list[dict]) -> list[tuple[Event, dict]]:
+        pairs = [(self._to_event(item), item) for item in items]
+        # orderBy=startTime でも終日予定とオフセット違いの混在に備えて UTC で並べ直す
+        pairs.sort(key=lambda pair: (pair[0].start_utc, pair[0].end_utc))
+        return pairs
+
+    @tracing.traced("calendar.list_events")
+    def list_events(
+        self, *, date: datetime, calendar_ids: Iterable[str] | None = None
+    ) -> list[Event]:
         """Return events for the 24-hour period starting at UTC midnight.
 
+        Every calendar in ``calendar_ids`` (``cfg.CALENDAR_IDS`` by default)
+        is fetched concurrently on a bounded pool; the per-calendar streams
+        are merged by start time and de-duplicated by ``iCalUID``.
+
         Parameters
         ----------
         date : datetime
             Target day in JST. Naive values are treated as JST.
+        calendar_ids : Iterable[str] | None
+            Calendars to read.
         """
 
         # -------------------------------
         # UI は JST 日付を渡してくる前提。
         # JST 00:00 を UTC に変換して 24 h 範囲を取得する。
         # -------------------------------
-        if config_module is not None:
-            tz_name = config_module.cfg.TIMEZONE
+        local_start, time_min, time_max = _day_bounds(date)
+        ids = tuple(calendar_ids) if calendar_ids is not None else _calendar_ids()
+        if len(ids) == 1:
+            streams = [self._calendar_stream(ids[0], time_min=time_min, time_max=time_max)]
         else:
-            tz_name = os.getenv("TIMEZONE", "Asia/Tokyo")
+            # リクエストの処理期限をワーカースレッドへ引き継ぐ
+            executor = _calendar_executor()
+            futures = [
+                executor.submit(
+                    contextvars.copy_context().run,
+                    self._calendar_stream,
+                    cid,
+                    time_min=time_min,
+                    time_max=time_max,
+                )
+                for cid in ids
+            ]
+            streams = [f.result() for f in futures]
 
-        tz = pytz.timezone(tz_name)
+        return _day_events(streams, local_start.date())
 
-        if date.tzinfo is None:
-            # naïve → JST
-            local_start = tz.localize(datetime.combine(date.date(), dt_time.min))
-        else:
-            # すでに aware なら JST に合わせる
-            local_start = date.astimezone(tz).replace(
-                hour=0, minute=0, second=0, microsecond=0
-            )
+    @tracing.traced("calendar.list_events")
+    async def list_events_async(
+        self, *, date: datetime, calendar_ids: Iterable[str] | None = None
+    ) -> list[Event]:
+        """Awaitable :meth:`list_events`.
 
-        start = local_start.astimezone(timezone.utc)
-        end = start + timedelta(days=1)
+        Calendars are fetched concurrently, at most ``CALENDAR_FETCH_WORKERS``
+        at a time like the calendar thread pool of the blocking path.
+        """
 
-        items = self.fetch_calendar_events(
-            time_min=start.isoformat().replace("+00:00", "Z"),
-            time_max=end.isoformat().replace("+00:00", "Z"),
-        )
+        local_start, time_min, time_max = _day_bounds(date)
+        ids = tuple(calendar_ids) if calendar_ids is not None else _calendar_ids()
+        limit = asyncio.Semaphore(_calendar_workers())
 
-        target_day = local_start.date()
-        events: list[Event] = []
-        for item in items:
-            ev = self._to_event(item)
-
-            if ev.all_day:
-                start_info = item.get("start", {})
-                end_info = item.get("end", {})
-                start_date_raw = start_info.get("date")
-                end_date_raw = end_info.get("date")
-                start_date = (
-                    datetime.fromisoformat(start_date_raw).date()
-                    if start_date_raw
-                    else target_day
-                )
-                end_date = (
-                    datetime.fromisoformat(end_date_raw).date()
-                    if end_date_raw
-                    else None
-                )
-                include = False
-                if end_date is not None:
-                    if start_date <= target_day < end_date:
-                        include = True
-                else:
-                    if start_date == target_day:
-                        include = True
-                if include:
-                    events.append(ev)
+        async def stream(cid: str) -> list[tuple[Event, dict]]:
+            async with limit:
+                return await self._calendar_stream_async(cid, time_min=time_min, time_max=time_max)
+
+        streams = await asyncio.gather(*(stream(cid) for cid in ids))
+        return _day_events(streams, local_start.date())
+
+
+def _events_exchange(req: request.Request) -> dict:
+    with request.urlopen(req, timeout=http_timeout()) as resp:  # pragma: no cover - network stubbed
+        return _read_json(resp)
+
+
+def _events_request(
+    calendar_id: str, params: dict[str, str], page_token: str | None, headers: dict[str, str]
+) -> request.Request:
+    query = dict(params, pageToken=page_token) if page_token else params
+    url = (
+        f"{CALENDAR_API_URL}/calendars/{parse.quote(calendar_id, safe='')}/events?"
+        + parse.urlencode(query)
+    )
+    return request.Request(url, headers=headers)
+
+
+def _day_bounds(date: datetime) -> tuple[datetime, str, str]:
+    """Return local midnight of ``date`` and the UTC ``timeMin``/``timeMax``."""
+
+    # -------------------------------
+    # UI は JST 日付を渡してくる前提。
+    # JST 00:00 を UTC に変換して 24 h 範囲を取得する。
+    # -------------------------------
+    local_start = _local_day_start(date)
+
+    start = local_start.astimezone(timezone.utc)
+    end = start + timedelta(days=1)
+    return local_start, format_utc(start), format_utc(end)
+
+
+def _day_events(streams: Iterable[Iterable[tuple[Event, dict]]], target_day: dt_date) -> list[Event]:
+    """Merge calendar ``streams`` and drop all-day events not on ``target_day``."""
+
+    events: list[Event] = []
+    for ev, item in merge_event_streams(streams):
+        if ev.all_day:
+            start_info = item.get("start", {})
+            end_info = item.get("end", {})
+            start_date_raw = start_info.get("date")
+            end_date_raw = end_info.get("date")
+            start_date = parse_date(start_date_raw) if start_date_raw else target_day
+            end_date = parse_date(end_date_raw) if end_date_raw else None
+            include = False
+            if end_date is not None:
+                if start_date <= target_day < end_date:
+                    include = True
             else:
+                if start_date == target_day:
+                    include = True
+            if include:
                 events.append(ev)
+        else:
+            events.append(ev)
 
-        return events
+    return events
 
 
 __all__ = [
@@ -286,6 +884,27 @@ __all__ = [
     "GoogleAPIUnauthorized",
     "APIError",
     "SCOPES",
+    "CALENDAR_API_URL",
+    "EVENT_FIELDS",
+    "RECURRING_EVENT_FIELDS",
+    "merge_event_streams",
+    "events_cache_key",
+    "hold_day_events",
+    "invalidate_events_cache",
+    "load_day_events",
+    "stale_day_events",
+    "store_day_events",
+    "user_key",
     "fetch_blocks_from_sheet",
+    "hold_blocks",
     "invalidate_blocks_cache",
+    "parse_block_rows",
+    "read_sheet_ranges",
+    "store_blocks_rows",
+    "fetch_sheet_values",
+    "fetch_sheet_values_async",
+    "fetch_blocks_from_sheet_async",
+    "load_day_events_async",
+    "blocks_cache_key",
+    "new_sheet_cache",
 ]
@@ -1,8 +1,365 @@
+"""In-process metrics registry exposed in Prometheus text format.
+
+:data:`REGISTRY` holds counters, gauges and fixed-bucket histograms keyed by
+label values. Every family guards its samples with its own lock held only
+for a dict update, so recording costs about a microsecond and threads
+touching different metrics never contend. Nothing is aggregated or exported
+in the background; :meth:`Registry.render` builds the exposition on demand
+for ``GET /api/metrics``.
+
+:func:`init_metrics` adds per-endpoint request timing to a Flask app
+(``http_request_duration_seconds``) and registers collectors that read the
+cache and circuit-breaker state at scrape time. :func:`log_metric` remains
+the call-site API for application events.
+"""
+
 from __future__ import annotations
 
+import math
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+__all__ = [
+    "CONTENT_TYPE",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "LATENCY_BUCKETS",
+    "REGISTRY",
+    "Registry",
+    "init_metrics",
+    "log_metric",
+]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 秒単位。SLO (p95 < 0.4 s, SPEC §15) の境界をバケットに含める
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.4, 0.8, 1.6, 3.2, 6.4)
+
+_NAME_RE = re.compile(r"[^a-zA-Z0-9_]")
+
+# collector → (name, type, help, [(labels, value)])
+Sample = tuple[dict[str, str], float]
+Family = tuple[str, str, str, list[Sample]]
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: dict[tuple[str, ...], Any] = {}
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def value(self, **labels: Any) -> Any:
+        """Return the current value for ``labels`` (``0`` when unset)."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_labels(self.labelnames, key)} {_fmt(v)}" for key, v in items
+        ]
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Observation counts in fixed buckets plus their sum and count."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        # バケット位置はロックの外で求める
+        idx = bisect_left(self.buckets, value)
+        key = self._key(labels)
+        with self._lock:
+            data = self._values.get(key)
+            if data is None:
+                # [バケット毎の件数..., +Inf の件数, 合計]
+                data = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            data[idx] += 1
+            data[-1] += value
+
+    def value(self, **labels: Any) -> dict[str, Any]:
+        """Return ``{"buckets", "count", "sum"}`` for ``labels``; buckets are cumulative."""
+        with self._lock:
+            data = list(self._values.get(self._key(labels)) or [0] * (len(self.buckets) + 1) + [0.0])
+        cumulative, total = [], 0
+        for n in data[:-1]:
+            total += n
+            cumulative.append(total)
+        return {"buckets": cumulative, "count": total, "sum": data[-1]}
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted((key, list(data)) for key, data in self._values.items())
+        lines = self._header()
+        for key, data in items:
+            total = 0
+            for bound, n in zip((*self.buckets, math.inf), data[:-1]):
+                total += n
+                le = _labels(self.labelnames, key, f'le="{_fmt(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {total}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_fmt(data[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {total}")
+        return lines
+
+
+class Registry:
+    """Named metric families plus collectors evaluated at scrape time."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Callable[[], Iterable[Family]]] = []
+
+    def _get(self, cls: type, name: str, help: str, labelnames: Sequence[str], **kw: Any) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labelnames, **kw)
+        if type(metric) is not cls:
+            raise ValueError(f"metric {name} is already registered as a {metric.kind}")
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Return the counter ``name``, creating it on first use."""
+        return self._get(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Return the gauge ``name``, creating it on first use."""
+        return self._get(Gauge, name, help, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        """Return the histogram ``name``, creating it on first use."""
+        return self._get(Histogram, name, help, labelnames, buckets=buckets)
+
+    def get(self, name: str) -> _Metric | None:
+        with self._lock:
+            return self._metrics.get(name)
+
+    def add_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        """Register ``collector``; it yields ``(name, type, help, samples)`` on every scrape."""
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+            collectors = list(self._collectors)
+        lines: list[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in collectors:
+            for name, kind, help, samples in collector():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(list(labels), list(labels.values()))} {_fmt(value)}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        """Reset every metric value (used by tests)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+
+REGISTRY = Registry()
+
+
+def _metric_name(*parts: str) -> str:
+    return _NAME_RE.sub("_", "_".join(parts))
+
 
 def log_metric(name: str, data: dict | None = None) -> None:
-    """Record a usage metric (no-op placeholder)."""
-    return None
+    """Record an application event.
+
+    Counts the call in ``<name>_total`` labelled by the string values of
+    ``data``; numeric values are added to ``<name>_<key>_total``. The label
+    names are fixed by the first call for ``name``.
+    """
+    data = data or {}
+    labels = {k: v for k, v in data.items() if isinstance(v, str)}
+    REGISTRY.counter(_metric_name(name, "total"), f"Number of {name} events.", sorted(labels)).inc(**labels)
+    for key, value in data.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            REGISTRY.counter(
+                _metric_name(name, key, "total"), f"Sum of {key} over {name} events.", sorted(labels)
+            ).inc(value, **labels)
+
+
+# ---------------------------------------------------------------------------
+# Scrape-time collectors
+# ---------------------------------------------------------------------------
+_CACHE_COUNTERS = ("hits", "stale_hits", "misses")
+_CACHE_GAUGES = ("entries", "bytes")
+_BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+def _cache_families() -> Iterator[Family]:
+    from schedule_app.services.cache import cache_stats
+
+    stats = cache_stats()
+    for field in _CACHE_COUNTERS:
+        yield (
+            f"cache_{field}_total",
+            "counter",
+            f"Cache lookups counted as {field.replace('_', ' ')}.",
+            [({"cache": name}, s.get(field, 0)) for name, s in sorted(stats.items())],
+        )
+    for field in _CACHE_GAUGES:
+        yield (
+            f"cache_{field}",
+            "gauge",
+            f"Current number of cached {field}.",
+            [({"cache": name}, s.get(field, 0)) for name, s in sorted(stats.items())],
+        )
+
+
+def _resilience_families() -> Iterator[Family]:
+    from schedule_app.services.resilience import resilience_stats
+
+    stats = resilience_stats()
+    breakers = sorted(stats["breakers"].items())
+    yield (
+        "google_breaker_state",
+        "gauge",
+        "Circuit breaker state per Google endpoint (0 closed, 1 half-open, 2 open).",
+        [({"endpoint": name}, _BREAKER_STATES.get(b["state"], 0)) for name, b in breakers],
+    )
+    yield (
+        "google_retry_budget_tokens",
+        "gauge",
+        "Retries currently allowed by the shared retry budget.",
+        [({}, stats["retry_budget"])],
+    )
+
+
+# ---------------------------------------------------------------------------
+# Flask integration
+# ---------------------------------------------------------------------------
+# WSGI environ key holding the request start time
+_STARTED = "schedule_app.metrics_started"
+
+
+def init_metrics(app: Any) -> None:
+    """Time every request of ``app`` and serve ``GET /api/metrics``."""
+    from flask import Response, request
+
+    duration = REGISTRY.histogram(
+        "http_request_duration_seconds",
+        "Time until the response headers are ready, per endpoint.",
+        ("method", "endpoint", "status"),
+    )
+    in_flight = REGISTRY.gauge("http_requests_in_flight", "Requests currently being handled.")
+    REGISTRY.add_collector(_cache_families)
+    REGISTRY.add_collector(_resilience_families)
+
+    @app.before_request
+    def start_request_timer():
+        request.environ[_STARTED] = time.perf_counter()
+        in_flight.inc()
+
+    @app.after_request
+    def observe_request_duration(response):
+        # request プロキシの参照は 1 回 ~1 µs なので environ から直接読む
+        environ = request.environ
+        started = environ.get(_STARTED)
+        if started is not None:
+            # 未定義 URL はエンドポイント名の代わりに固定値でまとめる
+            duration.observe(
+                time.perf_counter() - started,
+                method=environ["REQUEST_METHOD"],
+                endpoint=request.endpoint or "unmatched",
+                status=response.status_code,
+            )
+        return response
+
+    @app.teardown_request
+    def end_request_timer(_exc):
+        if request.environ.pop(_STARTED, None) is not None:
+            in_flight.dec()
 
-__all__ = ["log_metric"]
+    @app.get("/api/metrics")
+    def metrics_view():
+        return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,212 @@
+"""Local expansion of recurring Calendar events and blocks.
+
+With ``singleEvents=true`` Google expands every recurrence server-side and
+returns one item per instance. When ``CALENDAR_EXPAND_LOCALLY`` is enabled the
+client asks for the recurring *masters* instead and :func:`expand_items` turns
+them back into instance items here, so long ranges download one row per series
+rather than one per occurrence.
+
+Expansion is lazy and memoized per day: :func:`iter_occurrences` walks the
+requested window one UTC day at a time and each ``(rule, day)`` result is kept
+in an LRU cache, so overlapping windows and repeated refreshes reuse earlier
+work. Rules are parsed with :mod:`dateutil.rrule`; without it the feature is
+unavailable and callers fall back to server-side expansion.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone, tzinfo
+from functools import lru_cache
+from typing import Any, Iterable, Iterator
+
+try:
+    from dateutil import rrule as _rrule
+except ImportError:  # pragma: no cover - optional dependency
+    _rrule = None
+
+from schedule_app.utils.timecodec import get_zone, parse_date, parse_utc
+
+__all__ = ["available", "expand_items", "iter_occurrences", "occurrences_between"]
+
+_DAY = timedelta(days=1)
+
+
+def available() -> bool:
+    """Return ``True`` when :mod:`dateutil` is installed."""
+    return _rrule is not None
+
+
+@lru_cache(maxsize=256)
+def _ruleset(lines: tuple[str, ...], dtstart: datetime) -> Any:
+    """Parse RRULE/EXRULE/RDATE/EXDATE ``lines`` anchored at ``dtstart``."""
+    return _rrule.rrulestr("\n".join(lines), dtstart=dtstart, forceset=True)
+
+
+@lru_cache(maxsize=4096)
+def _day_starts(lines: tuple[str, ...], dtstart: datetime, day: datetime) -> tuple[datetime, ...]:
+    """Return occurrence starts in ``[day, day + 1 day)``.
+
+    ``day`` is a UTC midnight for timed series and a naive midnight for
+    all-day (naive ``dtstart``) series.
+    """
+    end = day + _DAY
+    return tuple(occ for occ in _ruleset(lines, dtstart).between(day, end, inc=True) if occ < end)
+
+
+def _floor_day(dt: datetime) -> datetime:
+    if dt.tzinfo is None:
+        return datetime.combine(dt.date(), datetime.min.time())
+    dt = dt.astimezone(timezone.utc)
+    return datetime.combine(dt.date(), datetime.min.time(), tzinfo=timezone.utc)
+
+
+def iter_occurrences(
+    lines: Iterable[str],
+    dtstart: datetime,
+    duration: timedelta,
+    start: datetime,
+    end: datetime,
+) -> Iterator[datetime]:
+    """Yield starts of occurrences overlapping ``[start, end)`` in order.
+
+    ``dtstart`` must be naive for all-day series (then ``start``/``end`` are
+    naive local times too) and timezone-aware otherwise; wall-clock times are
+    kept across DST changes in ``dtstart``'s zone.
+    """
+    lines = tuple(lines)
+    day = _floor_day(start - duration)
+    last = end
+    if dtstart.tzinfo is not None:
+        last = end.astimezone(timezone.utc)
+    while day < last:
+        for occ in _day_starts(lines, dtstart, day):
+            if occ < end and occ + duration > start:
+                yield occ
+        day += _DAY
+
+
+def occurrences_between(
+    lines: Iterable[str],
+    dtstart: datetime,
+    duration: timedelta,
+    start: datetime,
+    end: datetime,
+) -> list[tuple[datetime, datetime]]:
+    """Return ``(start, end)`` pairs of occurrences overlapping the window."""
+    return [(occ, occ + duration) for occ in iter_occurrences(lines, dtstart, duration, start, end)]
+
+
+# ---------------------------------------------------------------------------
+# Google Calendar items
+# ---------------------------------------------------------------------------
+
+
+def _zone(name: str | None) -> tzinfo | None:
+    if not name:
+        return None
+    try:
+        return get_zone(name)
+    except KeyError:
+        return None
+
+
+def _local_start(info: dict) -> datetime | None:
+    """Return the start of ``info`` (a Calendar ``start`` object).
+
+    Timed values are aware and expressed in the event's own ``timeZone`` so
+    the rule keeps its wall-clock time; all-day values are naive midnights.
+    """
+    if info.get("date"):
+        return datetime.combine(parse_date(info["date"]), datetime.min.time())
+    raw = info.get("dateTime")
+    if not raw:
+        return None
+    name = info.get("timeZone")
+    zone = _zone(name)
+    if zone is not None:
+        return parse_utc(raw, zone=name).astimezone(zone)
+    # ゾーン指定が無ければ元のオフセットのまま展開する（曜日がずれないように）
+    dt = datetime.fromisoformat(raw)
+    return dt if dt.tzinfo is not None else dt.replace(tzinfo=timezone.utc)
+
+
+def _original_key(item: dict) -> tuple[str, Any] | None:
+    """Return ``(master id, original start)`` for an instance override."""
+    master = item.get("recurringEventId")
+    original = item.get("originalStartTime") or {}
+    if not master:
+        return None
+    if original.get("date"):
+        return master, parse_date(original["date"])
+    return master, parse_utc(original.get("dateTime"))
+
+
+def _instance_id(master_id: str, occ: datetime) -> str:
+    # Google と同じ形式: <master>_<YYYYMMDD> / <master>_<YYYYMMDDTHHMMSSZ>
+    if occ.tzinfo is None:
+        return f"{master_id}_{occ:%Y%m%d}"
+    return f"{master_id}_{occ.astimezone(timezone.utc):%Y%m%dT%H%M%SZ}"
+
+
+def _instance(master: dict, occ: datetime, duration: timedelta) -> dict:
+    end = occ + duration
+    if occ.tzinfo is None:
+        start_info = {"date": occ.date().isoformat()}
+        end_info = {"date": end.date().isoformat()}
+    else:
+        start_info = {"dateTime": occ.isoformat()}
+        end_info = {"dateTime": end.isoformat()}
+    return {
+        "id": _instance_id(master.get("id", ""), occ),
+        "iCalUID": master.get("iCalUID"),
+        "summary": master.get("summary", ""),
+        "start": start_info,
+        "end": end_info,
+        "recurringEventId": master.get("id"),
+        "originalStartTime": start_info,
+    }
+
+
+def expand_items(items: list[dict], time_min: datetime, time_max: datetime) -> list[dict]:
+    """Expand recurring masters in ``items`` to instances within the window.
+
+    ``items`` is an ``events.list`` result fetched with ``singleEvents=false``:
+    plain events, recurring masters (with ``recurrence``) and overrides of
+    single instances (with ``recurringEventId``). Overrides replace the
+    generated instance they refer to; cancelled ones remove it.
+    """
+    masters: list[dict] = []
+    result: list[dict] = []
+    overridden: set[tuple[str, Any]] = set()
+    for item in items:
+        key = _original_key(item)
+        if key is not None:
+            overridden.add(key)
+        if item.get("recurrence") and key is None:
+            masters.append(item)
+        elif item.get("status") != "cancelled":
+            result.append(item)
+
+    for master in masters:
+        if master.get("status") == "cancelled":
+            continue
+        start = _local_start(master.get("start") or {})
+        end = _local_start(master.get("end") or {})
+        if start is None:
+            continue
+        duration = (end - start) if end is not None and end > start else timedelta(0)
+        lines = tuple(master["recurrence"])
+
+        if start.tzinfo is None:
+            # 終日予定は日付単位で展開する
+            win_start = datetime.combine(time_min.date(), datetime.min.time())
+            win_end = datetime.combine(time_max.date(), datetime.min.time()) + _DAY
+        else:
+            win_start, win_end = time_min, time_max
+
+        for occ in iter_occurrences(lines, start, duration, win_start, win_end):
+            original = occ.date() if occ.tzinfo is None else occ.astimezone(timezone.utc)
+            if (master.get("id"), original) in overridden:
+                continue
+            result.append(_instance(master, occ, duration))
+    return result
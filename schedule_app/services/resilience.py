@@ -0,0 +1,411 @@
+"""Retry and circuit-breaker policy shared by all Google API calls.
+
+:func:`call_google` wraps a single HTTP exchange. Retryable failures (429,
+5xx, connection errors and timeouts) are retried with decorrelated-jitter
+backoff that honours ``Retry-After``, bounded both per call and by a
+process-wide retry budget. Each endpoint has its own :class:`CircuitBreaker`
+that fails fast with :class:`CircuitOpenError` while Google keeps failing, so
+callers can fall back to cached data.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, TypeVar
+from urllib.error import HTTPError, URLError
+
+try:
+    import schedule_app.config as config_module
+except Exception:  # pragma: no cover - missing env vars in some test runs
+    config_module = None
+
+from schedule_app.exceptions import APIError
+from schedule_app.services import deadline, tracing
+from schedule_app.services.metrics import log_metric
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+__all__ = [
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "RetryBudget",
+    "RetryPolicy",
+    "breaker_for",
+    "call_google",
+    "call_google_async",
+    "http_timeout",
+    "reset",
+    "resilience_stats",
+]
+
+
+class CircuitOpenError(APIError):
+    """Raised instead of calling Google while an endpoint's breaker is open."""
+
+    def __init__(self, endpoint: str) -> None:
+        self.endpoint = endpoint
+        super().__init__(f"circuit open: {endpoint}")
+
+
+def _setting(name: str, default: Any) -> Any:
+    if config_module is None:
+        return default
+    return getattr(config_module.cfg, name, default)
+
+
+def http_timeout() -> float:
+    """Return the socket timeout in seconds for a single Google request.
+
+    The configured timeout is shortened to the time left before the current
+    request deadline; :class:`~schedule_app.services.deadline.DeadlineExceeded`
+    is raised when none is left.
+    """
+    return deadline.clamp_timeout(float(_setting("GOOGLE_HTTP_TIMEOUT_SEC", 10)))
+
+
+# ---------------------------------------------------------------------------
+# retry
+# ---------------------------------------------------------------------------
+
+
+@dataclass(slots=True, frozen=True)
+class RetryPolicy:
+    """Per-call retry limits. Delays are in seconds."""
+
+    max_attempts: int = 3
+    base_delay: float = 0.1
+    max_delay: float = 2.0
+
+    @classmethod
+    def from_config(cls) -> "RetryPolicy":
+        return cls(
+            max_attempts=int(_setting("GOOGLE_RETRY_ATTEMPTS", 3)),
+            base_delay=int(_setting("GOOGLE_RETRY_BASE_MS", 100)) / 1000,
+            max_delay=int(_setting("GOOGLE_RETRY_MAX_MS", 2000)) / 1000,
+        )
+
+    def next_delay(self, previous: float) -> float:
+        """Return a decorrelated-jitter delay following ``previous``."""
+        upper = max(self.base_delay, previous * 3)
+        return min(self.max_delay, random.uniform(self.base_delay, upper))
+
+
+class RetryBudget:
+    """Token bucket limiting retries to a fraction of all requests.
+
+    Every request deposits ``ratio`` tokens (up to ``capacity``); every retry
+    withdraws one. When Google is down for everyone this keeps retries from
+    multiplying the load.
+    """
+
+    def __init__(self, ratio: float = 0.2, capacity: float = 10.0) -> None:
+        self.ratio = ratio
+        self.capacity = capacity
+        self._tokens = capacity
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            return self._tokens
+
+
+def _retry_after(exc: HTTPError) -> float | None:
+    """Return the ``Retry-After`` delay of ``exc`` in seconds, if present."""
+    headers = getattr(exc, "headers", None)
+    raw = headers.get("Retry-After") if headers is not None else None
+    if not raw:
+        return None
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(raw)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, HTTPError):
+        return exc.code in RETRYABLE_STATUS
+    return isinstance(exc, (URLError, socket.timeout, TimeoutError, ConnectionError))
+
+
+def _hit_deadline(exc: BaseException) -> bool:
+    """Return ``True`` if ``exc`` is a timeout cut short by the request deadline.
+
+    :func:`http_timeout` clamps socket timeouts to the time left, so a timeout
+    that fires once the deadline has passed says nothing about Google.
+    """
+    if isinstance(exc, URLError) and not isinstance(exc, HTTPError):
+        exc = exc.reason if isinstance(exc.reason, BaseException) else exc
+    if not isinstance(exc, (socket.timeout, TimeoutError)):
+        return False
+    left = deadline.remaining()
+    return left is not None and left <= 0
+
+
+# ---------------------------------------------------------------------------
+# circuit breaker
+# ---------------------------------------------------------------------------
+
+
+class CircuitBreaker:
+    """Classic closed → open → half-open breaker for one endpoint."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, *, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def _transition(self, state: str) -> None:
+        if state != self._state:
+            self._state = state
+            log_metric("google_breaker_state", {"endpoint": self.name, "state": state})
+
+    def allow(self) -> bool:
+        """Return ``True`` if a call may be attempted now."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._transition(self.HALF_OPEN)
+            # half-open: let a single trial request through
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._trial_in_flight = False
+            self._transition(self.CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._transition(self.OPEN)
+
+    def release(self) -> None:
+        """End a call that never reached Google without judging the endpoint."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def snapshot(self) -> dict[str, Any]:
+        state = self.state
+        with self._lock:
+            return {"state": state, "failures": self._failures}
+
+
+_BREAKERS: dict[str, CircuitBreaker] = {}
+_RETRIES: dict[str, int] = {}
+_BUDGET = RetryBudget()
+_LOCK = threading.Lock()
+
+
+def breaker_for(endpoint: str) -> CircuitBreaker:
+    """Return the breaker for ``endpoint``, creating it on first use."""
+    with _LOCK:
+        breaker = _BREAKERS.get(endpoint)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                endpoint,
+                failure_threshold=int(_setting("GOOGLE_BREAKER_FAILURES", 5)),
+                reset_timeout=float(_setting("GOOGLE_BREAKER_RESET_SEC", 30)),
+            )
+            _BREAKERS[endpoint] = breaker
+        return breaker
+
+
+def _count_retry(endpoint: str) -> None:
+    with _LOCK:
+        _RETRIES[endpoint] = _RETRIES.get(endpoint, 0) + 1
+
+
+def _admit(endpoint: str) -> CircuitBreaker:
+    deadline.check()
+    breaker = breaker_for(endpoint)
+    if not breaker.allow():
+        log_metric("google_breaker_rejected", {"endpoint": endpoint})
+        raise CircuitOpenError(endpoint)
+    _BUDGET.deposit()
+    return breaker
+
+
+def _backoff(
+    endpoint: str,
+    exc: Exception,
+    breaker: CircuitBreaker,
+    policy: RetryPolicy,
+    attempt: int,
+    delay: float,
+) -> float:
+    """Return the delay before retrying after ``exc`` or re-raise it.
+
+    Only Google's own failures count against ``breaker``: a 4xx answer proves
+    the endpoint healthy, while errors on our side (bad JSON, bugs) and
+    failures caused by the request deadline leave it undecided.
+    """
+    if _hit_deadline(exc):
+        breaker.release()
+        raise deadline.DeadlineExceeded() from exc
+    if not _is_retryable(exc):
+        if isinstance(exc, HTTPError):
+            breaker.record_success()
+        else:
+            breaker.release()
+        raise exc
+    retry_after = _retry_after(exc) if isinstance(exc, HTTPError) else None
+    delay = policy.next_delay(delay)
+    if retry_after is not None:
+        delay = retry_after
+    if (
+        attempt >= policy.max_attempts
+        or delay > policy.max_delay
+        or not _BUDGET.withdraw()
+    ):
+        breaker.record_failure()
+        raise exc
+    left = deadline.remaining()
+    if left is not None and left <= delay:
+        # 再試行できなかったのは処理期限のせい。エンドポイントの失敗には数えない
+        breaker.release()
+        raise deadline.DeadlineExceeded() from exc
+    _count_retry(endpoint)
+    log_metric(
+        "google_retry",
+        {"endpoint": endpoint, "attempt": attempt, "error": type(exc).__name__},
+    )
+    return delay
+
+
+def call_google(
+    endpoint: str,
+    fn: Callable[[], T],
+    *,
+    policy: RetryPolicy | None = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> T:
+    """Run ``fn`` under the retry policy and the breaker for ``endpoint``.
+
+    Non-retryable HTTP errors (e.g. 401/403/404) are re-raised immediately and
+    do not count against the breaker. Retrying stops with
+    :class:`~schedule_app.services.deadline.DeadlineExceeded` when the next
+    backoff would not fit in the current request deadline.
+    """
+    with tracing.span(f"google {endpoint}", kind="client") as span:
+        breaker = _admit(endpoint)
+        policy = policy or RetryPolicy.from_config()
+        delay = policy.base_delay
+        attempt = 1
+        while True:
+            span.set_attribute("attempts", attempt)
+            try:
+                result = fn()
+            except deadline.DeadlineExceeded:
+                breaker.release()
+                raise
+            except Exception as exc:
+                delay = _backoff(endpoint, exc, breaker, policy, attempt, delay)
+                sleep(delay)
+                attempt += 1
+                continue
+            breaker.record_success()
+            return result
+
+
+async def call_google_async(
+    endpoint: str,
+    fn: Callable[[], Awaitable[T]],
+    *,
+    policy: RetryPolicy | None = None,
+    sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+) -> T:
+    """Awaitable :func:`call_google` for coroutine exchanges.
+
+    ``fn`` is called once per attempt and must return a fresh awaitable.
+    Backoff waits with :func:`asyncio.sleep`, so the event loop stays free.
+    """
+    with tracing.span(f"google {endpoint}", kind="client") as span:
+        breaker = _admit(endpoint)
+        policy = policy or RetryPolicy.from_config()
+        delay = policy.base_delay
+        attempt = 1
+        while True:
+            span.set_attribute("attempts", attempt)
+            try:
+                result = await fn()
+            except (deadline.DeadlineExceeded, asyncio.CancelledError):
+                breaker.release()
+                raise
+            except Exception as exc:
+                delay = _backoff(endpoint, exc, breaker, policy, attempt, delay)
+                await sleep(delay)
+                attempt += 1
+                continue
+            breaker.record_success()
+            return result
+
+
+def resilience_stats() -> dict[str, Any]:
+    """Return breaker states, retry counts and the remaining retry budget."""
+    with _LOCK:
+        breakers = list(_BREAKERS.values())
+        retries = dict(_RETRIES)
+    return {
+        "breakers": {b.name: b.snapshot() for b in breakers},
+        "retries": retries,
+        "retry_budget": round(_BUDGET.tokens, 2),
+    }
+
+
+def reset() -> None:
+    """Forget all breakers, retry counts and budget (used by tests)."""
+    global _BUDGET
+    with _LOCK:
+        _BREAKERS.clear()
+        _RETRIES.clear()
+        _BUDGET = RetryBudget()
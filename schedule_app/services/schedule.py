@@ -2,18 +2,32 @@
 
 from __future__ import annotations
 
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
 from datetime import date, datetime, timezone, timedelta
-from typing import Literal
-from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
-import pytz
+from typing import Any, Callable, Iterable, Literal, Sequence
 
 from schedule_app.config import cfg
 
 from schedule_app.models import Block, Event, Task
 from operator import itemgetter
+from schedule_app.services import changes, recurrence, schedule_format, tracing
+from schedule_app.services.metrics import REGISTRY
 from schedule_app.services.rounding import quantize
-
-__all__ = ["generate", "generate_schedule"]
+from schedule_app.utils.timecodec import get_zone
+
+__all__ = [
+    "ScheduleStats",
+    "day_window",
+    "generate",
+    "generate_schedule",
+    "invalidate_busy_maps",
+    "span_days",
+    "store_busy_map",
+    "warm_busy_map",
+]
 
 SLOT_MIN = 10
 DAY_SLOTS = 144
@@ -25,10 +39,7 @@ def _jst():
     Tries :class:`ZoneInfo` first and falls back to :mod:`pytz` if the zone
     is not available.
     """
-    try:
-        return ZoneInfo(cfg.TIMEZONE)
-    except ZoneInfoNotFoundError:
-        return pytz.timezone(cfg.TIMEZONE)
+    return get_zone(cfg.TIMEZONE)
 
 
 
@@ -67,26 +78,174 @@ def _merge_ranges(ranges: list[tuple[datetime, datetime]]) -> list[tuple[datetim
     return [(s, e) for s, e in merged]
 
 
-def _init_slot_map(start_utc: datetime, events: list[Event], blocks: list[Block]) -> list[bool]:
+def _block_ranges(blk: Block, *, start_utc: datetime) -> list[tuple[datetime, datetime]]:
+    """Return the busy ranges of ``blk`` within the day starting at ``start_utc``.
+
+    Recurring blocks are expanded in the configured timezone so they keep
+    their local wall-clock time.
+    """
+    if not blk.rrule or not recurrence.available():
+        return [(blk.start_utc, blk.end_utc)]
+    rule = blk.rrule if ":" in blk.rrule else f"RRULE:{blk.rrule}"
+    return [
+        (s.astimezone(timezone.utc), e.astimezone(timezone.utc))
+        for s, e in recurrence.occurrences_between(
+            (rule,),
+            blk.start_utc.astimezone(_jst()),
+            blk.end_utc - blk.start_utc,
+            start_utc,
+            start_utc + timedelta(days=1),
+        )
+    ]
+
+
+def _init_slot_map(
+    start_utc: datetime,
+    events: list[Event],
+    blocks: list[Block],
+    busy: list[tuple[datetime, datetime]] | None = None,
+) -> list[bool]:
     """Return a slot map initialised with busy periods for ``start_utc``.
 
     All-day events are skipped because they do not occupy time slots.
+    ``busy`` holds extra ``(start_utc, end_utc)`` ranges, e.g. from the
+    Calendar freeBusy API.
     """
-    slot_map = [False] * DAY_SLOTS
-    ranges: list[tuple[datetime, datetime]] = []
+    ranges: list[tuple[datetime, datetime]] = list(busy or ())
     for ev in events:
         if ev.all_day:
             continue
         ranges.append((ev.start_utc, ev.end_utc))
     for blk in blocks:
-        ranges.append((blk.start_utc, blk.end_utc))
+        ranges.extend(_block_ranges(blk, start_utc=start_utc))
 
+    slot_map = [False] * DAY_SLOTS
     for start, end in _merge_ranges(ranges):
         _mark_busy(slot_map, start, end, base=start_utc)
-
     return slot_map
 
 
+# day → busy map built from the stores; LRU で最大 _DAY_MAPS_MAX 件
+_DAY_MAPS: OrderedDict[date, tuple[bool, ...]] = OrderedDict()
+_DAY_MAPS_MAX = 32
+_BUSY_LOCK = threading.Lock()
+# invalidate のたびに進める。読み込み中に無効化された結果は保存しない
+_BUSY_GENERATION = 0
+
+
+def store_busy_map(target_day: date) -> tuple[bool, ...]:
+    """Return the busy map of ``target_day`` from ``EVENTS`` and ``BLOCKS``.
+
+    The map is memoized per day until a store change is published (see
+    :mod:`schedule_app.services.changes`), so :func:`warm_busy_map` can
+    prepare it in the background and ``compute_schedule`` reuses it for the
+    grid and the busy overlay.
+    """
+    with _BUSY_LOCK:
+        slots = _DAY_MAPS.get(target_day)
+        if slots is not None:
+            _DAY_MAPS.move_to_end(target_day)
+            return slots
+        generation = _BUSY_GENERATION
+
+    start_utc, events, blocks = _day_inputs(target_day)
+    slots = tuple(_init_slot_map(start_utc, events, blocks))
+
+    with _BUSY_LOCK:
+        if generation == _BUSY_GENERATION:
+            _DAY_MAPS[target_day] = slots
+            while len(_DAY_MAPS) > _DAY_MAPS_MAX:
+                _DAY_MAPS.popitem(last=False)
+    return slots
+
+
+def invalidate_busy_maps(days: Iterable[date] | None = None) -> int:
+    """Drop the memoized busy maps of ``days`` (all days when ``None``).
+
+    Returns the number of entries removed.
+    """
+    global _BUSY_GENERATION
+    with _BUSY_LOCK:
+        _BUSY_GENERATION += 1
+        if days is None:
+            dropped = len(_DAY_MAPS)
+            _DAY_MAPS.clear()
+            return dropped
+        stale = [day for day in set(days) if day in _DAY_MAPS]
+        for day in stale:
+            del _DAY_MAPS[day]
+        return len(stale)
+
+
+def span_days(items: Iterable[Block | Event]) -> set[date] | None:
+    """Return the grid days covered by ``items``, or ``None`` if one repeats.
+
+    Pass the old and new versions of changed items; the result is meant for
+    ``changes.publish(..., days=...)``.
+    """
+    days: set[date] = set()
+    for item in items:
+        if getattr(item, "rrule", None):
+            return None
+        first = item.start_utc.astimezone(timezone.utc).date()
+        last = (item.end_utc.astimezone(timezone.utc) - timedelta(microseconds=1)).date()
+        days.update(first + timedelta(days=i) for i in range((last - first).days + 1))
+    return days
+
+
+def _on_store_change(source: str, days: frozenset[date] | None) -> None:
+    # 変更の及ぶ日だけ捨てる。繰り返しブロックなど範囲不明なら全日
+    if source in ("blocks", "events"):
+        invalidate_busy_maps(days)
+
+
+changes.subscribe(_on_store_change)
+
+
+@dataclass(slots=True)
+class ScheduleStats:
+    """Phase timings and work counters of one :func:`generate` run."""
+
+    # フェーズ名 → 所要時間 (秒)
+    phases: dict[str, float] = field(default_factory=dict)
+    # 空きを調べたスロット数と、試した開始位置の数
+    slots_scanned: int = 0
+    candidates_tried: int = 0
+    placed: int = 0
+    unplaced: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["phases_ms"] = {name: round(sec * 1000, 3) for name, sec in data.pop("phases").items()}
+        return data
+
+
+_PHASE_SECONDS = REGISTRY.histogram(
+    "schedule_phase_seconds",
+    "Time spent in each scheduler phase per run.",
+    ("phase",),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.4),
+)
+_WORK = {
+    name: REGISTRY.counter(f"schedule_{name}_total", help)
+    for name, help in (
+        ("slots_scanned", "Slots checked for availability while placing tasks."),
+        ("candidates_tried", "Candidate start positions tried while placing tasks."),
+        ("tasks_placed", "Tasks placed on the grid."),
+        ("tasks_unplaced", "Tasks that did not fit on the grid."),
+    )
+}
+
+
+def _record_stats(stats: ScheduleStats) -> None:
+    for phase, sec in stats.phases.items():
+        _PHASE_SECONDS.observe(sec, phase=phase)
+    _WORK["slots_scanned"].inc(stats.slots_scanned)
+    _WORK["candidates_tried"].inc(stats.candidates_tried)
+    _WORK["tasks_placed"].inc(stats.placed)
+    _WORK["tasks_unplaced"].inc(stats.unplaced)
+
+
 def _sort_tasks(tasks: list[Task], *, day_start: datetime) -> list[Task]:
     """Return *tasks* sorted by priority, start time and duration."""
 
@@ -101,14 +260,33 @@ def _sort_tasks(tasks: list[Task], *, day_start: datetime) -> list[Task]:
     return sorted(tasks, key=key)
 
 
-def _find_slot(slot_map: list[bool], start_idx: int, slots_needed: int) -> int | None:
+def _find_slot(
+    slot_map: list[bool], start_idx: int, slots_needed: int, stats: ScheduleStats | None = None
+) -> int | None:
+    tried = scanned = 0
+    found = None
     for idx in range(start_idx, DAY_SLOTS - slots_needed + 1):
-        if all(not slot_map[i] for i in range(idx, idx + slots_needed)):
-            return idx
-    return None
+        tried += 1
+        for i in range(idx, idx + slots_needed):
+            scanned += 1
+            if slot_map[i]:
+                break
+        else:
+            found = idx
+            break
+    if stats is not None:
+        stats.candidates_tried += tried
+        stats.slots_scanned += scanned
+    return found
 
 
-def _place_tasks(slot_map: list[bool], tasks: list[Task], *, start_utc: datetime) -> tuple[list[str | None], list[str]]:
+def _place_tasks(
+    slot_map: list[bool],
+    tasks: list[Task],
+    *,
+    start_utc: datetime,
+    stats: ScheduleStats | None = None,
+) -> tuple[list[str | None], list[str]]:
     grid: list[str | None] = [None] * DAY_SLOTS
     unplaced: list[str] = []
 
@@ -117,13 +295,16 @@ def _place_tasks(slot_map: list[bool], tasks: list[Task], *, start_utc: datetime
         es = quantize(es, up=True)
         start_idx = max(_to_index(es, base=start_utc), 0)
         need = task.duration_min // SLOT_MIN
-        idx = _find_slot(slot_map, start_idx, need)
+        idx = _find_slot(slot_map, start_idx, need, stats)
         if idx is None:
             unplaced.append(task.id)
             continue
         for i in range(idx, idx + need):
             slot_map[i] = True
             grid[i] = task.id
+    if stats is not None:
+        stats.placed += len(tasks) - len(unplaced)
+        stats.unplaced += len(unplaced)
     return grid, unplaced
 
 
@@ -139,18 +320,99 @@ def generate(
     events: list[Event],
     blocks: list[Block],
     algorithm: Literal["greedy", "compact"] = "greedy",
+    busy: list[tuple[datetime, datetime]] | None = None,
+    stats: ScheduleStats | None = None,
+    busy_map: Callable[[], Sequence[bool]] | None = None,
 ) -> list[str | None]:
-    """Generate a 10 minute schedule for the given day."""
+    """Generate a 10 minute schedule for the given day.
+
+    ``busy_map`` returns the busy map to schedule around (e.g. the memoized
+    :func:`store_busy_map`) and replaces building it from ``events``,
+    ``blocks`` and ``busy``; either way it runs in the ``busy_map`` phase.
+    Phase timings (``busy_map``, ``sort``, ``place``, ``compact``) and work
+    counters are written to ``stats`` when given and always reported to the
+    metrics registry.
+    """
+    if stats is None:
+        stats = ScheduleStats()
     start_utc = date_utc
-    slot_map = _init_slot_map(start_utc, events, blocks)
-    sorted_tasks = _sort_tasks(tasks, day_start=start_utc)
-    grid, _unplaced = _place_tasks(slot_map, sorted_tasks, start_utc=start_utc)
-    if algorithm == "compact":
-        grid = _compact_grid(grid)
+    clock = time.perf_counter
+
+    with tracing.span("schedule.generate", algorithm=algorithm, tasks=len(tasks)) as span:
+        t0 = clock()
+        if busy_map is None:
+            slot_map = _init_slot_map(start_utc, events, blocks, busy)
+        else:
+            slot_map = list(busy_map())
+        t1 = clock()
+        sorted_tasks = _sort_tasks(tasks, day_start=start_utc)
+        t2 = clock()
+        grid, _unplaced = _place_tasks(slot_map, sorted_tasks, start_utc=start_utc, stats=stats)
+        t3 = clock()
+        if algorithm == "compact":
+            grid = _compact_grid(grid)
+        t4 = clock()
+
+        phases = {"busy_map": (t0, t1), "sort": (t1, t2), "place": (t2, t3), "compact": (t3, t4)}
+        for phase, (start, end) in phases.items():
+            stats.phases[phase] = end - start
+            # 計測済みの区間をそのまま子スパンにする
+            tracing.add_span(f"schedule.{phase}", start, end)
+        span.set_attributes(
+            placed=stats.placed,
+            unplaced=stats.unplaced,
+            slots_scanned=stats.slots_scanned,
+            candidates_tried=stats.candidates_tried,
+        )
+    _record_stats(stats)
     return grid
 
 
-def generate_schedule(target_day: date, *, algo: str = "greedy") -> dict:
+def day_window(target_day: date) -> tuple[datetime, datetime]:
+    """Return the ``(start_utc, end_utc)`` grid window for ``target_day``."""
+    start_utc = datetime.combine(target_day, datetime.min.time(), tzinfo=timezone.utc)
+    return start_utc, start_utc + timedelta(days=1)
+
+
+@tracing.traced("schedule.store_scan")
+def _day_inputs(
+    target_day: date, busy: list[tuple[datetime, datetime]] | None = None
+) -> tuple[datetime, list[Event], list[Block]]:
+    """Return ``(start_utc, events, blocks)`` from the in-memory stores."""
+
+    from schedule_app.api.blocks import BLOCKS
+    try:
+        from schedule_app.api.calendar import EVENTS  # calendar.py が EVENTS を保持
+    except ImportError:
+        EVENTS = {}
+
+    start_utc, end_utc = day_window(target_day)
+
+    if busy is not None:
+        events = []
+    else:
+        events = [
+            ev
+            for ev in EVENTS.values()
+            if ev.end_utc > start_utc and ev.start_utc < end_utc and not ev.all_day
+        ]
+    return start_utc, events, list(BLOCKS.values())
+
+
+def warm_busy_map(target_day: date) -> list[bool]:
+    """Build (and memoize) the busy map of ``target_day`` from the stores."""
+
+    return list(store_busy_map(target_day))
+
+
+def generate_schedule(
+    target_day: date,
+    *,
+    algo: str = "greedy",
+    busy: list[tuple[datetime, datetime]] | None = None,
+    fmt: str = "slots",
+    debug: bool = False,
+) -> dict:
     """Return a simple JSON friendly schedule for ``target_day``.
 
     All-day events are ignored when generating the time grid.
@@ -163,26 +425,62 @@ def generate_schedule(target_day: date, *, algo: str = "greedy") -> dict:
     algo:
         Scheduling algorithm to use. Only ``"greedy"`` or ``"compact"`` are
         currently supported.
+    busy:
+        Busy ranges from the Calendar freeBusy API. When given they replace
+        the cached ``EVENTS`` as the calendar busy source.
+    fmt:
+        Grid representation, one of :data:`schedule_format.FORMATS`.
+    debug:
+        Add a ``debug`` member with the run's :class:`ScheduleStats`.
     """
 
-    from schedule_app.api.tasks import TASKS
-    from schedule_app.api.blocks import BLOCKS
-    try:
-        from schedule_app.api.calendar import EVENTS  # calendar.py が EVENTS を保持
-    except ImportError:
-        EVENTS = {}
+    stats = ScheduleStats()
+    slots, grid, unplaced = compute_schedule(target_day, algo=algo, busy=busy, stats=stats)
+    result = {
+        "date": target_day.isoformat(),
+        "algo": algo,
+        **schedule_format.encode(fmt, slots, grid),
+        "unplaced": unplaced,
+    }
+    if debug:
+        result["debug"] = stats.to_dict()
+    return result
 
-    start_utc = datetime.combine(target_day, datetime.min.time(), tzinfo=timezone.utc)
-    end_utc = start_utc + timedelta(days=1)
 
-    events = [
-        ev
-        for ev in EVENTS.values()
-        if ev.end_utc > start_utc and ev.start_utc < end_utc and not ev.all_day
-    ]
+def compute_schedule(
+    target_day: date,
+    *,
+    algo: str = "greedy",
+    busy: list[tuple[datetime, datetime]] | None = None,
+    stats: ScheduleStats | None = None,
+) -> tuple[list[int], list[str | None], list[str]]:
+    """Return ``(slots, grid, unplaced)`` for ``target_day`` from the stores.
+
+    ``slots`` holds the state of each 10 minute slot (``0`` free, ``1`` busy,
+    ``2`` task), ``grid`` the task ID placed in each slot and ``unplaced`` the
+    IDs of tasks that did not fit. See :func:`generate_schedule`.
+    """
+
+    from schedule_app.api.tasks import TASKS
 
     tasks = list(TASKS.values())
-    blocks = list(BLOCKS.values())
+    built: list[Sequence[bool]] = []
+
+    if busy is None:
+        # メモ済みならストアを走査しない
+        start_utc, _end = day_window(target_day)
+        events: list[Event] = []
+        blocks: list[Block] = []
+
+        def build() -> Sequence[bool]:
+            built.append(store_busy_map(target_day))
+            return built[0]
+    else:
+        start_utc, events, blocks = _day_inputs(target_day, busy)
+
+        def build() -> Sequence[bool]:
+            built.append(_init_slot_map(start_utc, events, blocks, busy))
+            return built[0]
 
     grid = generate(
         date_utc=start_utc,
@@ -190,9 +488,11 @@ def generate_schedule(target_day: date, *, algo: str = "greedy") -> dict:
         events=events,
         blocks=blocks,
         algorithm=algo,
+        busy=busy,
+        stats=stats,
+        busy_map=build,
     )
-
-    busy_map = _init_slot_map(start_utc, events, blocks)
+    busy_map = built[0]
 
     slots: list[int] = []
     for idx, cell in enumerate(grid):
@@ -203,10 +503,4 @@ def generate_schedule(target_day: date, *, algo: str = "greedy") -> dict:
 
     placed_ids = {t_id for t_id in grid if t_id is not None}
     unplaced = [t.id for t in tasks if t.id not in placed_ids]
-
-    return {
-        "date": target_day.isoformat(),
-        "algo": algo,
-        "slots": slots,
-        "unplaced": unplaced,
-    }
+    return slots, grid, unplaced
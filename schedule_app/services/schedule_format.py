@@ -0,0 +1,139 @@
+"""Wire formats for generated schedules.
+
+``generate_schedule`` can describe a day's grid in three ways:
+
+``slots`` (default)
+    ``{"slots": [0, 1, 2, ...]}`` – one state per 10 minute slot
+    (``0`` free, ``1`` busy, ``2`` task).
+``rle``
+    ``{"format": "rle", "spans": [[start, length, state, task_id], ...]}`` –
+    runs of equal slots; ``task_id`` is ``null`` unless ``state`` is ``2``.
+    A task's placement is a single span, so the client no longer has to
+    rebuild it from the slot list.
+``packed``
+    ``{"format": "packed", "bits": 2, "states": "<base64>", "placements":
+    [[task_id, start, length], ...]}`` – the states bit-packed four slots per
+    byte (most significant bits first), plus a placements table.
+
+The API picks a format from ``format=`` or the ``Accept`` header (see
+:data:`MEDIA_TYPES`). ``/api/schedule/stream`` sends changes between two
+grids as :func:`diff_spans` – ``rle`` spans covering only the slots that
+changed.
+"""
+
+from __future__ import annotations
+
+import base64
+from typing import Any, Sequence
+
+__all__ = [
+    "FORMATS",
+    "MEDIA_TYPES",
+    "diff_spans",
+    "encode",
+    "expand_spans",
+    "pack_states",
+    "placements",
+    "rle_spans",
+    "unpack_states",
+]
+
+FORMATS = ("slots", "rle", "packed")
+
+# Accept ヘッダーで選べるメディアタイプ（slots は通常の JSON）
+MEDIA_TYPES = {
+    "slots": "application/json",
+    "rle": "application/vnd.schedule.rle+json",
+    "packed": "application/vnd.schedule.packed+json",
+}
+
+_BITS = 2
+_PER_BYTE = 8 // _BITS
+_MASK = (1 << _BITS) - 1
+
+
+def rle_spans(slots: Sequence[int], grid: Sequence[str | None]) -> list[list[Any]]:
+    """Return ``[start, length, state, task_id]`` runs of ``slots``/``grid``."""
+    spans: list[list[Any]] = []
+    for i, (state, task_id) in enumerate(zip(slots, grid)):
+        if spans and spans[-1][2] == state and spans[-1][3] == task_id:
+            spans[-1][1] += 1
+        else:
+            spans.append([i, 1, state, task_id])
+    return spans
+
+
+def expand_spans(spans: Sequence[Sequence[Any]]) -> tuple[list[int], list[str | None]]:
+    """Inverse of :func:`rle_spans`: return ``(slots, grid)``."""
+    slots: list[int] = []
+    grid: list[str | None] = []
+    for _start, length, state, task_id in spans:
+        slots.extend([state] * length)
+        grid.extend([task_id] * length)
+    return slots, grid
+
+
+def pack_states(slots: Sequence[int]) -> str:
+    """Return ``slots`` packed two bits per slot, base64 encoded."""
+    packed = bytearray((len(slots) + _PER_BYTE - 1) // _PER_BYTE)
+    for i, state in enumerate(slots):
+        packed[i // _PER_BYTE] |= (state & _MASK) << (8 - _BITS * (i % _PER_BYTE + 1))
+    return base64.b64encode(bytes(packed)).decode("ascii")
+
+
+def unpack_states(data: str, count: int) -> list[int]:
+    """Inverse of :func:`pack_states` for ``count`` slots."""
+    packed = base64.b64decode(data)
+    return [
+        (packed[i // _PER_BYTE] >> (8 - _BITS * (i % _PER_BYTE + 1))) & _MASK
+        for i in range(count)
+    ]
+
+
+def placements(grid: Sequence[str | None]) -> list[list[Any]]:
+    """Return ``[task_id, start, length]`` for every task run in ``grid``."""
+    return [
+        [task_id, start, length]
+        for start, length, _state, task_id in rle_spans([0] * len(grid), grid)
+        if task_id is not None
+    ]
+
+
+def diff_spans(
+    old_slots: Sequence[int],
+    old_grid: Sequence[str | None],
+    slots: Sequence[int],
+    grid: Sequence[str | None],
+) -> list[list[Any]]:
+    """Return ``[start, length, state, task_id]`` runs where the grids differ.
+
+    Applying the runs to the old grid (see :func:`expand_spans`) yields the
+    new one.
+    """
+    spans: list[list[Any]] = []
+    for i, (old, new) in enumerate(zip(zip(old_slots, old_grid), zip(slots, grid))):
+        if old == new:
+            continue
+        state, task_id = new
+        last = spans[-1] if spans else None
+        if last and last[0] + last[1] == i and last[2] == state and last[3] == task_id:
+            last[1] += 1
+        else:
+            spans.append([i, 1, state, task_id])
+    return spans
+
+
+def encode(fmt: str, slots: Sequence[int], grid: Sequence[str | None]) -> dict[str, Any]:
+    """Return the response members describing the grid in format ``fmt``."""
+    if fmt == "slots":
+        return {"slots": list(slots)}
+    if fmt == "rle":
+        return {"format": "rle", "spans": rle_spans(slots, grid)}
+    if fmt == "packed":
+        return {
+            "format": "packed",
+            "bits": _BITS,
+            "states": pack_states(slots),
+            "placements": placements(grid),
+        }
+    raise ValueError(f"unknown schedule format: {fmt}")
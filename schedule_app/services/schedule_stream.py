@@ -0,0 +1,113 @@
+"""Server-Sent Events feed behind ``GET /api/schedule/stream``.
+
+:func:`schedule_events` yields SSE messages for one day:
+
+``event: schedule``
+    Sent first (and after every reconnect): the same members as
+    ``/api/schedule/generate`` in the requested format.
+``event: diff``
+    Sent after the stores changed: ``{"date", "spans", "unplaced"}`` where
+    ``spans`` are :func:`~schedule_app.services.schedule_format.diff_spans`
+    covering only the slots that changed. Nothing is sent when a change
+    leaves the schedule as it was.
+
+Changes are picked up from :mod:`schedule_app.services.changes` and
+debounced, so a burst of edits costs one regeneration and one push. The
+regenerated schedule is shared per ``(day, algo, store version)``: all
+streams that see the same change use one :func:`schedule.compute_schedule`
+run, however many tabs are open. A comment
+line is sent every ``heartbeat`` seconds of silence to keep proxies from
+closing the connection, and the stream ends after ``lifetime`` seconds; the
+browser's ``EventSource`` reconnects on its own. Each open stream occupies a
+server thread for its lifetime, so streaming needs a threaded WSGI server or
+:mod:`schedule_app.asgi` with enough ``ASGI_THREADS``.
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import date
+from typing import Any, Callable, Iterator
+
+from schedule_app.services import changes, schedule, schedule_format
+from schedule_app.services.cache import TTLCache
+from schedule_app.utils.fastjson import dumps_bytes
+
+__all__ = ["invalidate", "schedule_events", "shared_schedule", "sse"]
+
+# EventSource が再接続するまでの待ち時間 (ms)
+RETRY_MS = 3000
+
+# (day, algo, store version) → compute_schedule の結果。古い版は LRU で消える
+_RESULTS = TTLCache("schedule.stream", maxsize=64)
+
+
+def shared_schedule(target_day: date, algo: str = "greedy") -> tuple[int, tuple]:
+    """Return ``(version, compute_schedule result)`` at the current version.
+
+    Concurrent callers for the same day, algorithm and version wait for a
+    single computation and get the same (read-only) result.
+    """
+    seen = changes.version()
+    result = _RESULTS.get_or_load(
+        (target_day, algo, seen), lambda: schedule.compute_schedule(target_day, algo=algo)
+    )
+    return seen, result
+
+
+def invalidate() -> None:
+    """Drop the shared schedules (for tests that edit the stores directly)."""
+    _RESULTS.invalidate()
+
+
+def sse(event: str, data: Any, *, id: int | None = None, retry: int | None = None) -> str:
+    """Return one SSE message carrying ``data`` as compact JSON."""
+    lines = []
+    if retry is not None:
+        lines.append(f"retry: {retry}")
+    if id is not None:
+        lines.append(f"id: {id}")
+    lines.append(f"event: {event}")
+    lines.append("data: " + dumps_bytes(data).decode())
+    return "\n".join(lines) + "\n\n"
+
+
+def schedule_events(
+    target_day: date,
+    *,
+    algo: str = "greedy",
+    fmt: str = "slots",
+    debounce: float = 0.2,
+    heartbeat: float = 15.0,
+    lifetime: float = 300.0,
+    clock: Callable[[], float] = time.monotonic,
+) -> Iterator[str]:
+    """Yield the SSE messages of the schedule stream for ``target_day``.
+
+    Once changes start, a push happens when they pause for ``debounce``
+    seconds, and at the latest ``5 * debounce`` seconds after the first one.
+    """
+    day = target_day.isoformat()
+    seen, (slots, grid, unplaced) = shared_schedule(target_day, algo)
+    yield sse(
+        "schedule",
+        {"date": day, **schedule_format.encode(fmt, slots, grid), "unplaced": unplaced},
+        id=seen,
+        retry=RETRY_MS,
+    )
+
+    end = clock() + lifetime
+    while True:
+        left = end - clock()
+        if left <= 0:
+            return
+        latest = changes.wait(seen, min(heartbeat, left))
+        if latest == seen:
+            yield ": keepalive\n\n"
+            continue
+        changes.settle(latest, debounce, limit=debounce * 5)
+        seen, (new_slots, new_grid, new_unplaced) = shared_schedule(target_day, algo)
+        spans = schedule_format.diff_spans(slots, grid, new_slots, new_grid)
+        if spans or new_unplaced != unplaced:
+            yield sse("diff", {"date": day, "spans": spans, "unplaced": new_unplaced}, id=seen)
+        slots, grid, unplaced = new_slots, new_grid, new_unplaced
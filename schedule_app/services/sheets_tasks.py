@@ -2,117 +2,266 @@ from __future__ import annotations
 
 from typing import Any
 import math
-import time
-import uuid
-
-from google.oauth2.credentials import Credentials  # type: ignore
-from googleapiclient.discovery import build  # type: ignore
 
 from schedule_app.config import cfg
-from schedule_app.models import Task
-from schedule_app.utils.validation import _parse_dt, _validate_durations
+from schedule_app.errors import InvalidBlockRow
+from schedule_app.models import Block, Task
+from schedule_app.services.google_client import (
+    GoogleAPIUnauthorized,
+    fetch_blocks_from_sheet,
+    fetch_sheet_values,
+    fetch_sheet_values_async,
+    hold_blocks,
+    new_sheet_cache,
+    read_sheet_ranges,
+    store_blocks_rows,
+    user_key as _user_key,
+)
+from schedule_app.services import tracing
+from schedule_app.services.cache import ParseMemo
+from schedule_app.utils.sheet_rows import (
+    Columns,
+    parse_datetime_column,
+    range_first_row,
+    row_ids,
+)
+from schedule_app.utils.validation import _validate_durations
 
 
 class InvalidSheetRowError(Exception):
-    """Raised when a sheet row contains invalid data."""
+    """Raised when a sheet row contains invalid data.
 
+    ``errors`` lists every invalid cell of a sheet import as
+    ``{"row", "field", "detail"}`` dictionaries.
+    """
 
+    def __init__(self, message: str, *, errors: list[dict] | None = None) -> None:
+        super().__init__(message)
+        self.errors = errors or []
 
 
-# Simple in-memory cache (tasks, expiry timestamp)
-_CACHE: tuple[list[Task], float] | None = None
+# tasks sheet cache keyed by (user, spreadsheet id, range)
+_CACHE = new_sheet_cache("sheets.tasks")
 
+# last raw rows (digest / ETag) and their parsed tasks, per cache key
+_PARSED = ParseMemo()
 
 
+def _int_cell(raw: Any, default: str) -> int:
+    return int(default if raw is None else raw)
 
-def _to_task(data: dict[str, str]) -> Task:
-    """Return a :class:`Task` converted from a sheet row dictionary."""
 
-    try:
-        raw_min = int(data.get("duration_min", "0"))
-    except ValueError as e:  # pragma: no cover - invalid sheet data
-        raise InvalidSheetRowError("invalid duration") from e
+def parse_task_rows(rows: list[list[str]], *, first_row: int = 1) -> list[Task]:
+    """Return tasks parsed from raw sheet ``rows`` (header row first).
 
-    try:
-        raw_raw_min = int(data.get("duration_raw_min", str(raw_min)))
-    except ValueError as e:  # pragma: no cover - invalid sheet data
-        raise InvalidSheetRowError("invalid duration") from e
+    Durations are rounded up to 10 minutes, the priority defaults to ``B``
+    and rows without an ``id`` get one derived from title and category. Every
+    invalid row is collected and reported together through
+    :class:`InvalidSheetRowError` ``errors``; ``first_row`` is the sheet row
+    number of the header.
+    """
 
-    try:
-        _validate_durations(raw_min, raw_raw_min)
-    except ValueError as e:
-        raise InvalidSheetRowError("invalid duration") from e
+    cols = Columns(rows, first_row=first_row)
+    n = len(cols)
 
-    duration_min = math.ceil(raw_min / 10) * 10
+    minutes: list[tuple[int, int] | None] = [None] * n
+    for i, (raw, raw_raw) in enumerate(zip(cols.column("duration_min"), cols.column("duration_raw_min"))):
+        try:
+            raw_min = _int_cell(raw, "0")
+            raw_raw_min = _int_cell(raw_raw, str(raw_min))
+            _validate_durations(raw_min, raw_raw_min)
+        except ValueError:
+            cols.error(i, "duration_min", "invalid duration")
+            continue
+        minutes[i] = (math.ceil(raw_min / 10) * 10, raw_raw_min)
 
-    priority = data.get("priority", "B").strip().upper() or "B"
-    if priority not in {"A", "B"}:
-        raise InvalidSheetRowError("invalid priority")
+    priorities: list[str] = []
+    for i, raw in enumerate(cols.column("priority")):
+        priority = (raw if raw is not None else "B").strip().upper() or "B"
+        if priority not in {"A", "B"}:
+            cols.error(i, "priority", "invalid priority")
+        priorities.append(priority)
 
-    earliest = (data.get("earliest_start_utc", "") or "").strip()
-    try:
-        es_dt = _parse_dt(earliest)
-    except ValueError as e:
-        raise InvalidSheetRowError("invalid datetime") from e
+    earliest = parse_datetime_column(cols, "earliest_start_utc")
 
-    task_id = data.get("id") or str(uuid.uuid4())
+    if cols.errors:
+        raise InvalidSheetRowError(cols.summary(), errors=[e.to_dict() for e in cols.errors])
 
-    return Task(
-        id=task_id,
-        title=data.get("title", ""),
-        category=data.get("category", ""),
-        duration_min=duration_min,
-        duration_raw_min=raw_raw_min,
-        priority=priority,
-        earliest_start_utc=es_dt,
-    )
+    titles = [t if t is not None else "" for t in cols.column("title")]
+    categories = [c if c is not None else "" for c in cols.column("category")]
+    # id 列が空の行はタイトルとカテゴリから決定的に ID を作る
+    generated = row_ids("task", zip(titles, categories))
+
+    tasks: list[Task] = []
+    for i, task_id in enumerate(cols.column("id")):
+        duration_min, duration_raw_min = minutes[i]
+        tasks.append(
+            Task(
+                id=task_id or str(generated[i]),
+                title=titles[i],
+                category=categories[i],
+                duration_min=duration_min,
+                duration_raw_min=duration_raw_min,
+                priority=priorities[i],
+                earliest_start_utc=earliest[i],
+            )
+        )
+    return tasks
 
 
+def _task_parser(cell_range: str):
+    first_row = range_first_row(cell_range)
+    return lambda rows: parse_task_rows(rows, first_row=first_row)
+
+
+def _session_token(session: dict[str, Any]) -> str | None:
+    creds_info = session.get("credentials")
+    if not creds_info:
+        raise RuntimeError("missing credentials")
+    return creds_info.get("access_token")
+
+
+def tasks_cache_key(token: str | None, ssid: str, cell_range: str) -> tuple[str | None, str, str]:
+    return (_user_key(token), ssid, cell_range)
+
+
+@tracing.traced("sheets.tasks")
 def fetch_tasks_from_sheet(session: dict[str, Any], *, force: bool = False) -> list[Task]:
-    """Return tasks fetched from Google Sheets."""
+    """Return tasks fetched from Google Sheets.
 
-    global _CACHE
+    Results are cached per user, spreadsheet and range in :data:`_CACHE`
+    with the stale-while-revalidate, stale-if-error and single-flight policy
+    of :class:`~schedule_app.services.cache.TTLCache`. ``force`` skips the
+    cached value but still joins an in-flight request.
+    """
 
-    now = time.time()
-    if _CACHE is not None and not force:
-        tasks, expiry = _CACHE
-        if now < expiry:
-            return tasks
+    ssid = cfg.SHEETS_TASKS_SSID
+    if not ssid:
+        return []
+
+    cell_range = cfg.SHEETS_TASKS_RANGE
+    token = _session_token(session)
+    key = tasks_cache_key(token, ssid, cell_range)
+
+    def load() -> list[Task]:
+        values, etag = fetch_sheet_values(
+            ssid, [cell_range], token=token, etag=_PARSED.etag(key)
+        )
+        if values is None:
+            cached = _PARSED.reuse(key)
+            if cached is not None:
+                return cached
+            # 304 の後でメモが消えていた。ETag なしで読み直す
+            values, etag = fetch_sheet_values(ssid, [cell_range], token=token)
+        return _PARSED.parse(key, values[0], _task_parser(cell_range), etag=etag)
+
+    return _CACHE.get_or_load(
+        key,
+        load,
+        force=force,
+        passthrough=(InvalidSheetRowError, GoogleAPIUnauthorized),
+    )
+
+
+@tracing.traced("sheets.tasks")
+async def fetch_tasks_from_sheet_async(
+    session: dict[str, Any], *, force: bool = False
+) -> list[Task]:
+    """Awaitable :func:`fetch_tasks_from_sheet` sharing the same caches."""
 
     ssid = cfg.SHEETS_TASKS_SSID
     if not ssid:
         return []
 
-    creds_info = session.get("credentials")
-    if not creds_info:
-        raise RuntimeError("missing credentials")
+    cell_range = cfg.SHEETS_TASKS_RANGE
+    token = _session_token(session)
+    key = tasks_cache_key(token, ssid, cell_range)
+
+    async def load() -> list[Task]:
+        values, etag = await fetch_sheet_values_async(
+            ssid, [cell_range], token=token, etag=_PARSED.etag(key)
+        )
+        if values is None:
+            cached = _PARSED.reuse(key)
+            if cached is not None:
+                return cached
+            # 304 の後でメモが消えていた。ETag なしで読み直す
+            values, etag = await fetch_sheet_values_async(ssid, [cell_range], token=token)
+        return _PARSED.parse(key, values[0], _task_parser(cell_range), etag=etag)
+
+    return await _CACHE.get_or_load_async(
+        key,
+        load,
+        force=force,
+        passthrough=(InvalidSheetRowError, GoogleAPIUnauthorized),
+    )
 
-    creds = Credentials(token=creds_info.get("access_token"))
-    service = build("sheets", "v4", credentials=creds, cache_discovery=False)
-    resp = (
-        service.spreadsheets()
-        .values()
-        .get(spreadsheetId=ssid, range=cfg.SHEETS_TASKS_RANGE)
-        .execute()
+
+def fetch_tasks_and_blocks(
+    session: dict[str, Any], *, force: bool = False
+) -> tuple[list[Task], list[Block]]:
+    """Return tasks and blocks, sharing one ``batchGet`` when possible.
+
+    When ``SHEETS_TASKS_SSID`` and ``BLOCKS_SHEET_ID`` name the same
+    spreadsheet both ranges are read in a single request, run as the loader
+    of the tasks cache entry, and the blocks cache is filled from the same
+    response. The batched read therefore gets the tasks cache's single-flight,
+    stale-while-revalidate and stale-if-error handling. Otherwise each loader
+    runs on its own.
+    """
+
+    ssid = cfg.SHEETS_TASKS_SSID
+    block_range = cfg.SHEETS_BLOCK_RANGE
+    if not ssid or ssid != cfg.BLOCKS_SHEET_ID:
+        tasks = fetch_tasks_from_sheet(session, force=force)
+        return tasks, fetch_blocks_from_sheet(cfg.BLOCKS_SHEET_ID, block_range, force=force)
+
+    task_range = cfg.SHEETS_TASKS_RANGE
+    token = _session_token(session)
+    key = tasks_cache_key(token, ssid, task_range)
+
+    def load() -> list[Task]:
+        task_rows, block_rows = read_sheet_ranges(ssid, [task_range, block_range], token=token)
+        tasks = _PARSED.parse(key, task_rows, _task_parser(task_range))
+        store_blocks_rows(ssid, block_range, block_rows)
+        return tasks
+
+    tasks = _CACHE.get_or_load(
+        key,
+        load,
+        force=force,
+        passthrough=(InvalidSheetRowError, InvalidBlockRow, GoogleAPIUnauthorized),
     )
+    # 直前のロードで埋まっていればキャッシュから返る。古いタスクで凌いだ
+    # 場合はブロック側のキャッシュが自身の窓で判断する
+    return tasks, fetch_blocks_from_sheet(ssid, block_range)
 
-    rows = resp.get("values", [])
-    tasks: list[Task] = []
-    if rows:
-        headers = [str(h).strip().lower() for h in rows[0]]
-        for row in rows[1:]:
-            data = {headers[i]: row[i] for i in range(min(len(headers), len(row)))}
-            tasks.append(_to_task(data))
 
-    _CACHE = (tasks, now + cfg.SHEETS_CACHE_SEC)
-    return tasks
+def hold_sheets(session: dict[str, Any], seconds: float) -> None:
+    """Keep the cached tasks and blocks servable for ``seconds``.
+
+    See :meth:`~schedule_app.services.cache.TTLCache.hold`; the cache warmer
+    uses this so its prefetch outlives the normal cache windows.
+    """
+
+    if cfg.SHEETS_TASKS_SSID:
+        key = tasks_cache_key(_session_token(session), cfg.SHEETS_TASKS_SSID, cfg.SHEETS_TASKS_RANGE)
+        _CACHE.hold(key, seconds)
+    hold_blocks(cfg.BLOCKS_SHEET_ID, cfg.SHEETS_BLOCK_RANGE, seconds)
 
 
 def invalidate_cache() -> None:
     """Clear the in-memory tasks cache."""
 
-    global _CACHE
-    _CACHE = None
+    _CACHE.invalidate()
 
 
-__all__ = ["fetch_tasks_from_sheet", "InvalidSheetRowError", "invalidate_cache"]
+__all__ = [
+    "fetch_tasks_from_sheet",
+    "fetch_tasks_from_sheet_async",
+    "fetch_tasks_and_blocks",
+    "hold_sheets",
+    "parse_task_rows",
+    "InvalidSheetRowError",
+    "invalidate_cache",
+]
@@ -0,0 +1,71 @@
+"""Diff-apply imported rows onto the in-memory stores.
+
+Sheet imports used to clear a store and refill it, so every import looked
+like a complete replacement. Rows now carry stable IDs (see
+:func:`schedule_app.utils.sheet_rows.row_id`), which lets an import be
+compared with the store instead: unchanged entries keep their existing
+object and the caller learns which IDs were added, changed or removed, so
+only the caches those entries touch need to be invalidated.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+
+__all__ = ["StoreDiff", "apply_diff"]
+
+
+@dataclass(slots=True, frozen=True)
+class StoreDiff:
+    """IDs added, changed and removed by :func:`apply_diff`."""
+
+    added: tuple[str, ...] = ()
+    changed: tuple[str, ...] = ()
+    removed: tuple[str, ...] = ()
+    # 追加・変更・削除された要素（変更は旧版と新版の両方）
+    touched: tuple[Any, ...] = field(default=(), repr=False, compare=False)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    def counts(self) -> dict[str, int]:
+        return {"added": len(self.added), "changed": len(self.changed), "removed": len(self.removed)}
+
+    def to_dict(self) -> dict[str, list[str]]:
+        return {"added": list(self.added), "changed": list(self.changed), "removed": list(self.removed)}
+
+
+def apply_diff(store: dict[str, Any], items: Iterable[Any]) -> StoreDiff:
+    """Make ``store`` hold exactly ``items`` (keyed by ``.id``) and return the diff.
+
+    The store keeps the order of ``items``; entries equal to what is already
+    stored keep the stored object. When a later item repeats an ID it wins,
+    as it did with the old clear-and-refill import.
+    """
+
+    incoming: dict[str, Any] = {}
+    for item in items:
+        incoming[item.id] = item
+
+    added: list[str] = []
+    changed: list[str] = []
+    touched: list[Any] = []
+    for key, item in incoming.items():
+        old = store.get(key)
+        if old is None:
+            added.append(key)
+            touched.append(item)
+        elif old != item:
+            changed.append(key)
+            touched.extend((old, item))
+        else:
+            incoming[key] = old
+    removed = [key for key in store if key not in incoming]
+    touched.extend(store[key] for key in removed)
+
+    if added or changed or removed or list(store) != list(incoming):
+        store.clear()
+        store.update(incoming)
+
+    return StoreDiff(tuple(added), tuple(changed), tuple(removed), tuple(touched))
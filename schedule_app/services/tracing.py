@@ -0,0 +1,500 @@
+"""Lightweight tracing with nested spans.
+
+:func:`span` opens a span as a child of the current one (kept in a context
+variable, so it follows ``contextvars.copy_context()`` into thread pools and
+asyncio tasks). :func:`init_tracing` opens a root span per request and
+continues a W3C ``traceparent`` header when the caller sends one. Google
+calls, the sheet loaders, the store scan and the scheduler phases add their
+own spans below it.
+
+Sampling is decided once per trace: with probability ``TRACE_SAMPLE_RATE``
+the root span records, otherwise it and everything below it are no-ops that
+never allocate a span. When ``TRACE_EXPORTER`` is unset, :func:`span` returns
+the shared no-op right away. Finished spans are queued and written in
+batches by a background thread, either as JSON lines
+(``TRACE_EXPORTER=jsonl``, file ``TRACE_FILE``) or as OTLP/HTTP JSON to a
+collector (``TRACE_EXPORTER=otlp``, ``TRACE_OTLP_ENDPOINT``).
+"""
+
+from __future__ import annotations
+
+import inspect
+import queue
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar, Token
+from functools import wraps
+from typing import Any, Callable, TypeVar
+from urllib import request as urlrequest
+
+from schedule_app.services.metrics import log_metric
+from schedule_app.utils.fastjson import dumps_bytes
+
+__all__ = [
+    "JsonlExporter",
+    "OtlpExporter",
+    "Span",
+    "Tracer",
+    "add_span",
+    "configure",
+    "current_span",
+    "init_tracing",
+    "shutdown",
+    "span",
+    "traced",
+]
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# OTLP の SpanKind
+KINDS = {"internal": 1, "server": 2, "client": 3}
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class _NoopSpan:
+    """Stands in for a span that is not recorded."""
+
+    recording = False
+    trace_id = span_id = None
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        return None
+
+    def set_attributes(self, **attributes: Any) -> None:
+        return None
+
+    def traceparent(self) -> str | None:
+        return None
+
+
+class _Unsampled(_NoopSpan):
+    """Root of a trace that was not sampled; keeps its children silent."""
+
+    def __init__(self) -> None:
+        self._token: Token | None = None
+
+    def __enter__(self) -> "_Unsampled":
+        self._token = _CURRENT.set(self)
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        _reset(self._token)
+        self._token = None
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    """One timed operation; use as a context manager."""
+
+    recording = True
+
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "name",
+        "kind",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "error",
+        "_token",
+        "_tracer",
+    )
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        *,
+        trace_id: str,
+        parent_id: str | None,
+        kind: str = "internal",
+        attributes: dict[str, Any] | None = None,
+        start_ns: int | None = None,
+    ) -> None:
+        self._tracer = tracer
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes or {}
+        self.start_ns = start_ns if start_ns is not None else time.time_ns()
+        self.end_ns: int | None = None
+        self.error: str | None = None
+        self._token: Token | None = None
+
+    def __enter__(self) -> "Span":
+        self._token = _CURRENT.set(self)
+        return self
+
+    def __exit__(self, exc_type: Any, exc: BaseException | None, tb: Any) -> None:
+        self.end(exc)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def traceparent(self) -> str:
+        """Return the W3C ``traceparent`` header naming this span."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def end(self, exc: BaseException | None = None, *, end_ns: int | None = None) -> None:
+        """Finish the span and hand it to the exporter (idempotent)."""
+        if self.end_ns is not None:
+            return
+        self.end_ns = end_ns if end_ns is not None else time.time_ns()
+        if exc is not None:
+            self.error = f"{type(exc).__name__}: {exc}"
+        _reset(self._token)
+        self._token = None
+        self._tracer.submit(self)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the span as one flat JSON-lines record."""
+        end_ns = self.end_ns or self.start_ns
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "end_ns": end_ns,
+            "duration_ms": round((end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+_CURRENT: ContextVar[Span | _Unsampled | None] = ContextVar("trace_span", default=None)
+_TRACER: "Tracer | None" = None
+
+
+def _reset(token: Token | None) -> None:
+    if token is None:
+        return
+    try:
+        _CURRENT.reset(token)
+    except ValueError:  # pragma: no cover - ended in another context
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Exporters
+# ---------------------------------------------------------------------------
+class JsonlExporter:
+    """Append spans to ``path``, one JSON object per line."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def export(self, spans: list[Span]) -> None:
+        with open(self.path, "ab") as fh:
+            fh.write(b"".join(dumps_bytes(s.to_dict()) + b"\n" for s in spans))
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict[str, Any]) -> list[dict[str, Any]]:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items()]
+
+
+class OtlpExporter:
+    """POST spans to an OTLP/HTTP collector using the JSON encoding."""
+
+    def __init__(self, endpoint: str, *, service_name: str = "schedule-app", timeout: float = 5.0) -> None:
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def payload(self, spans: list[Span]) -> dict[str, Any]:
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "schedule_app"},
+                            "spans": [self._span(s) for s in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    @staticmethod
+    def _span(s: Span) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": KINDS.get(s.kind, 1),
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns or s.start_ns),
+            "attributes": _otlp_attributes(s.attributes),
+        }
+        if s.parent_id:
+            data["parentSpanId"] = s.parent_id
+        if s.error:
+            data["status"] = {"code": 2, "message": s.error}
+        return data
+
+    def export(self, spans: list[Span]) -> None:
+        req = urlrequest.Request(
+            self.endpoint,
+            data=dumps_bytes(self.payload(spans)),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urlrequest.urlopen(req, timeout=self.timeout) as resp:
+            resp.read()
+
+
+# ---------------------------------------------------------------------------
+# Tracer
+# ---------------------------------------------------------------------------
+class Tracer:
+    """Sampling decision plus a background thread exporting finished spans."""
+
+    def __init__(
+        self,
+        exporter: Any,
+        *,
+        sample_rate: float = 1.0,
+        batch_size: int = 256,
+        interval: float = 1.0,
+    ) -> None:
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue: queue.SimpleQueue[Span | None] = queue.SimpleQueue()
+        self._pending = 0
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def sample(self) -> bool:
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def submit(self, span: Span) -> None:
+        with self._cond:
+            self._pending += 1
+        self._queue.put(span)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch: list[Span] = []
+            # 最初のスパンから interval 秒 (または batch_size 件) までまとめて書き出す
+            linger_until = time.monotonic() + self.interval
+            while item is not None:
+                batch.append(item)
+                left = linger_until - time.monotonic()
+                if len(batch) >= self.batch_size or left <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=left)
+                except queue.Empty:
+                    break
+            if batch:
+                self._export(batch)
+            if item is None:
+                return
+
+    def _export(self, batch: list[Span]) -> None:
+        try:
+            self.exporter.export(batch)
+        except Exception as exc:  # エクスポート失敗でリクエスト処理を止めない
+            log_metric("trace_export_error", {"error": type(exc).__name__, "spans": len(batch)})
+        with self._cond:
+            self._pending -= len(batch)
+            self._cond.notify_all()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every submitted span has been exported."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending == 0, timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+
+def configure(
+    exporter: Any | None, *, sample_rate: float = 1.0, **kwargs: Any
+) -> Tracer | None:
+    """Install a tracer exporting to ``exporter`` (``None`` disables tracing)."""
+    global _TRACER
+    shutdown()
+    _TRACER = Tracer(exporter, sample_rate=sample_rate, **kwargs) if exporter is not None else None
+    return _TRACER
+
+
+def shutdown(timeout: float = 5.0) -> None:
+    """Export the queued spans and stop the tracer."""
+    global _TRACER
+    tracer, _TRACER = _TRACER, None
+    if tracer is not None:
+        # 終了マーカーで待機中のバッチもすぐに書き出される
+        tracer.close(timeout)
+
+
+# ---------------------------------------------------------------------------
+# Span API
+# ---------------------------------------------------------------------------
+def current_span() -> Span | _NoopSpan:
+    """Return the active span (a no-op when nothing is recorded)."""
+    return _CURRENT.get() or _NOOP
+
+
+def span(
+    name: str,
+    *,
+    kind: str = "internal",
+    traceparent: str | None = None,
+    **attributes: Any,
+) -> Span | _NoopSpan:
+    """Return a span named ``name`` below the current one.
+
+    Without a current span a new trace is started: it continues
+    ``traceparent`` (keeping the caller's sampling decision) when that header
+    is valid, otherwise it is sampled at the configured rate.
+    """
+    tracer = _TRACER
+    if tracer is None:
+        return _NOOP
+    parent = _CURRENT.get()
+    if parent is not None:
+        if not parent.recording:
+            return _NOOP
+        return Span(tracer, name, trace_id=parent.trace_id, parent_id=parent.span_id, kind=kind, attributes=attributes)
+
+    match = _TRACEPARENT_RE.match(traceparent or "")
+    if match:
+        trace_id, parent_id, flags = match.groups()
+        if not int(flags, 16) & 1:
+            return _Unsampled()
+        return Span(tracer, name, trace_id=trace_id, parent_id=parent_id, kind=kind, attributes=attributes)
+    if not tracer.sample():
+        return _Unsampled()
+    return Span(tracer, name, trace_id=f"{random.getrandbits(128):032x}", parent_id=None, kind=kind, attributes=attributes)
+
+
+def add_span(name: str, start: float, end: float, **attributes: Any) -> None:
+    """Record an already timed child span; ``start``/``end`` are ``perf_counter()`` values."""
+    parent = _CURRENT.get()
+    tracer = _TRACER
+    if tracer is None or parent is None or not parent.recording:
+        return
+    # perf_counter → 壁時計 (ns) の差分は呼び出し時点で求める
+    offset = time.time_ns() - time.perf_counter_ns()
+    child = Span(
+        tracer,
+        name,
+        trace_id=parent.trace_id,
+        parent_id=parent.span_id,
+        attributes=attributes,
+        start_ns=offset + int(start * 1e9),
+    )
+    child.end(end_ns=offset + int(end * 1e9))
+
+
+def traced(name: str, *, kind: str = "internal") -> Callable[[F], F]:
+    """Decorate a function or coroutine function to run inside :func:`span`."""
+
+    def decorate(fn: F) -> F:
+        if inspect.iscoroutinefunction(fn):
+
+            @wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with span(name, kind=kind):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name, kind=kind):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+# ---------------------------------------------------------------------------
+# Flask integration
+# ---------------------------------------------------------------------------
+# WSGI environ key holding the request's root span
+_ROOT = "schedule_app.trace_span"
+
+
+def _exporter_from_config(config: Any) -> Any | None:
+    kind = (config.get("TRACE_EXPORTER") or "").lower()
+    if kind == "jsonl":
+        return JsonlExporter(config["TRACE_FILE"])
+    if kind == "otlp":
+        return OtlpExporter(config["TRACE_OTLP_ENDPOINT"])
+    if kind:
+        raise ValueError(f"unknown TRACE_EXPORTER: {kind}")
+    return None
+
+
+def init_tracing(app: Any) -> None:
+    """Open a root span per request of ``app`` when tracing is configured."""
+    from flask import request
+
+    exporter = _exporter_from_config(app.config)
+    if exporter is None:
+        return
+    configure(exporter, sample_rate=float(app.config["TRACE_SAMPLE_RATE"]))
+
+    @app.before_request
+    def start_request_span():
+        rule = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        root = span(
+            f"{request.method} {rule}",
+            kind="server",
+            traceparent=request.headers.get("traceparent"),
+            **{"http.method": request.method, "http.route": rule},
+        )
+        request.environ[_ROOT] = root.__enter__()
+
+    @app.after_request
+    def tag_request_span(response):
+        root = request.environ.get(_ROOT)
+        if root is not None:
+            root.set_attribute("http.status_code", response.status_code)
+            if root.recording:
+                response.headers["traceparent"] = root.traceparent()
+        return response
+
+    @app.teardown_request
+    def end_request_span(exc):
+        root = request.environ.pop(_ROOT, None)
+        if root is not None:
+            root.__exit__(type(exc) if exc else None, exc, None)
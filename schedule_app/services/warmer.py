@@ -0,0 +1,290 @@
+"""Opt-in background cache warmer.
+
+When ``WARMER_ENABLED=1`` a daemon thread wakes up at the local times in
+``WARMER_TIMES`` and, for every user seen recently, prefetches the calendar
+events, the tasks/blocks sheets and the busy map for today and the next
+``WARMER_DAYS_AHEAD`` days. The first request of the morning then hits warm
+caches instead of waiting on Google.
+
+Google calls go through the usual retry policy and circuit breakers; a source
+whose breaker is open is skipped for the run, users are processed one at a
+time with a pause in between, and each warm-up runs under its own deadline.
+:func:`status` feeds the ``/api/ready`` endpoint.
+
+Only the credentials of sessions that made a request are known to the
+warmer; access tokens expire, so a user who has been away for longer than
+the token lifetime is reported as ``unauthorized`` until they come back.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Any, Callable
+
+try:
+    import schedule_app.config as config_module
+except Exception:  # pragma: no cover - missing env vars in some test runs
+    config_module = None
+
+from schedule_app.services import deadline, resilience
+from schedule_app.services.google_client import (
+    GoogleAPIUnauthorized,
+    GoogleClient,
+    hold_day_events,
+    load_day_events,
+    user_key,
+)
+from schedule_app.services.metrics import log_metric
+from schedule_app.utils.timecodec import get_zone, localize
+
+__all__ = ["Warmer", "get_warmer", "status"]
+
+# source name → circuit breaker endpoint it depends on
+_ENDPOINTS = {"calendar": "calendar.events", "sheets": "sheets.values"}
+
+# 1 ユーザー・1 日分の先読みに許す時間
+_WARM_BUDGET_SEC = 30.0
+
+
+def _setting(name: str, default: Any) -> Any:
+    if config_module is None:
+        return default
+    return getattr(config_module.cfg, name, default)
+
+
+def _parse_times(values: tuple[str, ...] | list[str]) -> list[dt_time]:
+    times = []
+    for raw in values:
+        hour, _, minute = raw.partition(":")
+        times.append(dt_time(int(hour), int(minute or 0)))
+    return sorted(times)
+
+
+def _now(tz: Any) -> datetime:
+    return datetime.now(tz)
+
+
+class Warmer:
+    """Prefetch scheduler for calendar, sheet and busy-map caches."""
+
+    def __init__(
+        self,
+        *,
+        times: list[dt_time],
+        days_ahead: int = 1,
+        pause_sec: float = 0.2,
+        timezone_name: str = "Asia/Tokyo",
+        max_users: int = 32,
+        clock: Callable[[Any], datetime] = _now,
+    ) -> None:
+        self.times = times
+        self.days_ahead = days_ahead
+        self.pause_sec = pause_sec
+        self.tz = get_zone(timezone_name)
+        self.max_users = max_users
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._users: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._state = "idle"
+        self._last_run: datetime | None = None
+        self._next_run: datetime | None = None
+        self._sources: dict[str, dict[str, Any]] = {}
+
+    @classmethod
+    def from_config(cls) -> "Warmer":
+        return cls(
+            times=_parse_times(_setting("WARMER_TIMES", ("06:00",))),
+            days_ahead=int(_setting("WARMER_DAYS_AHEAD", 1)),
+            pause_sec=int(_setting("WARMER_PAUSE_MS", 200)) / 1000,
+            timezone_name=_setting("TIMEZONE", "Asia/Tokyo"),
+        )
+
+    # ------------------------------------------------------------------
+    # users
+    # ------------------------------------------------------------------
+
+    def remember(self, session: Any) -> None:
+        """Keep a copy of ``session`` so its data can be prefetched later."""
+        creds = session.get("credentials") if session else None
+        token = creds.get("access_token") if isinstance(creds, dict) else None
+        key = user_key(token)
+        if key is None:
+            return
+        with self._lock:
+            self._users[key] = dict(session)
+            self._users.move_to_end(key)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+
+    def forget(self, key: str) -> None:
+        with self._lock:
+            self._users.pop(key, None)
+
+    # ------------------------------------------------------------------
+    # scheduling
+    # ------------------------------------------------------------------
+
+    def next_run(self, now: datetime | None = None) -> datetime | None:
+        """Return the next configured warm-up time after ``now``."""
+        if not self.times:
+            return None
+        now = now or self._clock(self.tz)
+        local = now.astimezone(self.tz)
+        for offset in (0, 1):
+            day = local.date() + timedelta(days=offset)
+            for t in self.times:
+                candidate = localize(datetime.combine(day, t), self.tz)
+                if candidate > local:
+                    return candidate
+        return None  # pragma: no cover - unreachable with at least one time
+
+    def target_days(self, now: datetime | None = None) -> list[date]:
+        now = now or self._clock(self.tz)
+        today = now.astimezone(self.tz).date()
+        return [today + timedelta(days=i) for i in range(self.days_ahead + 1)]
+
+    def start(self) -> None:
+        """Start the background thread (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="cache-warmer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            next_run = self.next_run()
+            with self._lock:
+                self._next_run = next_run
+            if next_run is None:
+                return
+            wait = (next_run - self._clock(self.tz)).total_seconds()
+            if self._stop.wait(max(wait, 0)):
+                return
+            self.run_once()
+
+    # ------------------------------------------------------------------
+    # warming
+    # ------------------------------------------------------------------
+
+    def _record(self, source: str, result: str, detail: str | None = None) -> None:
+        entry: dict[str, Any] = {"status": result, "at": self._clock(self.tz).isoformat()}
+        if detail:
+            entry["detail"] = detail
+        with self._lock:
+            self._sources[source] = entry
+
+    def _breaker_open(self, source: str) -> bool:
+        return resilience.breaker_for(_ENDPOINTS[source]).state == resilience.CircuitBreaker.OPEN
+
+    def _warm(self, source: str, fn: Callable[[], Any]) -> bool:
+        if source in _ENDPOINTS and self._breaker_open(source):
+            self._record(source, "skipped", "circuit open")
+            return False
+        try:
+            with deadline.deadline(_WARM_BUDGET_SEC):
+                fn()
+        except GoogleAPIUnauthorized:
+            self._record(source, "unauthorized")
+            return False
+        except Exception as exc:  # noqa: BLE001 - reported via status()
+            self._record(source, "error", getattr(exc, "description", None) or str(exc))
+            return False
+        self._record(source, "ok")
+        return True
+
+    def _warm_user(self, session: dict[str, Any], days: list[date], hold: float) -> bool:
+        from schedule_app.api.calendar import remember_events
+        from schedule_app.services import schedule
+        from schedule_app.services.sheets_tasks import fetch_tasks_and_blocks, hold_sheets
+
+        creds = session.get("credentials")
+        token = creds.get("access_token") if isinstance(creds, dict) else None
+        client = GoogleClient(creds)
+
+        def calendar() -> None:
+            for day in days:
+                local = localize(datetime.combine(day, dt_time.min), self.tz)
+                remember_events(load_day_events(client, local, token=token, force=True))
+                hold_day_events(token, local, hold)
+
+        def sheets() -> None:
+            fetch_tasks_and_blocks(session, force=True)
+            hold_sheets(session, hold)
+
+        def busy_map() -> None:
+            for day in days:
+                schedule.warm_busy_map(day)
+
+        ok = self._warm("calendar", calendar)
+        ok = self._warm("sheets", sheets) and ok
+        ok = self._warm("busy_map", busy_map) and ok
+        return ok
+
+    def run_once(self) -> dict[str, Any]:
+        """Warm every remembered user now and return :meth:`status`."""
+        if not self._run_lock.acquire(blocking=False):
+            return self.status()
+        try:
+            with self._lock:
+                self._state = "warming"
+                users = list(self._users.values())
+            now = self._clock(self.tz)
+            days = self.target_days(now)
+            # 先読みした値は次の実行まで（期限切れでも裏で取り直しつつ）返せるようにする
+            next_run = self.next_run(now)
+            hold = (next_run - now).total_seconds() if next_run is not None else 0.0
+            ok = True
+            for i, session in enumerate(users):
+                if i and self._stop.wait(self.pause_sec):
+                    break
+                ok = self._warm_user(session, days, hold) and ok
+            with self._lock:
+                self._last_run = self._clock(self.tz)
+                self._state = ("warm" if ok else "partial") if users else "idle"
+            log_metric("cache_warm", {"users": len(users), "state": self._state})
+        finally:
+            self._run_lock.release()
+        return self.status()
+
+    def status(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": True,
+                "state": self._state,
+                "users": len(self._users),
+                "last_run": self._last_run.isoformat() if self._last_run else None,
+                "next_run": self._next_run.isoformat() if self._next_run else None,
+                "sources": {k: dict(v) for k, v in self._sources.items()},
+            }
+
+
+_WARMER: Warmer | None = None
+_WARMER_LOCK = threading.Lock()
+
+
+def get_warmer(*, create: bool = False) -> Warmer | None:
+    """Return the process-wide warmer, creating it from config if asked."""
+    global _WARMER
+    with _WARMER_LOCK:
+        if _WARMER is None and create:
+            _WARMER = Warmer.from_config()
+        return _WARMER
+
+
+def status() -> dict[str, Any]:
+    """Return the warmer status, or ``{"enabled": False}`` when disabled."""
+    warmer = get_warmer()
+    if warmer is None:
+        return {"enabled": False}
+    return warmer.status()
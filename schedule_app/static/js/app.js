@@ -50,7 +50,7 @@ export async function apiFetch(url, options = {}) {
   }
 
   const ct = res.headers.get('content-type') ?? '';
-  if (ct.includes('application/json')) {
+  if (ct.includes('application/json') || ct.includes('+json')) {
     return res.json();
   }
   return res.text();
@@ -269,7 +269,8 @@ document.addEventListener('alpine:init', () => {
         await this.fetch();
         const input = document.querySelector('#input-date');
         const ymd = input ? input.value : todayUtcISO();
-        if (ymd) {
+        // ストリーム購読中はサーバーから差分が届く
+        if (ymd && !scheduleStream) {
           try {
             await generateSchedule(ymd);
           } catch (err) {
@@ -805,19 +806,34 @@ function saveState() {
   // TODO: implement persistence
 }
 
+/**
+ * Expand run-length spans (`[start, length, state, taskId]`) into slot states.
+ * @param {Array<Array<any>>} spans
+ * @returns {number[]}
+ */
+function expandSpans(spans) {
+  const slots = [];
+  for (const [, length, state] of spans) {
+    for (let i = 0; i < length; i++) slots.push(state);
+  }
+  return slots;
+}
+
 /** Load grid data from the server for the given `date`. */
 async function loadGridFromServer(date) {
   const raw = await apiFetch(
-    `/api/schedule/generate?date=${date}&algo=greedy`,
+    `/api/schedule/generate?date=${date}&algo=greedy&format=rle`,
     { method: 'POST' },
   );
   const slots = Array.isArray(raw)
     ? raw
-    : Array.isArray(raw.slots)
-      ? raw.slots
-      : Array.isArray(raw.grid)
-        ? raw.grid
-        : (() => { throw new Error('Malformed Grid'); })();
+    : Array.isArray(raw.spans)
+      ? expandSpans(raw.spans)
+      : Array.isArray(raw.slots)
+        ? raw.slots
+        : Array.isArray(raw.grid)
+          ? raw.grid
+          : (() => { throw new Error('Malformed Grid'); })();
   const unplaced = Array.isArray(raw.unplaced) ? raw.unplaced : [];
 
   const utcGrid = slots.map((s) => {
@@ -912,6 +928,50 @@ async function generateSchedule(date) {
   });
 }
 
+/* ===== Live updates (/api/schedule/stream) ============================ */
+let scheduleStream = null;   // EventSource for the date being followed
+let streamUtcSlots = null;   // UTC slot states the diffs apply to
+let streamUnplaced = '[]';   // last unplaced ids (JSON) to avoid repeat toasts
+
+/** Show streamed UTC slot states and unplaced tasks for `date`. */
+function applyStreamedSlots(date, unplaced) {
+  scheduleGrid = shiftGridToLocalTZ(streamUtcSlots);
+  saveState();
+  const key = JSON.stringify(unplaced ?? []);
+  if (key !== streamUnplaced) {
+    streamUnplaced = key;
+    showUnplacedTasks(unplaced);
+  }
+  updateBlockedSlots(date);
+}
+
+/**
+ * Follow server-side schedule changes for `date`.
+ * The first `schedule` event carries the whole day, later `diff` events only
+ * the changed spans. EventSource reconnects by itself when the server ends
+ * the stream.
+ */
+function followSchedule(date) {
+  if (typeof EventSource === 'undefined') return;
+  scheduleStream?.close();
+  streamUtcSlots = null;
+  const es = new EventSource(`/api/schedule/stream?date=${date}&algo=greedy&format=rle`);
+  es.addEventListener('schedule', (e) => {
+    const data = JSON.parse(e.data);
+    streamUtcSlots = expandSpans(data.spans);
+    applyStreamedSlots(date, data.unplaced);
+  });
+  es.addEventListener('diff', (e) => {
+    if (!streamUtcSlots) return;
+    const data = JSON.parse(e.data);
+    for (const [start, length, state] of data.spans) {
+      streamUtcSlots.fill(state, start, start + length);
+    }
+    applyStreamedSlots(date, data.unplaced);
+  });
+  scheduleStream = es;
+}
+
 // Expose undo/redo for keyboard handlers or UI buttons
 window.doUndo = doUndo;
 window.doRedo = doRedo;
@@ -969,6 +1029,7 @@ document.addEventListener('DOMContentLoaded', () => {
   inputDate?.addEventListener('change', async () => {
     const ymd = inputDate.value;
     if (!ymd) return;
+    if (scheduleStream) followSchedule(ymd);
     try {
       const events = await apiFetch(`/api/calendar?date=${ymd}`);
       const allDay = filterAllDay(events);
@@ -991,6 +1052,7 @@ document.addEventListener('DOMContentLoaded', () => {
     try {
       /* 1) スケジュール生成（/api/schedule/generate） */
       await generateSchedule(ymd);
+      followSchedule(ymd);
 
       /* 2) All-day 予定も最新化 */
       const events = await apiFetch(`/api/calendar?date=${ymd}`);
@@ -0,0 +1,116 @@
+"""Fast JSON encoding for API responses.
+
+Two pieces:
+
+* :class:`OrjsonProvider` – a Flask JSON provider backed by :mod:`orjson`.
+  ``create_app`` installs it when orjson is importable; otherwise the stock
+  provider stays in place. Types orjson does not handle itself (dates,
+  dataclasses, ``__html__`` objects…) go through Flask's own ``default`` so
+  the output matches stock ``jsonify``.
+* :func:`fragment_cache` – memoizes the encoded JSON of frozen model objects.
+  ``Task``, ``Block`` and ``Event`` are immutable and hashable, so a value is
+  encoded once and list endpoints join the cached fragments with
+  :func:`array_response` instead of building and encoding dict copies on
+  every request.
+"""
+
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+from typing import Any, Callable, Iterable, TypeVar
+
+from flask import Response, current_app
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+__all__ = [
+    "OrjsonProvider",
+    "array_response",
+    "available",
+    "dumps_bytes",
+    "fragment_cache",
+    "fragment_response",
+]
+
+T = TypeVar("T")
+
+# orjson が直接扱える型以外は Flask の default に回す
+_PASSTHROUGH = 0 if orjson is None else (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS
+)
+
+
+def available() -> bool:
+    """Return ``True`` if :mod:`orjson` can be used."""
+    return orjson is not None
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Return the compact UTF-8 JSON encoding of ``obj``."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=DefaultJSONProvider.default, option=_PASSTHROUGH)
+    return json.dumps(
+        obj, default=DefaultJSONProvider.default, ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes and decodes with :mod:`orjson`.
+
+    ``sort_keys`` and ``compact`` keep their Flask meaning; indented output
+    (debug mode or ``compact = False``) always uses two spaces.
+    """
+
+    def _encode(self, obj: Any, *, sort_keys: bool, indent: bool = False) -> bytes:
+        option = _PASSTHROUGH
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return self._encode(
+            obj,
+            sort_keys=kwargs.get("sort_keys", self.sort_keys),
+            indent=kwargs.get("indent") is not None,
+        ).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = self._encode(obj, sort_keys=self.sort_keys, indent=indent)
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+
+def fragment_cache(to_dict: Callable[[T], dict[str, Any]], *, maxsize: int = 4096) -> Callable[[T], bytes]:
+    """Return a memoized ``obj → JSON bytes`` function built on ``to_dict``.
+
+    ``obj`` must be immutable and hashable (the frozen model dataclasses
+    are); equal objects share one cached fragment.
+    """
+
+    @lru_cache(maxsize=maxsize)
+    def fragment(obj: T) -> bytes:
+        return dumps_bytes(to_dict(obj))
+
+    fragment.__doc__ = f"Cached JSON fragment of :func:`{to_dict.__name__}`."
+    return fragment
+
+
+def fragment_response(body: bytes, status: int = 200) -> Response:
+    """Return a JSON response whose body is the already encoded ``body``."""
+    return current_app.response_class(body + b"\n", status=status, mimetype="application/json")
+
+
+def array_response(fragments: Iterable[bytes], status: int = 200) -> Response:
+    """Return a JSON array response joined from encoded ``fragments``."""
+    return fragment_response(b"[" + b",".join(fragments) + b"]", status)
@@ -0,0 +1,163 @@
+"""Column-oriented helpers for parsing Google Sheets rows in bulk.
+
+The header row is mapped to column indices once and every column is then
+converted in its own loop. Repeated cell values (the same date in many rows,
+say) are parsed once per import. Validation problems are collected as
+:class:`RowError` objects instead of aborting on the first bad row, so an
+import can report every invalid row at once.
+"""
+
+from __future__ import annotations
+
+import re
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Iterable, Sequence
+
+from schedule_app.utils.timecodec import parse_utc
+
+__all__ = [
+    "Columns",
+    "RowError",
+    "parse_datetime_column",
+    "range_first_row",
+    "row_id",
+    "row_ids",
+]
+
+_RANGE_START_RE = re.compile(r"![A-Za-z]*(\d+)")
+
+# 行 ID 生成用の名前空間。変更するとシートの全行の ID が変わる
+_ROW_ID_NAMESPACE = uuid.UUID("d8d8c3cd-5a67-4096-93fe-1d8b166c62ec")
+
+
+@dataclass(slots=True, frozen=True)
+class RowError:
+    """One invalid cell: 1-based sheet ``row``, column ``field`` and message."""
+
+    row: int
+    field: str
+    detail: str
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def range_first_row(cell_range: str | None) -> int:
+    """Return the sheet row number of the first row of ``cell_range``.
+
+    ``"Blocks!A2:C"`` → ``2``; ranges without a row (``"Tasks!A:F"``) start
+    at row ``1``.
+    """
+    match = _RANGE_START_RE.search(cell_range or "")
+    return int(match.group(1)) if match else 1
+
+
+class Columns:
+    """Header → column index map over the data rows of a sheet.
+
+    Parameters
+    ----------
+    rows:
+        Raw values with the header row first.
+    first_row:
+        Sheet row number of ``rows[0]`` (see :func:`range_first_row`).
+    """
+
+    def __init__(self, rows: Sequence[Sequence[Any]], *, first_row: int = 1) -> None:
+        headers = [str(h).strip().lower() for h in rows[0]] if rows else []
+        # 同名ヘッダーは先頭ではなく末尾が優先される
+        self.index = {name: i for i, name in enumerate(headers)}
+        self.rows = rows[1:]
+        self.first_row = first_row
+        self.errors: list[RowError] = []
+        self._bad: set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def sheet_row(self, i: int) -> int:
+        """Return the sheet row number of data row ``i``."""
+        return self.first_row + 1 + i
+
+    def column(self, name: str) -> list[Any]:
+        """Return the cells of column ``name``; ``None`` where a row is short.
+
+        A column missing from the header yields ``None`` for every row.
+        """
+        idx = self.index.get(name)
+        if idx is None:
+            return [None] * len(self.rows)
+        return [row[idx] if idx < len(row) else None for row in self.rows]
+
+    def error(self, i: int, field: str, detail: str) -> None:
+        """Record a problem with ``field`` in data row ``i``."""
+        self._bad.add(i)
+        self.errors.append(RowError(self.sheet_row(i), field, detail))
+
+    def ok(self, i: int) -> bool:
+        """Return ``True`` if no error was recorded for data row ``i``."""
+        return i not in self._bad
+
+    def summary(self) -> str:
+        """Return a one-line description of the recorded errors."""
+        first = self.errors[0]
+        if len(self._bad) == 1:
+            return f"row {first.row}: {first.detail}"
+        return f"{len(self._bad)} invalid rows (first: row {first.row}: {first.detail})"
+
+
+def parse_datetime_column(cols: Columns, name: str, *, required: bool = False) -> list[datetime | None]:
+    """Parse column ``name`` as ISO 8601 datetimes, memoizing repeated cells.
+
+    Empty cells become ``None`` (or an error when ``required``); unparsable
+    cells record ``"invalid datetime"`` and become ``None``.
+    """
+    memo: dict[str, Any] = {}
+    out: list[datetime | None] = []
+    for i, raw in enumerate(cols.column(name)):
+        text = str(raw).strip() if raw is not None else ""
+        if not text:
+            if required:
+                cols.error(i, name, "missing datetime")
+            out.append(None)
+            continue
+        try:
+            value = memo[text]
+        except KeyError:
+            try:
+                value = parse_utc(text)
+            except ValueError:
+                value = ValueError
+            memo[text] = value
+        if value is ValueError:
+            cols.error(i, name, "invalid datetime")
+            value = None
+        out.append(value)
+    return out
+
+
+def row_id(kind: str, *parts: Any, ordinal: int = 0) -> uuid.UUID:
+    """Return a deterministic ID for a sheet row that has no ``id`` cell.
+
+    The ID is a UUID v5 over ``kind`` and the identifying ``parts`` of the
+    row, so re-importing an unchanged sheet yields the same IDs. ``ordinal``
+    tells apart rows whose parts are identical.
+    """
+    key = "\x1f".join([kind, *("" if p is None else str(p).strip() for p in parts), str(ordinal)])
+    return uuid.uuid5(_ROW_ID_NAMESPACE, key)
+
+
+def row_ids(kind: str, keys: Iterable[tuple[Any, ...]]) -> list[uuid.UUID]:
+    """Return :func:`row_id` for each identity tuple in ``keys``.
+
+    The n-th repetition of the same key gets ``ordinal=n``.
+    """
+    seen: dict[tuple[Any, ...], int] = {}
+    out: list[uuid.UUID] = []
+    for key in keys:
+        n = seen.get(key, 0)
+        seen[key] = n + 1
+        out.append(row_id(kind, *key, ordinal=n))
+    return out
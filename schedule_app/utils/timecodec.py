@@ -0,0 +1,128 @@
+"""RFC 3339 parsing and formatting shared by the API and the Google clients.
+
+Every datetime that enters or leaves the app goes through this module:
+sheet cells, JSON request bodies, Calendar ``start``/``end`` objects and the
+``…Z`` strings in responses.
+
+* Parsing is memoized per string. Calendars and sheets repeat the same
+  timestamps a lot, and :class:`datetime` is immutable, so cached values can
+  be shared freely.
+* ``Z`` and ``+00:00`` values take a fast path that only swaps the tzinfo
+  instead of running :meth:`datetime.astimezone`.
+* Time zone objects are cached by name (``ZoneInfo`` first, ``pytz`` as a
+  fallback) instead of being built per event. ``pytz`` is only imported
+  when a name is missing from the system zone database.
+* :func:`localize` attaches a zone to naive datetimes for either kind of
+  zone, so callers do not need ``pytz``'s ``localize`` themselves.
+* Formatting cuts the fixed-length ``+00:00`` suffix off the UTC
+  ``isoformat`` output and appends ``Z`` instead of running ``str.replace``;
+  results are memoized too, as the same instants are serialized repeatedly.
+
+``benchmarks/bench_timecodec.py`` compares these helpers with the code they
+replaced.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+__all__ = ["format_utc", "get_zone", "localize", "parse_date", "parse_utc", "to_utc"]
+
+UTC = timezone.utc
+_ZERO = timedelta(0)
+
+
+@lru_cache(maxsize=64)
+def get_zone(name: str) -> tzinfo:
+    """Return the time zone called ``name``, cached per name.
+
+    Tries :class:`ZoneInfo` first and falls back to :mod:`pytz`. Unknown
+    names raise :class:`KeyError` (both libraries' errors subclass it).
+    """
+    try:
+        return ZoneInfo(name)
+    except ZoneInfoNotFoundError:
+        # tzdata が無い環境向け。起動を重くしないよう必要になるまで読み込まない
+        import pytz
+
+        return pytz.timezone(name)
+
+
+def _attach(dt: datetime, tz: tzinfo) -> datetime:
+    # pytz のゾーンは replace(tzinfo=) だと LMT になるため localize を使う
+    localize = getattr(tz, "localize", None)
+    return localize(dt) if localize is not None else dt.replace(tzinfo=tz)
+
+
+def localize(dt: datetime, zone: str | tzinfo) -> datetime:
+    """Return naive ``dt`` as wall-clock time in ``zone`` (a name or tzinfo)."""
+    return _attach(dt, get_zone(zone) if isinstance(zone, str) else zone)
+
+
+@lru_cache(maxsize=8192)
+def _parse(value: str, zone_name: str | None) -> datetime:
+    if value[-1] in "Zz":
+        dt = datetime.fromisoformat(value[:-1])
+        if dt.tzinfo is not None:
+            raise ValueError(f"Invalid isoformat string: {value!r}")
+        return dt.replace(tzinfo=UTC)
+    dt = datetime.fromisoformat(value)
+    offset = dt.utcoffset()
+    if offset is None:
+        return _attach(dt, get_zone(zone_name)).astimezone(UTC) if zone_name else dt.replace(tzinfo=UTC)
+    if offset == _ZERO:
+        return dt.replace(tzinfo=UTC)
+    return dt.astimezone(UTC)
+
+
+def parse_utc(value: str | None, *, zone: str | None = None) -> datetime | None:
+    """Return ``value`` as an aware UTC datetime, or ``None`` if empty.
+
+    Accepts RFC 3339 / ISO 8601 strings with ``Z`` or a numeric offset.
+    Naive values are read in the time zone called ``zone`` (UTC by default).
+    Invalid formats raise ``ValueError``.
+    """
+    if not value:
+        return None
+    return _parse(value, zone)
+
+
+@lru_cache(maxsize=1024)
+def parse_date(value: str) -> date:
+    """Return the ``YYYY-MM-DD`` string ``value`` as a :class:`date`."""
+    return date.fromisoformat(value)
+
+
+def to_utc(info: dict) -> datetime:
+    """Return a UTC datetime from a Google Calendar ``start``/``end`` object.
+
+    ``dateTime`` wins over ``date``; a naive value is read in the object's
+    ``timeZone``. Missing values map to ``datetime.min`` in UTC.
+    """
+    raw = info.get("dateTime") or info.get("date")
+    if not raw:
+        return datetime.min.replace(tzinfo=UTC)
+    return _parse(raw, info.get("timeZone") or None)
+
+
+@lru_cache(maxsize=8192)
+def _format(dt: datetime, timespec: str) -> str:
+    offset = dt.utcoffset()
+    if offset is None:
+        return dt.isoformat(timespec=timespec) + "Z"
+    if offset != _ZERO:
+        dt = dt.astimezone(UTC)
+    # UTC の isoformat は必ず "+00:00" で終わるので固定長で切り落とす
+    return dt.isoformat(timespec=timespec)[:-6] + "Z"
+
+
+def format_utc(dt: datetime, *, timespec: str = "auto") -> str:
+    """Return ``dt`` as an RFC 3339 UTC string ending in ``Z``.
+
+    Naive values are taken to be UTC already. ``timespec`` is passed to
+    :meth:`datetime.isoformat` (``"seconds"`` drops fractions). Results are
+    memoized; equal instants always format the same.
+    """
+    return _format(dt, timespec)
@@ -1,23 +1,5 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
-
-
-def _parse_dt(value: str | None) -> datetime | None:
-    """Return a timezone-aware UTC datetime or ``None``.
-
-    Accepts ISO 8601 strings with an optional trailing ``"Z"``. Naive
-    datetimes are interpreted as UTC. Invalid formats raise ``ValueError``.
-    """
-    if not value:
-        return None
-    if value.endswith("Z"):
-        value = value[:-1] + "+00:00"
-    dt = datetime.fromisoformat(value)
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
-    return dt.astimezone(timezone.utc)
-
 
 def _validate_durations(duration_min: int, duration_raw_min: int) -> None:
     """Validate duration values.
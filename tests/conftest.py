@@ -25,6 +25,20 @@ if importlib.util.find_spec("freezegun") is None:
     pytest.skip("freezegun is required to run tests", allow_module_level=True)
 
 
+def pytest_collection_modifyitems(config, items):
+    """Skip ``benchmark`` tests unless ``RUN_BENCHMARKS=1``.
+
+    They compare wall-clock numbers with a recorded baseline, which is only
+    meaningful on the reference machine and without parallel workers.
+    """
+    if os.getenv("RUN_BENCHMARKS") == "1":
+        return
+    skip = pytest.mark.skip(reason="benchmark; set RUN_BENCHMARKS=1 to run")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
 @pytest.fixture(autouse=True)
 def _clear_blocks():
     """Ensure BLOCKS store is empty for each test."""
@@ -33,3 +47,38 @@ def _clear_blocks():
     BLOCKS.clear()
     yield
     BLOCKS.clear()
+
+
+@pytest.fixture(autouse=True)
+def _clear_schedule_memos():
+    """Drop memoized busy maps and streamed schedules.
+
+    Tests edit the stores without publishing a change.
+    """
+    from schedule_app.services import schedule, schedule_stream
+
+    schedule.invalidate_busy_maps()
+    schedule_stream.invalidate()
+    yield
+    schedule.invalidate_busy_maps()
+    schedule_stream.invalidate()
+
+
+@pytest.fixture(autouse=True)
+def _reset_resilience():
+    """Start every test with closed circuit breakers and a full retry budget."""
+    from schedule_app.services import resilience
+
+    resilience.reset()
+    yield
+    resilience.reset()
+
+
+@pytest.fixture(autouse=True)
+def _clear_events_cache():
+    """Do not let calendar events cached by one test leak into the next."""
+    from schedule_app.services.google_client import invalidate_events_cache
+
+    invalidate_events_cache()
+    yield
+    invalidate_events_cache()
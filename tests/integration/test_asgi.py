@@ -0,0 +1,360 @@
+"""ASGI mode against a local fake Google server."""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib import parse
+
+import pytest
+
+from schedule_app import create_app
+from schedule_app.api.blocks import BLOCKS
+from schedule_app.api.calendar import EVENTS
+from schedule_app.api.tasks import TASKS
+from schedule_app.asgi import AsgiApp
+from schedule_app.services import sheets_tasks
+from schedule_app.services.google_client import invalidate_blocks_cache, invalidate_events_cache
+
+TASK_ROWS = [
+    ["id", "title", "category", "duration_min", "duration_raw_min", "priority"],
+    ["t1", "Write report", "work", "30", "30", "A"],
+    ["t2", "Email", "work", "10", "10", "B"],
+]
+BLOCK_ROWS = [["start_utc", "end_utc", "title"], ["2025-01-01T00:00:00Z", "2025-01-01T01:00:00Z", "Lunch"]]
+
+
+class _FakeGoogle(BaseHTTPRequestHandler):
+    """Serves ``events.list`` and ``values.get`` with an artificial latency."""
+
+    delay = 0.0
+    status = 200
+    requests: list[dict] = []
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def do_GET(self):  # noqa: N802 - http.server API
+        cls = type(self)
+        with cls.lock:
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+            cls.requests.append({"path": self.path, "auth": self.headers.get("Authorization")})
+        try:
+            time.sleep(cls.delay)
+            path = parse.unquote(parse.urlsplit(self.path).path)
+            if "/events" in path:
+                body = {
+                    "items": [
+                        {
+                            "id": "ev1",
+                            "summary": "Standup",
+                            "start": {"dateTime": "2025-01-01T10:00:00+09:00"},
+                            "end": {"dateTime": "2025-01-01T10:30:00+09:00"},
+                        }
+                    ]
+                }
+            elif "Tasks!" in path:
+                body = {"values": TASK_ROWS}
+            else:
+                body = {"values": BLOCK_ROWS}
+            raw = json.dumps(body).encode()
+            self.send_response(cls.status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+    def log_message(self, *_args):  # silence test output
+        pass
+
+
+@pytest.fixture()
+def google(monkeypatch):
+    _FakeGoogle.delay = 0.0
+    _FakeGoogle.status = 200
+    _FakeGoogle.requests = []
+    _FakeGoogle.in_flight = _FakeGoogle.max_in_flight = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeGoogle)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setattr("schedule_app.services.google_client.CALENDAR_API_URL", f"{base}/calendar/v3")
+    monkeypatch.setattr("schedule_app.services.google_client.SHEETS_API_URL", f"{base}/v4/spreadsheets")
+    invalidate_events_cache()
+    invalidate_blocks_cache()
+    sheets_tasks.invalidate_cache()
+    EVENTS.clear()
+    TASKS.clear()
+    yield _FakeGoogle
+    server.shutdown()
+    server.server_close()
+    invalidate_events_cache()
+    invalidate_blocks_cache()
+    sheets_tasks.invalidate_cache()
+    TASKS.clear()
+
+
+@pytest.fixture()
+def flask_app():
+    return create_app(testing=True)
+
+
+@pytest.fixture()
+def asgi(flask_app):
+    # WSGI 用スレッドは 1 本だけ。非同期ビューはスレッドを使わない
+    return AsgiApp(flask_app, threads=1)
+
+
+def _cookie(flask_app, token: str) -> tuple[str, str]:
+    signed = flask_app.session_interface.get_signing_serializer(flask_app).dumps(
+        {"credentials": {"access_token": token}}
+    )
+    return "Cookie", f"{flask_app.config['SESSION_COOKIE_NAME']}={signed}"
+
+
+async def _request(asgi, method: str, path: str, *, query: str = "", headers=()):
+    messages: list[dict] = []
+    received = False
+
+    async def receive():
+        nonlocal received
+        if received:
+            # 本物のサーバーと同じく、切断されるまで返らない
+            await asyncio.Event().wait()
+        received = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await asgi(_scope(method, path, query, headers), receive, send)
+    start, *bodies = messages
+    assert not bodies[-1].get("more_body")
+    return (
+        start["status"],
+        {k.decode(): v.decode() for k, v in start["headers"]},
+        b"".join(m["body"] for m in bodies),
+    )
+
+
+def _scope(method: str, path: str, query: str = "", headers=()) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+
+
+def test_calendar_async(google, asgi, flask_app) -> None:
+    status, headers, body = asyncio.run(
+        _request(asgi, "GET", "/api/calendar", query="date=2025-01-01", headers=[_cookie(flask_app, "tok")])
+    )
+
+    assert status == 200
+    assert headers["content-type"] == "application/json"
+    assert [ev["id"] for ev in json.loads(body)] == ["ev1"]
+    assert google.requests[0]["auth"] == "Bearer tok"
+    assert "ev1" in EVENTS
+
+
+def test_one_worker_serves_many_inflight_requests(google, asgi, flask_app) -> None:
+    google.delay = 0.3
+    count = 8
+
+    async def main():
+        return await asyncio.gather(
+            *(
+                _request(
+                    asgi,
+                    "GET",
+                    "/api/calendar",
+                    query="date=2025-01-01",
+                    headers=[_cookie(flask_app, f"user-{i}")],
+                )
+                for i in range(count)
+            )
+        )
+
+    results = asyncio.run(main())
+
+    assert [status for status, _h, _b in results] == [200] * count
+    assert len(google.requests) == count
+    # WSGI スレッドは 1 本だけなので、重なっていれば非同期ビューが並行に処理している
+    assert google.max_in_flight > 1
+
+
+def test_same_user_requests_share_one_google_call(google, asgi, flask_app) -> None:
+    google.delay = 0.2
+    cookie = _cookie(flask_app, "tok")
+
+    async def main():
+        return await asyncio.gather(
+            *(_request(asgi, "GET", "/api/calendar", query="date=2025-01-01", headers=[cookie]) for _ in range(5))
+        )
+
+    results = asyncio.run(main())
+
+    assert {status for status, _h, _b in results} == {200}
+    assert len(google.requests) == 1
+
+
+def test_calendar_async_errors(google, asgi, flask_app) -> None:
+    status, headers, body = asyncio.run(_request(asgi, "GET", "/api/calendar", query="date=2025-01-01"))
+    assert status == 401
+    assert headers["content-type"] == "application/problem+json"
+
+    google.status = 401
+    status, _headers, body = asyncio.run(
+        _request(asgi, "GET", "/api/calendar", query="date=2025-01-01", headers=[_cookie(flask_app, "bad")])
+    )
+    assert status == 401
+    assert json.loads(body)["type"] == "https://schedule.app/errors/unauthorized"
+
+
+def test_tasks_import_async(google, asgi, flask_app, monkeypatch) -> None:
+    monkeypatch.setattr(
+        sheets_tasks, "cfg", dataclasses.replace(sheets_tasks.cfg, SHEETS_TASKS_SSID="sheet", SHEETS_TASKS_RANGE="Tasks!A:F")
+    )
+    cookie = _cookie(flask_app, "tok")
+
+    status, _headers, body = asyncio.run(_request(asgi, "GET", "/api/tasks/import", headers=[cookie]))
+    assert status == 200
+    assert [t["title"] for t in json.loads(body)] == ["Write report", "Email"]
+
+    status, _headers, _body = asyncio.run(_request(asgi, "POST", "/api/tasks/import", headers=[cookie]))
+    assert status == 204
+    assert sorted(t.title for t in TASKS.values()) == ["Email", "Write report"]
+    assert google.requests[-1]["path"].startswith("/v4/spreadsheets/sheet/values/")
+
+
+def test_tasks_import_async_requires_credentials(google, asgi, monkeypatch) -> None:
+    monkeypatch.setattr(sheets_tasks, "cfg", dataclasses.replace(sheets_tasks.cfg, SHEETS_TASKS_SSID="sheet"))
+
+    status, _headers, body = asyncio.run(_request(asgi, "GET", "/api/tasks/import"))
+
+    assert status == 401
+    assert json.loads(body)["detail"] == "missing credentials"
+
+
+def test_blocks_import_async(google, asgi, monkeypatch) -> None:
+    import schedule_app.api.blocks as blocks_api
+
+    monkeypatch.setattr(
+        blocks_api, "cfg", dataclasses.replace(blocks_api.cfg, BLOCKS_SHEET_ID="blocks", SHEETS_BLOCK_RANGE="Blocks!A:C")
+    )
+
+    status, _headers, _body = asyncio.run(_request(asgi, "POST", "/api/blocks/import"))
+
+    assert status == 204
+    assert [b.title for b in BLOCKS.values()] == ["Lunch"]
+
+
+def test_other_routes_run_on_wsgi(google, asgi) -> None:
+    status, _headers, body = asyncio.run(_request(asgi, "GET", "/api/health"))
+    assert status == 200
+    assert json.loads(body) == {"status": "ok"}
+
+    status, headers, _body = asyncio.run(_request(asgi, "GET", "/api/missing"))
+    assert status == 404
+    assert headers["content-type"] == "application/problem+json"
+    assert google.requests == []
+
+
+def test_streamed_responses_are_forwarded_chunk_by_chunk(asgi, flask_app) -> None:
+    flask_app.config.update(SCHEDULE_STREAM_HEARTBEAT_SEC=0.05, SCHEDULE_STREAM_MAX_SEC=5)
+    bodies: list[dict] = []
+    gone = asyncio.Event()
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if requested:
+            await gone.wait()
+            return {"type": "http.disconnect"}
+        requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            bodies.append(message)
+            # 最初のイベントとハートビートを受け取ったら切断する
+            if len(bodies) == 2:
+                gone.set()
+
+    async def main():
+        scope = _scope("GET", "/api/schedule/stream", "date=2025-01-01")
+        await asyncio.wait_for(asgi(scope, receive, send), timeout=5)
+
+    asyncio.run(main())
+
+    assert bodies[0]["body"].startswith(b"retry: 3000\n")
+    assert bodies[0]["more_body"] is True
+    assert bodies[1]["body"] == b": keepalive\n\n"
+    assert not bodies[-1].get("more_body")
+
+
+def test_stream_keeps_request_context_across_pool_threads(flask_app) -> None:
+    flask_app.config.update(SCHEDULE_STREAM_HEARTBEAT_SEC=0.02, SCHEDULE_STREAM_MAX_SEC=5)
+    asgi = AsgiApp(flask_app, threads=4)
+    bodies: list[dict] = []
+    gone = asyncio.Event()
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if requested:
+            await gone.wait()
+            return {"type": "http.disconnect"}
+        requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            bodies.append(message)
+            if len(bodies) == 6:
+                gone.set()
+
+    async def main():
+        scope = _scope("GET", "/api/schedule/stream", "date=2025-01-01")
+        stream = asyncio.ensure_future(asyncio.wait_for(asgi(scope, receive, send), timeout=5))
+        # 他のリクエストでプールのスレッドを入れ替え、ストリームの next() を別スレッドで走らせる
+        while not stream.done():
+            await asyncio.gather(*(_request(asgi, "GET", "/api/health") for _ in range(4)))
+        await stream
+
+    asyncio.run(main())
+
+    assert len(bodies) >= 6
+    assert all(b["body"] == b": keepalive\n\n" for b in bodies[1:6])
+    assert not bodies[-1].get("more_body")
+
+
+def test_lifespan(asgi) -> None:
+    sent: list[dict] = []
+    messages = iter([{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}])
+
+    async def receive():
+        return next(messages)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi({"type": "lifespan"}, receive, send))
+
+    assert [m["type"] for m in sent] == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
@@ -8,7 +8,6 @@ from __future__ import annotations
 
 import pytest
 from flask import Flask
-import time
 
 from schedule_app import create_app as create_flask_app  # factory 関数を想定
 
@@ -109,6 +108,25 @@ def test_import_blocks_invalid_row(client, monkeypatch):
     resp = client.get("/api/blocks/import")
     assert resp.status_code == 422
     _assert_problem_details(resp.get_json())
+    assert "errors" not in resp.get_json()
+
+
+def test_import_blocks_invalid_row_lists_errors(client, monkeypatch):
+    from schedule_app.errors import InvalidBlockRow
+
+    errors = [{"row": 4, "field": "start_utc", "detail": "invalid datetime"}]
+
+    def raise_error(*a, **k):
+        raise InvalidBlockRow("row 4: invalid datetime", errors=errors)
+
+    monkeypatch.setattr("schedule_app.api.blocks.fetch_blocks_from_sheet", raise_error)
+
+    resp = client.get("/api/blocks/import")
+    assert resp.status_code == 422
+    data = resp.get_json()
+    _assert_problem_details(data)
+    assert data["detail"] == "row 4: invalid datetime"
+    assert data["errors"] == errors
 
 
 def test_import_blocks_api_error(client, monkeypatch):
@@ -223,18 +241,16 @@ def test_clear_cache_endpoint(client, monkeypatch) -> None:
     current = {"val": blocks1}
     calls = {"n": 0}
 
-    def fake_fetch(_ssid, _range):
-        if gc._BLOCK_CACHE is not None:
-            blocks, expiry = gc._BLOCK_CACHE
-            if time.time() < expiry:
-                return blocks
+    def load():
         calls["n"] += 1
-        gc._BLOCK_CACHE = (current["val"], time.time() + 60)
         return current["val"]
 
+    def fake_fetch(_ssid, _range):
+        return gc._BLOCK_CACHE.get_or_load(gc.blocks_cache_key("sid", "rng"), load)
+
     monkeypatch.setattr("schedule_app.api.blocks.fetch_blocks_from_sheet", fake_fetch)
 
-    gc._BLOCK_CACHE = None
+    gc.invalidate_blocks_cache()
     resp = client.get("/api/blocks/import")
     assert resp.status_code == 200
     assert calls["n"] == 1
@@ -245,7 +261,7 @@ def test_clear_cache_endpoint(client, monkeypatch) -> None:
 
     resp = client.delete("/api/blocks/cache")
     assert resp.status_code == 204
-    assert gc._BLOCK_CACHE is None
+    assert len(gc._BLOCK_CACHE) == 0
 
     current["val"] = blocks2
     resp = client.get("/api/blocks/import")
@@ -166,3 +166,59 @@ def test_calendar_all_day_multi_day(app: Flask, client) -> None:
         assert len(data) == 1
         assert data[0]["id"] == "ad2"
         assert data[0]["all_day"] is True
+
+
+def test_calendar_serves_own_cache_while_breaker_open(app: Flask, client) -> None:
+    from datetime import timedelta
+
+    from schedule_app.services.resilience import CircuitOpenError
+
+    event = Event(
+        id="c1",
+        start_utc=datetime(2025, 1, 1, 1, 0, tzinfo=timezone.utc),
+        end_utc=datetime(2025, 1, 1, 2, 0, tzinfo=timezone.utc),
+        title="Cached",
+    )
+    with freeze_time("2025-01-01T00:00:00Z") as frozen:
+        with client.session_transaction() as sess:
+            sess["credentials"] = {"access_token": "tok", "expiry": None}
+        with patch("schedule_app.api.calendar.GoogleClient", return_value=DummyGClient(events=[event])):
+            assert client.get("/api/calendar?date=2025-01-01").status_code == 200
+        frozen.tick(delta=timedelta(minutes=5))
+
+        with patch(
+            "schedule_app.api.calendar.GoogleClient",
+            return_value=DummyGClient(raise_exc=CircuitOpenError("calendar.events")),
+        ):
+            resp = client.get("/api/calendar?date=2025-01-01")
+            empty = client.get("/api/calendar?date=2025-02-01")
+            # 別ユーザーには他人の予定を返さない（EVENTS には c1 が残っている）
+            with client.session_transaction() as sess:
+                sess["credentials"] = {"access_token": "other", "expiry": None}
+            other = client.get("/api/calendar?date=2025-01-01")
+
+    assert resp.status_code == 200
+    assert resp.headers["X-Cache"] == "stale"
+    assert [e["id"] for e in resp.get_json()] == ["c1"]
+    assert empty.status_code == 502
+    assert other.status_code == 502
+
+
+def test_calendar_reuses_cached_day(app: Flask, client) -> None:
+    event = Event(
+        id="1",
+        start_utc=datetime(2025, 1, 1, 1, 0, tzinfo=timezone.utc),
+        end_utc=datetime(2025, 1, 1, 2, 0, tzinfo=timezone.utc),
+        title="Demo",
+    )
+    with client.session_transaction() as sess:
+        sess["credentials"] = {"access_token": "tok", "expiry": None}
+    with patch("schedule_app.api.calendar.GoogleClient", return_value=DummyGClient(events=[event])):
+        assert client.get("/api/calendar?date=2025-01-01").status_code == 200
+    with patch(
+        "schedule_app.api.calendar.GoogleClient",
+        return_value=DummyGClient(raise_exc=APIError("should not be called")),
+    ):
+        resp = client.get("/api/calendar?date=2025-01-01")
+    assert resp.status_code == 200
+    assert [e["id"] for e in resp.get_json()] == ["1"]
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import gzip
+import os
+import re
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+
+from schedule_app import create_app
+from schedule_app.api.tasks import TASKS
+from schedule_app.compression import IMMUTABLE
+
+
+@pytest.fixture()
+def app() -> Flask:
+    return create_app(testing=True)
+
+
+@pytest.fixture()
+def client(app: Flask):
+    TASKS.clear()
+    yield app.test_client()
+    TASKS.clear()
+
+
+def _add_tasks(client, count: int) -> None:
+    for i in range(count):
+        resp = client.post(
+            "/api/tasks",
+            json={
+                "title": f"Task number {i} with a reasonably long title",
+                "category": "general",
+                "duration_min": 30,
+                "duration_raw_min": 30,
+                "priority": "A",
+            },
+        )
+        assert resp.status_code == 201
+
+
+def test_large_json_is_gzipped(client) -> None:
+    _add_tasks(client, 30)
+    plain = client.get("/api/tasks")
+    resp = client.get("/api/tasks", headers={"Accept-Encoding": "gzip, deflate"})
+
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in resp.headers["Vary"]
+    assert int(resp.headers["Content-Length"]) < len(plain.data)
+    assert gzip.decompress(resp.data) == plain.data
+
+
+def test_small_response_is_not_compressed(client) -> None:
+    resp = client.get("/api/health", headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in resp.headers
+    assert resp.get_json() == {"status": "ok"}
+
+
+def test_threshold_is_configurable() -> None:
+    with patch.dict(os.environ, {"COMPRESS_MIN_BYTES": "1"}):
+        tiny = create_app(testing=True)
+    resp = tiny.test_client().get("/api/health", headers={"Accept-Encoding": "gzip"})
+
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert b'"ok"' in gzip.decompress(resp.data)
+
+
+def test_no_accept_encoding_means_identity(client) -> None:
+    _add_tasks(client, 30)
+    resp = client.get("/api/tasks", headers={"Accept-Encoding": "gzip;q=0, identity"})
+
+    assert "Content-Encoding" not in resp.headers
+    assert len(resp.get_json()) == 30
+
+
+def test_index_links_versioned_assets(client, app: Flask) -> None:
+    html = client.get("/").get_data(as_text=True)
+    digest = app.extensions["static_assets"]["js/app.js"].digest
+
+    assert f"/static/js/app.js?v={digest}" in html
+    assert re.search(r"/static/css/styles\.css\?v=[0-9a-f]{12}", html)
+    assert "/static/css/print.css?v=" in html
+
+
+def test_static_served_precompressed_and_immutable(client, app: Flask) -> None:
+    asset = app.extensions["static_assets"]["js/app.js"]
+    resp = client.get(f"/static/js/app.js?v={asset.digest}", headers={"Accept-Encoding": "gzip"})
+
+    assert resp.status_code == 200
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert resp.headers["Cache-Control"] == IMMUTABLE
+    assert resp.data == asset.bodies["gzip"]
+    assert gzip.decompress(resp.data) == asset.bodies["identity"]
+
+
+def test_static_unversioned_revalidates(client, app: Flask) -> None:
+    asset = app.extensions["static_assets"]["css/styles.css"]
+    resp = client.get("/static/css/styles.css")
+
+    assert resp.headers["Cache-Control"] == "no-cache"
+    assert "Content-Encoding" not in resp.headers
+    assert resp.data == asset.bodies["identity"]
+
+    again = client.get("/static/css/styles.css", headers={"If-None-Match": resp.headers["ETag"]})
+    assert again.status_code == 304
+    assert again.data == b""
+
+
+def test_static_missing_file_is_404(client) -> None:
+    assert client.get("/static/js/missing.js").status_code == 404
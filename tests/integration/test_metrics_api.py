@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import pytest
+from flask import Flask
+
+from schedule_app import create_app
+from schedule_app.api.tasks import TASKS
+from schedule_app.services.metrics import CONTENT_TYPE, REGISTRY
+
+
+@pytest.fixture()
+def app() -> Flask:
+    REGISTRY.clear()
+    return create_app(testing=True)
+
+
+def _samples(text: str) -> dict[str, float]:
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, _, value = line.rpartition(" ")
+            samples[name] = float(value)
+    return samples
+
+
+def test_requests_are_timed_per_endpoint(app) -> None:
+    client = app.test_client()
+    for _ in range(3):
+        assert client.get("/api/health").status_code == 200
+    assert client.get("/api/missing").status_code == 404
+
+    resp = client.get("/api/metrics")
+
+    assert resp.status_code == 200
+    assert resp.headers["Content-Type"] == CONTENT_TYPE
+    samples = _samples(resp.get_data(as_text=True))
+    assert samples['http_request_duration_seconds_count{method="GET",endpoint="health",status="200"}'] == 3
+    assert samples['http_request_duration_seconds_bucket{method="GET",endpoint="health",status="200",le="+Inf"}'] == 3
+    assert samples['http_request_duration_seconds_count{method="GET",endpoint="unmatched",status="404"}'] == 1
+    # 計測中のリクエスト = /api/metrics 自身
+    assert samples["http_requests_in_flight"] == 1
+
+
+def test_metrics_include_caches_breakers_and_events(app) -> None:
+    TASKS.clear()
+    client = app.test_client()
+    client.post(
+        "/api/tasks",
+        json={"title": "T", "category": "general", "duration_min": 30, "duration_raw_min": 30, "priority": "A"},
+    )
+    assert client.post("/api/schedule/generate?date=2025-01-01").status_code == 200
+    TASKS.clear()
+
+    text = client.get("/api/metrics").get_data(as_text=True)
+
+    assert "# TYPE cache_hits_total counter" in text
+    assert "# TYPE google_breaker_state gauge" in text
+    samples = _samples(text)
+    assert samples["schedule_tasks_placed_total"] == 1
+    assert samples["schedule_tasks_unplaced_total"] == 0
+    assert samples['schedule_phase_seconds_count{phase="place"}'] == 1
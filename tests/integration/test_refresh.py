@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+
+from schedule_app import create_app
+from schedule_app.api.calendar import EVENTS
+from schedule_app.api.tasks import TASKS
+from schedule_app.api.blocks import BLOCKS
+from schedule_app.models import Block, Event, Task
+from schedule_app.services.google_client import GoogleAPIUnauthorized
+
+
+DELAY = 0.3
+
+
+class SlowGClient:
+    def __init__(self, events: list[Event], *, raise_exc: Exception | None = None) -> None:
+        self.events = events
+        self.raise_exc = raise_exc
+
+    def list_events(self, *, date: datetime) -> list[Event]:
+        time.sleep(DELAY)
+        if self.raise_exc:
+            raise self.raise_exc
+        return self.events
+
+
+EVENT = Event(
+    id="e1",
+    start_utc=datetime(2025, 1, 1, 1, 0, tzinfo=timezone.utc),
+    end_utc=datetime(2025, 1, 1, 2, 0, tzinfo=timezone.utc),
+    title="Meeting",
+)
+TASK = Task(id="t1", title="T", category="c", duration_min=10, duration_raw_min=10, priority="A")
+BLOCK = Block(
+    id="b1",
+    start_utc=datetime(2025, 1, 1, 3, 0, tzinfo=timezone.utc),
+    end_utc=datetime(2025, 1, 1, 4, 0, tzinfo=timezone.utc),
+)
+
+
+def _slow(value):
+    def inner(*_a, **_k):
+        time.sleep(DELAY)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    return inner
+
+
+@pytest.fixture()
+def app() -> Flask:
+    return create_app(testing=True)
+
+
+@pytest.fixture()
+def client(app: Flask):
+    TASKS.clear()
+    EVENTS.clear()
+    yield app.test_client()
+    TASKS.clear()
+    EVENTS.clear()
+
+
+def _login(client) -> None:
+    with client.session_transaction() as sess:
+        sess["credentials"] = {"access_token": "tok", "expiry": None}
+
+
+def _assert_problem_details(data: Any) -> None:
+    assert isinstance(data, dict)
+    for key in ("type", "title", "status"):
+        assert key in data
+
+
+def test_refresh_runs_sources_concurrently(client, monkeypatch) -> None:
+    monkeypatch.setattr("schedule_app.api.refresh.fetch_tasks_from_sheet", _slow([TASK]))
+    monkeypatch.setattr("schedule_app.api.refresh.fetch_blocks_from_sheet", _slow([BLOCK]))
+    _login(client)
+
+    started = time.perf_counter()
+    with patch("schedule_app.api.refresh.GoogleClient", return_value=SlowGClient([EVENT])):
+        resp = client.post("/api/refresh?date=2025-01-01")
+    elapsed = time.perf_counter() - started
+
+    assert resp.status_code == 200
+    assert elapsed < DELAY * 2.5
+    data = resp.get_json()
+    assert data["date"] == "2025-01-01"
+    for name in ("calendar", "tasks", "blocks"):
+        assert data["sources"][name]["status"] == "ok"
+        assert data["sources"][name]["count"] == 1
+        assert data["sources"][name]["elapsed_ms"] >= DELAY * 1000 * 0.9
+
+    assert list(EVENTS) == ["e1"]
+    assert list(TASKS) == ["t1"]
+    assert list(BLOCKS) == ["b1"]
+
+
+def test_refresh_reports_store_diff(client, monkeypatch) -> None:
+    TASKS["t1"] = TASK
+    TASKS["gone"] = Task(id="gone", title="", category="", duration_min=10, duration_raw_min=10, priority="B")
+    BLOCKS.clear()
+    monkeypatch.setattr("schedule_app.api.refresh.fetch_tasks_from_sheet", lambda *a, **k: [TASK])
+    forced = []
+    monkeypatch.setattr(
+        "schedule_app.api.refresh.fetch_blocks_from_sheet",
+        lambda *a, **k: forced.append(k.get("force")) or [BLOCK],
+    )
+    _login(client)
+
+    with patch("schedule_app.api.refresh.GoogleClient", return_value=SlowGClient([EVENT])):
+        data = client.post("/api/refresh?date=2025-01-01").get_json()
+
+    # 手動リフレッシュはブロックのキャッシュも読み飛ばす
+    assert forced == [True]
+    assert {k: data["sources"]["tasks"][k] for k in ("added", "changed", "removed")} == {
+        "added": 0,
+        "changed": 0,
+        "removed": 1,
+    }
+    assert data["sources"]["blocks"]["added"] == 1
+    assert list(TASKS) == ["t1"]
+    BLOCKS.clear()
+
+
+def test_refresh_failure_applies_nothing(client, monkeypatch) -> None:
+    TASKS["old"] = Task(id="old", title="O", category="c", duration_min=10, duration_raw_min=10, priority="B")
+    monkeypatch.setattr("schedule_app.api.refresh.fetch_tasks_from_sheet", _slow([TASK]))
+    monkeypatch.setattr("schedule_app.api.refresh.fetch_blocks_from_sheet", _slow(Exception("boom")))
+    _login(client)
+
+    with patch("schedule_app.api.refresh.GoogleClient", return_value=SlowGClient([EVENT])):
+        resp = client.post("/api/refresh?date=2025-01-01")
+
+    assert resp.status_code == 502
+    data = resp.get_json()
+    _assert_problem_details(data)
+    assert data["sources"]["blocks"]["status"] == "error"
+    assert data["sources"]["tasks"]["status"] == "ok"
+    assert list(TASKS) == ["old"]
+    assert EVENTS == {}
+    assert BLOCKS == {}
+
+
+def test_refresh_unauthorized(client, monkeypatch) -> None:
+    monkeypatch.setattr("schedule_app.api.refresh.fetch_tasks_from_sheet", _slow([]))
+    monkeypatch.setattr("schedule_app.api.refresh.fetch_blocks_from_sheet", _slow([]))
+    _login(client)
+
+    with patch(
+        "schedule_app.api.refresh.GoogleClient",
+        return_value=SlowGClient([], raise_exc=GoogleAPIUnauthorized()),
+    ):
+        resp = client.post("/api/refresh?date=2025-01-01")
+
+    assert resp.status_code == 401
+    _assert_problem_details(resp.get_json())
+
+
+def test_refresh_missing_credentials(client) -> None:
+    resp = client.post("/api/refresh?date=2025-01-01")
+    assert resp.status_code == 401
+    _assert_problem_details(resp.get_json())
+
+
+def test_refresh_missing_date(client) -> None:
+    _login(client)
+    resp = client.post("/api/refresh")
+    assert resp.status_code == 400
+    _assert_problem_details(resp.get_json())
+
+
+def test_refresh_propagates_deadline_to_workers(app, client, monkeypatch) -> None:
+    from schedule_app.services import deadline
+
+    app.config["REQUEST_DEADLINE_MS"] = 100
+
+    def expired(*_a, **_k):
+        time.sleep(0.15)
+        deadline.check()
+        return []
+
+    monkeypatch.setattr("schedule_app.api.refresh.fetch_tasks_from_sheet", expired)
+    monkeypatch.setattr("schedule_app.api.refresh.fetch_blocks_from_sheet", _slow([]))
+    _login(client)
+
+    with patch("schedule_app.api.refresh.GoogleClient", return_value=SlowGClient([])):
+        resp = client.post("/api/refresh?date=2025-01-01")
+
+    assert resp.status_code == 504
+    data = resp.get_json()
+    _assert_problem_details(data)
+    assert data["sources"]["tasks"]["status"] == "error"
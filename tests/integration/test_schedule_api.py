@@ -55,3 +55,84 @@ def test_generate_naive_datetime_midday(client) -> None:
     data = resp.get_json()
     assert isinstance(data, dict)
     assert data["date"] == "2025-07-05"
+
+
+def test_generate_freebusy_source(client) -> None:
+    from datetime import datetime, timezone
+    from unittest.mock import MagicMock, patch
+
+    gclient = MagicMock()
+    gclient.free_busy.return_value = [
+        (datetime(2025, 1, 1, 0, 0, tzinfo=timezone.utc), datetime(2025, 1, 1, 1, 0, tzinfo=timezone.utc))
+    ]
+    with client.session_transaction() as sess:
+        sess["credentials"] = {"access_token": "tok"}
+
+    with patch("schedule_app.api.schedule.GoogleClient", return_value=gclient):
+        resp = client.post("/api/schedule/generate?date=2025-01-01&source=freebusy")
+
+    assert resp.status_code == 200
+    assert resp.get_json()["slots"][:6] == [1] * 6
+    gclient.free_busy.assert_called_once()
+
+
+def test_generate_freebusy_requires_credentials(client) -> None:
+    resp = client.post("/api/schedule/generate?date=2025-01-01&source=freebusy")
+    assert resp.status_code == 401
+
+
+def test_generate_invalid_source(client) -> None:
+    resp = client.post("/api/schedule/generate?date=2025-01-01&source=bogus")
+    assert resp.status_code == 400
+
+
+@pytest.fixture()
+def one_task():
+    from schedule_app.api.tasks import TASKS
+    from schedule_app.models import Task
+
+    TASKS.clear()
+    TASKS["t1"] = Task(id="t1", title="", category="", duration_min=30, duration_raw_min=30, priority="A")
+    yield
+    TASKS.clear()
+
+
+def test_generate_rle_format(client, one_task) -> None:
+    resp = client.post("/api/schedule/generate?date=2025-01-01&format=rle")
+
+    assert resp.status_code == 200
+    assert resp.mimetype == "application/vnd.schedule.rle+json"
+    data = resp.get_json()
+    assert set(data) == {"date", "format", "spans", "unplaced"}
+    assert data["spans"][0] == [0, 3, 2, "t1"]
+    assert sum(span[1] for span in data["spans"]) == 144
+
+
+def test_generate_packed_format_via_accept(client, one_task) -> None:
+    from schedule_app.services.schedule_format import unpack_states
+
+    resp = client.post(
+        "/api/schedule/generate?date=2025-01-01",
+        headers={"Accept": "application/vnd.schedule.packed+json"},
+    )
+
+    assert resp.mimetype == "application/vnd.schedule.packed+json"
+    assert "Accept" in resp.headers["Vary"]
+    data = resp.get_json()
+    assert data["placements"] == [["t1", 0, 3]]
+    assert unpack_states(data["states"], 144)[:4] == [2, 2, 2, 0]
+
+
+def test_generate_debug_stats(client, one_task) -> None:
+    data = client.post("/api/schedule/generate?date=2025-01-01&debug=1").get_json()
+
+    assert set(data["debug"]["phases_ms"]) == {"busy_map", "sort", "place", "compact"}
+    assert data["debug"]["placed"] == 1
+    assert data["debug"]["unplaced"] == 0
+    assert data["debug"]["candidates_tried"] == 1
+    assert "debug" not in client.post("/api/schedule/generate?date=2025-01-01").get_json()
+
+
+def test_generate_invalid_format(client) -> None:
+    resp = client.post("/api/schedule/generate?date=2025-01-01&format=xml")
+    assert resp.status_code == 400
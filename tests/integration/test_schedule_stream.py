@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+from schedule_app import create_app
+from schedule_app.api.tasks import TASKS
+from schedule_app.services import changes, schedule
+
+
+@pytest.fixture()
+def app() -> Flask:
+    flask_app = create_app(testing=True)
+    flask_app.config.update(
+        SCHEDULE_STREAM_DEBOUNCE_MS=50,
+        SCHEDULE_STREAM_HEARTBEAT_SEC=0.2,
+        SCHEDULE_STREAM_MAX_SEC=5,
+    )
+    return flask_app
+
+
+@pytest.fixture()
+def client(app: Flask):
+    TASKS.clear()
+    yield app.test_client()
+    TASKS.clear()
+
+
+def _parse(message: bytes) -> dict:
+    fields: dict = {}
+    for line in message.decode().strip().split("\n"):
+        name, _, value = line.partition(": ")
+        fields[name] = value
+    if "data" in fields:
+        fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+def _task(title: str, minutes: int = 30) -> dict:
+    return {
+        "title": title,
+        "category": "general",
+        "duration_min": minutes,
+        "duration_raw_min": minutes,
+        "priority": "A",
+    }
+
+
+def test_stream_sends_schedule_first(client) -> None:
+    resp = client.get("/api/schedule/stream?date=2025-01-01&format=rle")
+    stream = iter(resp.response)
+    try:
+        first = _parse(next(stream))
+    finally:
+        resp.close()
+
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/event-stream"
+    assert resp.headers["Cache-Control"] == "no-cache"
+    assert first["event"] == "schedule"
+    assert first["retry"] == "3000"
+    assert int(first["id"]) == changes.version()
+    assert first["data"]["date"] == "2025-01-01"
+    assert first["data"]["spans"] == [[0, 144, 0, None]]
+
+
+def test_stream_pushes_one_diff_for_a_burst(client, monkeypatch) -> None:
+    calls = []
+    compute = schedule.compute_schedule
+    monkeypatch.setattr(schedule, "compute_schedule", lambda *a, **kw: calls.append(1) or compute(*a, **kw))
+
+    resp = client.get("/api/schedule/stream?date=2025-01-01")
+    stream = iter(resp.response)
+    try:
+        assert _parse(next(stream))["event"] == "schedule"
+        for i in range(3):
+            assert client.post("/api/tasks", json=_task(f"T{i}")).status_code == 201
+        diff = _parse(next(stream))
+    finally:
+        resp.close()
+
+    assert diff["event"] == "diff"
+    assert int(diff["id"]) == changes.version()
+    assert sum(length for _start, length, state, _tid in diff["data"]["spans"] if state == 2) == 9
+    assert diff["data"]["unplaced"] == []
+    # 初回 + 3 件の編集をまとめた 1 回
+    assert len(calls) == 2
+
+
+def test_streams_share_one_recompute_per_change(client, monkeypatch) -> None:
+    calls = []
+    compute = schedule.compute_schedule
+    monkeypatch.setattr(schedule, "compute_schedule", lambda *a, **kw: calls.append(1) or compute(*a, **kw))
+
+    responses = [client.get("/api/schedule/stream?date=2025-01-01") for _ in range(3)]
+    streams = [iter(resp.response) for resp in responses]
+    try:
+        assert all(_parse(next(s))["event"] == "schedule" for s in streams)
+        assert client.post("/api/tasks", json=_task("T")).status_code == 201
+        diffs = [_parse(next(s)) for s in streams]
+    finally:
+        # stream_with_context のコンテキストは後に開いたものから閉じる
+        for resp in reversed(responses):
+            resp.close()
+
+    assert [d["event"] for d in diffs] == ["diff"] * 3
+    assert len({json.dumps(d["data"]) for d in diffs}) == 1
+    # 初回 1 回 + 変更 1 回。接続数には比例しない
+    assert len(calls) == 2
+
+
+def test_stream_debounces_edits_from_other_threads(client) -> None:
+    resp = client.get("/api/schedule/stream?date=2025-01-01")
+    stream = iter(resp.response)
+
+    def edit() -> None:
+        for i in range(3):
+            client.post("/api/tasks", json=_task(f"T{i}", 10))
+            time.sleep(0.01)
+
+    try:
+        next(stream)
+        worker = threading.Thread(target=edit)
+        worker.start()
+        diff = _parse(next(stream))
+        worker.join()
+    finally:
+        resp.close()
+
+    assert diff["event"] == "diff"
+    assert sum(span[1] for span in diff["data"]["spans"]) == 3
+
+
+def test_stream_heartbeat_without_changes(client) -> None:
+    resp = client.get("/api/schedule/stream?date=2025-01-01")
+    stream = iter(resp.response)
+    try:
+        next(stream)
+        assert next(stream) == b": keepalive\n\n"
+    finally:
+        resp.close()
+
+
+def test_stream_skips_changes_that_do_not_move_slots(client) -> None:
+    resp = client.get("/api/schedule/stream?date=2025-01-01")
+    stream = iter(resp.response)
+    try:
+        next(stream)
+        changes.publish("events")
+        assert next(stream) == b": keepalive\n\n"
+    finally:
+        resp.close()
+
+
+def test_stream_rejects_bad_params(client) -> None:
+    assert client.get("/api/schedule/stream").status_code == 400
+    assert client.get("/api/schedule/stream?date=2025-01-01&format=xml").status_code == 400
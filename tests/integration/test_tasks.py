@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import json
-import time
 from typing import Any
 
 import pytest
@@ -10,6 +9,7 @@ from flask import Flask
 from schedule_app import create_app
 from schedule_app.api.tasks import TASKS
 from schedule_app.models import Task
+from schedule_app.services.google_client import GoogleAPIUnauthorized
 from schedule_app.services.sheets_tasks import InvalidSheetRowError
 from unittest.mock import patch
 
@@ -214,6 +214,23 @@ def test_import_tasks_validation_error(client) -> None:
     _assert_problem_details(resp.get_json())
 
 
+def test_import_tasks_validation_error_lists_rows(client) -> None:
+    errors = [
+        {"row": 3, "field": "priority", "detail": "invalid priority"},
+        {"row": 5, "field": "duration_min", "detail": "invalid duration"},
+    ]
+    with patch(
+        "schedule_app.api.tasks.fetch_tasks_from_sheet",
+        side_effect=InvalidSheetRowError("2 invalid rows", errors=errors),
+    ):
+        resp = client.get("/api/tasks/import")
+
+    assert resp.status_code == 422
+    data = resp.get_json()
+    _assert_problem_details(data)
+    assert data["errors"] == errors
+
+
 def test_import_tasks_api_error(client) -> None:
     with patch(
         "schedule_app.api.tasks.fetch_tasks_from_sheet",
@@ -236,6 +253,17 @@ def test_import_tasks_missing_credentials(client) -> None:
     _assert_problem_details(resp.get_json())
 
 
+def test_import_tasks_google_unauthorized(client) -> None:
+    with patch(
+        "schedule_app.api.tasks.fetch_tasks_from_sheet",
+        side_effect=GoogleAPIUnauthorized(),
+    ):
+        resp = client.get("/api/tasks/import")
+
+    assert resp.status_code == 401
+    _assert_problem_details(resp.get_json())
+
+
 def _create_sample_task(client) -> str:
     payload = {
         "title": "Old",
@@ -358,18 +386,16 @@ def test_clear_cache_endpoint(client, monkeypatch) -> None:
     current = {"val": tasks1}
     calls = {"n": 0}
 
-    def fake_fetch(_session, *, force=False):
-        if not force and st._CACHE is not None:
-            tasks, expiry = st._CACHE
-            if time.time() < expiry:
-                return tasks
+    def load():
         calls["n"] += 1
-        st._CACHE = (current["val"], time.time() + 60)
         return current["val"]
 
+    def fake_fetch(_session, *, force=False):
+        return st._CACHE.get_or_load(st.tasks_cache_key("tok", "sid", "rng"), load, force=force)
+
     monkeypatch.setattr("schedule_app.api.tasks.fetch_tasks_from_sheet", fake_fetch)
 
-    st._CACHE = None
+    st.invalidate_cache()
     resp = client.get("/api/tasks/import")
     assert resp.status_code == 200
     assert calls["n"] == 1
@@ -380,7 +406,7 @@ def test_clear_cache_endpoint(client, monkeypatch) -> None:
 
     resp = client.delete("/api/tasks/cache")
     assert resp.status_code == 204
-    assert st._CACHE is None
+    assert len(st._CACHE) == 0
 
     current["val"] = tasks2
     resp = client.get("/api/tasks/import")
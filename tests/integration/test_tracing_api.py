@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from schedule_app import create_app
+from schedule_app.api.tasks import TASKS
+from schedule_app.models import Task
+from schedule_app.services import tracing
+
+
+@pytest.fixture()
+def traced_app(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    env = {"TRACE_EXPORTER": "jsonl", "TRACE_FILE": str(path), "TRACE_SAMPLE_RATE": "1"}
+    with patch.dict(os.environ, env):
+        app = create_app(testing=True)
+    yield app, path
+    tracing.shutdown()
+
+
+def test_generate_request_is_traced(traced_app) -> None:
+    app, path = traced_app
+    TASKS.clear()
+    TASKS["t1"] = Task(id="t1", title="", category="", duration_min=30, duration_raw_min=30, priority="A")
+    try:
+        resp = app.test_client().post("/api/schedule/generate?date=2025-01-01")
+    finally:
+        TASKS.clear()
+    tracing.shutdown()
+
+    assert resp.status_code == 200
+    spans = {s["name"]: s for s in map(json.loads, path.read_text().splitlines())}
+    root = spans["POST /api/schedule/generate"]
+    assert root["kind"] == "server"
+    assert root["attributes"]["http.status_code"] == 200
+    assert resp.headers["traceparent"] == f"00-{root['trace_id']}-{root['span_id']}-01"
+
+    generate = spans["schedule.generate"]
+    assert generate["parent_id"] == root["span_id"]
+    # busy map が未メモなら、その構築（ストア走査）は generate の busy_map 区間で行う
+    assert spans["schedule.store_scan"]["parent_id"] == generate["span_id"]
+    busy_map = spans["schedule.busy_map"]
+    scan = spans["schedule.store_scan"]
+    assert busy_map["start_ns"] <= scan["start_ns"] and scan["end_ns"] <= busy_map["end_ns"]
+    assert generate["attributes"]["placed"] == 1
+    for phase in ("busy_map", "sort", "place", "compact"):
+        assert spans[f"schedule.{phase}"]["parent_id"] == generate["span_id"]
+    assert {s["trace_id"] for s in spans.values()} == {root["trace_id"]}
+
+
+def test_incoming_traceparent_is_continued(traced_app) -> None:
+    app, path = traced_app
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+    app.test_client().get("/api/health", headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"})
+    tracing.shutdown()
+
+    (root,) = map(json.loads, path.read_text().splitlines())
+    assert root["trace_id"] == trace_id
+    assert root["parent_id"] == "00f067aa0ba902b7"
+
+
+def test_tracing_is_off_by_default() -> None:
+    tracing.shutdown()
+    app = create_app(testing=True)
+
+    resp = app.test_client().get("/api/health")
+
+    assert "traceparent" not in resp.headers
+    assert tracing._TRACER is None
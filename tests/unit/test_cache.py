@@ -0,0 +1,168 @@
+from datetime import timedelta
+import threading
+
+from freezegun import freeze_time
+import pytest
+
+from schedule_app.services import cache as cache_module
+from schedule_app.services.cache import SingleFlight, TTLCache, cache_stats
+
+
+def _windows(ttl=10, stale=0, stale_if_error=0):
+    return lambda: (ttl, stale, stale_if_error)
+
+
+def test_ttl_expiry():
+    with freeze_time("2025-01-01T00:00:00Z") as frozen:
+        cache = TTLCache("test.ttl", windows=_windows(ttl=10))
+        cache.set("k", 1)
+        assert cache.get("k") == 1
+        frozen.tick(delta=timedelta(seconds=11))
+        assert cache.get("k") is None
+
+
+def test_lru_eviction_by_entries():
+    cache = TTLCache("test.lru", maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # a becomes most recently used
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_eviction_by_bytes():
+    cache = TTLCache("test.bytes", max_bytes=250, sizeof=lambda v: 100)
+    for key in "abc":
+        cache.set(key, key)
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["bytes"] == 200
+    assert "a" not in cache
+
+
+def test_keys_are_isolated():
+    cache = TTLCache("test.keys")
+    assert cache.get_or_load(("u1", "s", "r"), lambda: "one") == "one"
+    assert cache.get_or_load(("u2", "s", "r"), lambda: "two") == "two"
+    assert cache.get_or_load(("u1", "s", "r"), lambda: "other") == "one"
+    assert len(cache) == 2
+
+
+def test_stats_counts_hits_and_misses():
+    cache = TTLCache("test.stats")
+    cache.get_or_load("k", lambda: 1)
+    cache.get_or_load("k", lambda: 2)
+
+    stats = cache_stats()["test.stats"]
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+    assert stats["loads"] == 1
+    assert stats["hit_ratio"] == 0.5
+    assert stats["bytes"] > 0
+
+
+def test_passthrough_errors_skip_stale_if_error():
+    with freeze_time("2025-01-01T00:00:00Z") as frozen:
+        cache = TTLCache("test.passthrough", windows=_windows(ttl=10, stale_if_error=60))
+        cache.set("k", "old")
+        frozen.tick(delta=timedelta(seconds=11))
+
+        def boom():
+            raise KeyError("bad row")
+
+        with pytest.raises(KeyError):
+            cache.get_or_load("k", boom, passthrough=(KeyError,))
+        assert cache.get_or_load("k", boom) == "old"
+        assert cache.stats()["stale_errors"] == 1
+
+
+def test_hold_serves_expired_entry_as_stale():
+    with freeze_time("2025-01-01T00:00:00Z") as frozen:
+        cache = TTLCache("test.hold", windows=_windows(ttl=10))
+        assert cache.hold("k", 3600) is False
+        cache.set("k", "warm")
+        assert cache.hold("k", 3600) is True
+        frozen.tick(delta=timedelta(minutes=30))
+
+        assert cache.get_or_load("k", lambda: "new") == "warm"
+        assert cache.stats()["stale_hits"] == 1
+
+        frozen.tick(delta=timedelta(minutes=31))
+        cache.set("k", "warm")
+        cache.hold("k", 0)
+        frozen.tick(delta=timedelta(seconds=11))
+        assert cache.get_or_load("k", lambda: "new") == "new"
+
+
+def test_invalidate_discards_in_flight_result():
+    cache = TTLCache("test.generation")
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(timeout=5)
+        return "stale"
+
+    thread = threading.Thread(target=lambda: cache.get_or_load("k", slow))
+    thread.start()
+    started.wait(timeout=5)
+    cache.invalidate()
+    release.set()
+    thread.join(timeout=5)
+
+    assert "k" not in cache
+
+
+def test_do_async_runs_on_a_bounded_pool():
+    flight = SingleFlight()
+    release = threading.Event()
+    lock = threading.Lock()
+    running = {"now": 0, "peak": 0}
+    threads: set[str] = set()
+
+    def refresh():
+        with lock:
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+            threads.add(threading.current_thread().name)
+        release.wait(timeout=5)
+        with lock:
+            running["now"] -= 1
+        return "fresh"
+
+    futures = [flight.do_async(f"k{i}", refresh) for i in range(cache_module.REFRESH_WORKERS * 3)]
+    assert flight.do_async("k0", refresh) is futures[0]
+    release.set()
+
+    assert [f.result(timeout=5) for f in futures] == ["fresh"] * len(futures)
+    assert running["peak"] <= cache_module.REFRESH_WORKERS
+    assert len(threads) <= cache_module.REFRESH_WORKERS
+    assert all(name.startswith("singleflight") for name in threads)
+    assert not any(flight.in_flight(f"k{i}") for i in range(len(futures)))
+
+
+def test_get_or_load_async_shares_one_load():
+    import asyncio
+
+    cache = TTLCache("test.async", maxsize=4)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_load_async("k", loader) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["value"] * 5
+    assert calls == [1]
+    assert cache.get("k") == "value"
+    assert asyncio.run(cache.get_or_load_async("k", loader)) == "value"
+    assert calls == [1]
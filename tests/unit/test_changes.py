@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from schedule_app.services import changes
+
+
+def test_wait_returns_after_publish() -> None:
+    seen = changes.version()
+    timer = threading.Timer(0.05, changes.publish, args=("tasks",))
+    timer.start()
+
+    assert changes.wait(seen, timeout=5) == seen + 1
+    timer.join()
+
+
+def test_wait_times_out_unchanged() -> None:
+    seen = changes.version()
+    assert changes.wait(seen, timeout=0.01) == seen
+
+
+def test_settle_collects_a_burst() -> None:
+    first = changes.publish("tasks")
+
+    def burst() -> None:
+        for _ in range(3):
+            time.sleep(0.01)
+            changes.publish("blocks")
+
+    worker = threading.Thread(target=burst)
+    worker.start()
+    latest = changes.settle(first, 0.1, limit=2)
+    worker.join()
+
+    assert latest == first + 3 == changes.version()
+
+
+def test_settle_gives_up_at_limit() -> None:
+    first = changes.publish("tasks")
+    stop = threading.Event()
+
+    def flood() -> None:
+        while not stop.is_set():
+            changes.publish("events")
+            time.sleep(0.005)
+
+    worker = threading.Thread(target=flood)
+    worker.start()
+    started = time.monotonic()
+    try:
+        latest = changes.settle(first, 0.05, limit=0.2)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert latest > first
+    assert time.monotonic() - started < 1
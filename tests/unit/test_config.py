@@ -9,6 +9,8 @@ def test_defaults(monkeypatch):
     monkeypatch.delenv("SHEETS_CACHE_SEC", raising=False)
     monkeypatch.delenv("BLOCKS_SHEET_ID", raising=False)
     monkeypatch.delenv("SHEETS_BLOCK_RANGE", raising=False)
+    monkeypatch.delenv("SHEETS_STALE_SEC", raising=False)
+    monkeypatch.delenv("SHEETS_STALE_IF_ERROR_SEC", raising=False)
 
     # Reload module to apply env changes
     importlib.reload(config_module)
@@ -19,3 +21,20 @@ def test_defaults(monkeypatch):
     assert cfg.SHEETS_TASKS_SSID is None
     assert cfg.BLOCKS_SHEET_ID is None
     assert cfg.SHEETS_BLOCK_RANGE == "Blocks!A2:C"
+    assert cfg.SHEETS_STALE_SEC == 300
+    assert cfg.SHEETS_STALE_IF_ERROR_SEC == 3600
+
+
+def test_calendar_ids(monkeypatch):
+    monkeypatch.setenv("CALENDAR_IDS", "primary, team@example.com ,,room@example.com")
+    try:
+        importlib.reload(config_module)
+        assert config_module.cfg.CALENDAR_IDS == (
+            "primary",
+            "team@example.com",
+            "room@example.com",
+        )
+    finally:
+        monkeypatch.delenv("CALENDAR_IDS")
+        importlib.reload(config_module)
+    assert config_module.cfg.CALENDAR_IDS == ("primary",)
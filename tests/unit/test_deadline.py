@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import contextvars
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+
+import pytest
+
+from schedule_app.services import deadline, resilience
+from schedule_app.services.resilience import RetryPolicy, call_google, http_timeout
+
+
+def _http_error(code: int) -> HTTPError:
+    return HTTPError("https://example.com", code, "err", {}, io.BytesIO(b""))
+
+
+def test_remaining_is_none_without_deadline() -> None:
+    assert deadline.remaining() is None
+    deadline.check()
+    assert deadline.clamp_timeout(5.0) == 5.0
+
+
+def test_clamp_timeout_uses_time_left() -> None:
+    with deadline.deadline(0.5):
+        assert 0 < deadline.clamp_timeout(10.0) <= 0.5
+        assert deadline.clamp_timeout(0.1) == 0.1
+    assert deadline.remaining() is None
+
+
+def test_expired_deadline_raises() -> None:
+    with deadline.deadline(0):
+        with pytest.raises(deadline.DeadlineExceeded):
+            deadline.check()
+        with pytest.raises(deadline.DeadlineExceeded):
+            http_timeout()
+
+
+def test_deadline_propagates_to_copied_context() -> None:
+    with deadline.deadline(1.0):
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            left = pool.submit(contextvars.copy_context().run, deadline.remaining).result()
+    assert left is not None and 0 < left <= 1.0
+
+
+def test_call_google_stops_retrying_when_deadline_is_short() -> None:
+    calls: list[int] = []
+
+    def fn():
+        calls.append(1)
+        raise _http_error(503)
+
+    policy = RetryPolicy(max_attempts=5, base_delay=0.2, max_delay=1.0)
+    with deadline.deadline(0.1):
+        with pytest.raises(deadline.DeadlineExceeded):
+            call_google("test.deadline", fn, policy=policy, sleep=lambda _s: None)
+    assert len(calls) == 1
+    assert resilience.breaker_for("test.deadline").snapshot() == {"state": "closed", "failures": 0}
+
+
+def test_timeout_from_clamped_deadline_is_not_a_breaker_failure() -> None:
+    def fn():
+        # http_timeout() が残り時間に切り詰めたタイムアウトを模す
+        time.sleep(max(0.0, deadline.remaining()) + 0.01)
+        raise TimeoutError("timed out")
+
+    with deadline.deadline(0.02):
+        with pytest.raises(deadline.DeadlineExceeded):
+            call_google("test.clamped", fn, policy=RetryPolicy(max_attempts=1))
+    assert resilience.breaker_for("test.clamped").snapshot() == {"state": "closed", "failures": 0}
+
+
+def test_call_google_does_not_start_after_deadline() -> None:
+    calls: list[int] = []
+    with deadline.deadline(0):
+        with pytest.raises(deadline.DeadlineExceeded):
+            call_google("test.expired", lambda: calls.append(1))
+    assert calls == []
+    assert resilience.breaker_for("test.expired").state == "closed"
+
+
+def test_request_has_deadline(monkeypatch) -> None:
+    from schedule_app import create_app
+
+    app = create_app(testing=True)
+    app.config["REQUEST_DEADLINE_MS"] = 250
+    seen: list[float | None] = []
+
+    @app.get("/_deadline")
+    def _deadline_view():
+        seen.append(deadline.remaining())
+        return "ok"
+
+    resp = app.test_client().get("/_deadline")
+    assert resp.status_code == 200
+    assert seen[0] is not None and 0 < seen[0] <= 0.25
+    assert deadline.remaining() is None
+
+
+def test_deadline_exceeded_maps_to_504() -> None:
+    from schedule_app import create_app
+
+    app = create_app(testing=True)
+
+    @app.get("/_slow")
+    def _slow_view():
+        time.sleep(0.01)
+        raise deadline.DeadlineExceeded()
+
+    resp = app.test_client().get("/_slow")
+    assert resp.status_code == 504
+    assert resp.mimetype == "application/problem+json"
+    assert resp.get_json()["type"].endswith("/gateway-timeout")
+
+
+def test_request_deadline_comes_from_config(monkeypatch) -> None:
+    import dataclasses
+
+    from schedule_app import config, create_app
+
+    monkeypatch.setattr(config, "cfg", dataclasses.replace(config.cfg, REQUEST_DEADLINE_MS=1234))
+    assert create_app(testing=True).config["REQUEST_DEADLINE_MS"] == 1234
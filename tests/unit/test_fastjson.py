@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+
+import pytest
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+
+from schedule_app import create_app
+from schedule_app.models import Block
+from schedule_app.utils import fastjson
+
+pytestmark = pytest.mark.skipif(not fastjson.available(), reason="orjson missing")
+
+
+@dataclass(frozen=True)
+class Point:
+    x: int
+    y: int
+
+
+PAYLOAD = {
+    "b": [1, 2.5, None, True],
+    "a": "日本語",
+    "when": date(2025, 1, 2),
+    "at": datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+    "id": uuid.UUID(int=1),
+    "point": Point(1, 2),
+}
+
+
+def _body(app: Flask) -> bytes:
+    with app.test_request_context():
+        return jsonify(PAYLOAD).get_data()
+
+
+def test_create_app_installs_orjson_provider() -> None:
+    assert isinstance(create_app(testing=True).json, fastjson.OrjsonProvider)
+
+
+def test_orjson_provider_matches_stock_output() -> None:
+    stock = Flask("stock")
+    fast = Flask("fast")
+    fast.json = fastjson.OrjsonProvider(fast)
+
+    assert json.loads(_body(fast)) == json.loads(_body(stock))
+    assert _body(fast).endswith(b"\n")
+    # sort_keys は Flask と同じく既定で有効
+    assert list(json.loads(_body(fast))) == sorted(PAYLOAD)
+    assert fast.json.loads(fast.json.dumps(PAYLOAD))["when"] == DefaultJSONProvider.default(PAYLOAD["when"])
+
+
+def test_orjson_provider_parses_request_bodies() -> None:
+    app = Flask("fast")
+    app.json = fastjson.OrjsonProvider(app)
+
+    @app.post("/echo")
+    def echo():
+        from flask import request
+
+        return jsonify(request.get_json())
+
+    resp = app.test_client().post("/echo", json={"x": [1, "二"]})
+    assert resp.get_json() == {"x": [1, "二"]}
+
+
+def test_fragment_cache_encodes_each_value_once() -> None:
+    calls: list[Block] = []
+
+    def to_dict(blk: Block) -> dict:
+        calls.append(blk)
+        return {"id": blk.id}
+
+    fragment = fastjson.fragment_cache(to_dict)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    first = fragment(Block(id="b1", start_utc=start, end_utc=start))
+    again = fragment(Block(id="b1", start_utc=start, end_utc=start))
+
+    assert first is again == b'{"id":"b1"}'
+    assert len(calls) == 1
+
+    with Flask("x").app_context():
+        resp = fastjson.array_response([first, b'{"id":"b2"}'])
+    assert resp.mimetype == "application/json"
+    assert resp.get_json() == [{"id": "b1"}, {"id": "b2"}]
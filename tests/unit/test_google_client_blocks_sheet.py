@@ -1,8 +1,11 @@
 import json
 import importlib
+import threading
+from urllib.error import URLError
 from datetime import datetime, timezone, timedelta
 
 from freezegun import freeze_time
+import pytest
 
 
 class DummyResponse:
@@ -19,26 +22,27 @@ class DummyResponse:
         return False
 
 
-def _setup(monkeypatch, rows, cache_sec=60):
+def _setup(monkeypatch, rows, cache_sec=60, stale_sec=0):
     import schedule_app.config as config_module
 
     monkeypatch.setenv("BLOCKS_SHEET_ID", "sheet-id")
     monkeypatch.setenv("SHEETS_BLOCK_RANGE", "Blocks!A2:C")
     monkeypatch.setenv("SHEETS_CACHE_SEC", str(cache_sec))
+    monkeypatch.setenv("SHEETS_STALE_SEC", str(stale_sec))
 
     importlib.reload(config_module)
 
     import schedule_app.services.google_client as gc
 
     gc.config_module = config_module
-    gc._BLOCK_CACHE = None
+    gc.invalidate_blocks_cache()
 
     class DummyURL:
         def __init__(self, rows):
             self.rows = rows
             self.calls = 0
 
-        def __call__(self, req):  # pragma: no cover - simple stub
+        def __call__(self, req, timeout=None):  # pragma: no cover - simple stub
             self.calls += 1
             return DummyResponse({"values": self.rows})
 
@@ -51,7 +55,7 @@ def _setup(monkeypatch, rows, cache_sec=60):
 def test_setup_reload(monkeypatch):
     gc, _service = _setup(monkeypatch, [])
     assert gc.config_module.cfg.BLOCKS_SHEET_ID == "sheet-id"
-    assert gc._BLOCK_CACHE is None
+    assert len(gc._BLOCK_CACHE) == 0
 
 
 def test_fetch_blocks_basic(monkeypatch):
@@ -91,7 +95,7 @@ def test_fetch_blocks_cache(monkeypatch):
                 self.rows = rows
                 self.calls = 0
 
-            def __call__(self, req):  # pragma: no cover - simple stub
+            def __call__(self, req, timeout=None):  # pragma: no cover - simple stub
                 self.calls += 1
                 return DummyResponse({"values": self.rows})
 
@@ -106,3 +110,224 @@ def test_fetch_blocks_cache(monkeypatch):
         blocks3 = gc.fetch_blocks_from_sheet("sheet-id", "Blocks!A2:C")
         assert service2.calls == 1
         assert blocks3 != blocks1
+
+
+ROWS_A = [["start_utc", "end_utc", "title"], ["2025-01-01T00:00:00Z", "2025-01-01T00:10:00Z", "A"]]
+ROWS_B = [["start_utc", "end_utc", "title"], ["2025-01-01T01:00:00Z", "2025-01-01T01:10:00Z", "B"]]
+
+
+def test_fetch_blocks_stale_while_revalidate(monkeypatch):
+    with freeze_time("2025-01-01T00:00:00Z") as frozen:
+        gc, service = _setup(monkeypatch, ROWS_A, cache_sec=10, stale_sec=30)
+        first = gc.fetch_blocks_from_sheet("sheet-id", "Blocks!A2:C")
+        assert service.calls == 1
+
+        service.rows = ROWS_B
+        frozen.tick(delta=timedelta(seconds=11))
+        stale = gc.fetch_blocks_from_sheet("sheet-id", "Blocks!A2:C")
+        assert stale == first
+
+        gc._BLOCK_CACHE.wait(gc.blocks_cache_key("sheet-id", "Blocks!A2:C"), timeout=5)
+        assert service.calls == 2
+        fresh = gc.fetch_blocks_from_sheet("sheet-id", "Blocks!A2:C")
+        assert [b.title for b in fresh] == ["B"]
+        assert service.calls == 2
+
+
+def test_fetch_blocks_force_skips_fresh_and_stale_entries(monkeypatch):
+    with freeze_time("2025-01-01T00:00:00Z"):
+        gc, service = _setup(monkeypatch, ROWS_A, cache_sec=10, stale_sec=30)
+        gc.fetch_blocks_from_sheet("sheet-id", "Blocks!A2:C")
+
+        service.rows = ROWS_B
+        forced = gc.fetch_blocks_from_sheet("sheet-id", "Blocks!A2:C", force=True)
+
+        assert service.calls == 2
+        assert [b.title for b in forced] == ["B"]
+
+
+def test_fetch_blocks_single_flight(monkeypatch):
+    gc, service = _setup(monkeypatch, ROWS_A)
+    release = threading.Event()
+
+    def slow_urlopen(req, timeout=None):
+        service.calls += 1
+        release.wait(timeout=5)
+        return DummyResponse({"values": ROWS_A})
+
+    monkeypatch.setattr(gc.request, "urlopen", slow_urlopen)
+
+    results: list = []
+    threads = [
+        threading.Thread(target=lambda: results.append(gc.fetch_blocks_from_sheet("sheet-id", "Blocks!A2:C")))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    key = gc.blocks_cache_key("sheet-id", "Blocks!A2:C")
+    while not gc._BLOCK_CACHE.loading(key):
+        pass
+    release.set()
+    for t in threads:
+        t.join(timeout=5)
+
+    assert service.calls == 1
+    assert len(results) == 5
+    assert all(r is results[0] for r in results)
+
+
+def test_fetch_blocks_stale_if_error(monkeypatch):
+    with freeze_time("2025-01-01T00:00:00Z") as frozen:
+        gc, _service = _setup(monkeypatch, ROWS_A, cache_sec=10)
+        monkeypatch.setenv("SHEETS_STALE_IF_ERROR_SEC", "60")
+        importlib.reload(gc.config_module)
+        first = gc.fetch_blocks_from_sheet("sheet-id", "Blocks!A2:C")
+
+        def down(req, timeout=None):
+            raise URLError("unreachable")
+
+        monkeypatch.setattr(gc.request, "urlopen", down)
+
+        frozen.tick(delta=timedelta(seconds=30))
+        assert gc.fetch_blocks_from_sheet("sheet-id", "Blocks!A2:C") == first
+
+        frozen.tick(delta=timedelta(seconds=60))
+        with pytest.raises(URLError):
+            gc.fetch_blocks_from_sheet("sheet-id", "Blocks!A2:C")
+
+
+def test_fetch_blocks_unchanged_rows_are_not_reparsed(monkeypatch):
+    with freeze_time("2025-01-01T00:00:00Z") as frozen:
+        gc, service = _setup(monkeypatch, ROWS_A, cache_sec=10)
+        gc._BLOCK_PARSED.clear()
+        parsed = {"n": 0}
+        original = gc.parse_block_rows
+
+        def counting(rows, **kw):
+            parsed["n"] += 1
+            return original(rows, **kw)
+
+        monkeypatch.setattr(gc, "parse_block_rows", counting)
+
+        first = gc.fetch_blocks_from_sheet("sheet-id", "Blocks!A2:C")
+        frozen.tick(delta=timedelta(seconds=11))
+        second = gc.fetch_blocks_from_sheet("sheet-id", "Blocks!A2:C")
+
+        assert service.calls == 2
+        assert parsed["n"] == 1
+        assert second is first
+        assert second[0].id == first[0].id
+
+        service.rows = ROWS_B
+        frozen.tick(delta=timedelta(seconds=11))
+        third = gc.fetch_blocks_from_sheet("sheet-id", "Blocks!A2:C")
+        assert parsed["n"] == 2
+        assert [b.title for b in third] == ["B"]
+
+
+def test_fetch_blocks_etag_not_modified(monkeypatch):
+    from urllib.error import HTTPError
+
+    with freeze_time("2025-01-01T00:00:00Z") as frozen:
+        gc, _service = _setup(monkeypatch, ROWS_A, cache_sec=10)
+        gc._BLOCK_PARSED.clear()
+        seen: list = []
+
+        class ETagResponse(DummyResponse):
+            headers = {"ETag": '"v1"'}
+
+        def urlopen(req, timeout=None):
+            seen.append(req.get_header("If-none-match"))
+            if req.get_header("If-none-match") == '"v1"':
+                raise HTTPError(req.full_url, 304, "Not Modified", {}, None)
+            return ETagResponse({"values": ROWS_A})
+
+        monkeypatch.setattr(gc.request, "urlopen", urlopen)
+
+        first = gc.fetch_blocks_from_sheet("sheet-id", "Blocks!A2:C")
+        frozen.tick(delta=timedelta(seconds=11))
+        second = gc.fetch_blocks_from_sheet("sheet-id", "Blocks!A2:C")
+
+        assert seen == [None, '"v1"']
+        assert second is first
+
+
+def test_fetch_blocks_not_modified_after_memo_eviction(monkeypatch):
+    from urllib.error import HTTPError
+
+    with freeze_time("2025-01-01T00:00:00Z") as frozen:
+        gc, _service = _setup(monkeypatch, ROWS_A, cache_sec=10)
+        gc._BLOCK_PARSED.clear()
+        seen: list = []
+
+        class ETagResponse(DummyResponse):
+            headers = {"ETag": '"v1"'}
+
+        def urlopen(req, timeout=None):
+            seen.append(req.get_header("If-none-match"))
+            if req.get_header("If-none-match") == '"v1"':
+                # etag() は読めたが reuse() の前にメモが消えた
+                gc._BLOCK_PARSED.clear()
+                raise HTTPError(req.full_url, 304, "Not Modified", {}, None)
+            return ETagResponse({"values": ROWS_A})
+
+        monkeypatch.setattr(gc.request, "urlopen", urlopen)
+
+        first = gc.fetch_blocks_from_sheet("sheet-id", "Blocks!A2:C")
+        frozen.tick(delta=timedelta(seconds=11))
+        second = gc.fetch_blocks_from_sheet("sheet-id", "Blocks!A2:C")
+
+        assert seen == [None, '"v1"', None]
+        assert [b.title for b in second] == [b.title for b in first]
+
+
+def test_parse_block_rows_reads_optional_rrule():
+    from schedule_app.services.google_client import parse_block_rows
+
+    rows = [
+        ["start_utc", "end_utc", "title", "rrule"],
+        ["2025-01-01T00:00:00Z", "2025-01-01T01:00:00Z", "Gym", "FREQ=WEEKLY;BYDAY=WE"],
+        ["2025-01-02T00:00:00Z", "2025-01-02T01:00:00Z", "Once"],
+    ]
+    blocks = parse_block_rows(rows)
+    assert [b.rrule for b in blocks] == ["FREQ=WEEKLY;BYDAY=WE", None]
+
+
+def test_parse_block_rows_collects_every_invalid_row():
+    from schedule_app.errors import InvalidBlockRow
+    from schedule_app.services.google_client import parse_block_rows
+
+    rows = [
+        ["start_utc", "end_utc", "title"],
+        ["2025-01-01T00:00:00Z", "2025-01-01T01:00:00Z", "ok"],
+        ["bad", "2025-01-01T01:00:00Z", "x"],
+        ["2025-01-01T02:00:00Z", "2025-01-01T01:00:00Z", "y"],
+        ["2025-01-01T02:00:00Z"],
+    ]
+    with pytest.raises(InvalidBlockRow) as info:
+        parse_block_rows(rows, first_row=2)
+
+    assert info.value.errors == [
+        {"row": 4, "field": "start_utc", "detail": "invalid datetime"},
+        {"row": 6, "field": "end_utc", "detail": "missing datetime"},
+        {"row": 5, "field": "end_utc", "detail": "end must be after start"},
+    ]
+    assert info.value.description == "3 invalid rows (first: row 4: invalid datetime)"
+
+
+def test_parse_block_rows_ids_are_stable():
+    from schedule_app.services.google_client import parse_block_rows
+
+    rows = [
+        ["start_utc", "end_utc", "title"],
+        ["2025-01-01T00:00:00Z", "2025-01-01T01:00:00Z", "Gym"],
+        ["2025-01-02T00:00:00Z", "2025-01-02T01:00:00Z", "Gym"],
+    ]
+    first = parse_block_rows(rows)
+    rows[1][1] = "2025-01-01T02:00:00Z"
+    second = parse_block_rows(rows)
+
+    assert [b.id for b in first] == [b.id for b in second]
+    assert first[0].id != first[1].id
+    # 他の行の有無に関係なく同じ ID になる
+    assert parse_block_rows(rows[:2])[0].id == first[0].id
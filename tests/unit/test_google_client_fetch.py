@@ -1,6 +1,12 @@
-import pytest
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib import parse
 from urllib.error import HTTPError
 
+import pytest
+
 from schedule_app.services.google_client import GoogleClient, GoogleAPIUnauthorized
 
 
@@ -8,7 +14,7 @@ from schedule_app.services.google_client import GoogleClient, GoogleAPIUnauthori
 def test_fetch_unauthorized(monkeypatch, status):
     client = GoogleClient(credentials={"access_token": "tok"})
 
-    def raise_error(req):  # pragma: no cover - stub
+    def raise_error(req, timeout=None):  # pragma: no cover - stub
         raise HTTPError(req.full_url, status, "", {}, None)
 
     monkeypatch.setattr("schedule_app.services.google_client.request.urlopen", raise_error)
@@ -19,3 +25,124 @@ def test_fetch_unauthorized(monkeypatch, status):
             time_max="2025-01-02T00:00:00Z",
         )
 
+
+# ---------------------------------------------------------------------------
+# field projection / gzip against a local fixture server
+# ---------------------------------------------------------------------------
+
+
+def _heavy_event(i: int) -> dict:
+    return {
+        "kind": "calendar#event",
+        "id": f"ev{i}",
+        "status": "confirmed",
+        "summary": f"Meeting {i}",
+        "description": "Agenda and notes. " * 100,
+        "start": {"dateTime": "2025-01-01T09:00:00+09:00"},
+        "end": {"dateTime": "2025-01-01T10:00:00+09:00"},
+        "attendees": [
+            {"email": f"user{j}@example.com", "responseStatus": "accepted"}
+            for j in range(30)
+        ],
+        "conferenceData": {"entryPoints": [{"uri": f"https://meet.example.com/{i}"}]},
+    }
+
+
+EVENTS_TOTAL = 120
+PAGE_SIZE = 50
+
+
+class _CalendarHandler(BaseHTTPRequestHandler):
+    requests: list[dict] = []
+
+    def do_GET(self):  # noqa: N802 - http.server API
+        query = dict(parse.parse_qsl(parse.urlsplit(self.path).query))
+        start = int(query.get("pageToken", "0"))
+        items = [_heavy_event(i) for i in range(start, min(start + PAGE_SIZE, EVENTS_TOTAL))]
+        body: dict = {"kind": "calendar#events", "items": items}
+        if start + PAGE_SIZE < EVENTS_TOTAL:
+            body["nextPageToken"] = str(start + PAGE_SIZE)
+        # 射影しなかった場合に返すはずだったサイズ
+        full_bytes = len(json.dumps(body).encode())
+        if "fields" in query:
+            keep = ("id", "summary", "start", "end")
+            body = {
+                k: v for k, v in body.items() if k in ("items", "nextPageToken")
+            }
+            body["items"] = [{k: ev[k] for k in keep} for ev in items]
+
+        raw = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        encoding = None
+        if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            raw = gzip.compress(raw)
+            encoding = "gzip"
+            self.send_header("Content-Encoding", encoding)
+        type(self).requests.append(
+            {
+                "query": query,
+                "headers": dict(self.headers),
+                "encoding": encoding,
+                "bytes": len(raw),
+                "full_bytes": full_bytes,
+            }
+        )
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *_args):  # silence test output
+        pass
+
+
+@pytest.fixture()
+def calendar_server(monkeypatch):
+    _CalendarHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _CalendarHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setattr("schedule_app.services.google_client.CALENDAR_API_URL", base)
+    yield base
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_requests_projection_and_gzip(calendar_server):
+    client = GoogleClient(credentials={"access_token": "tok"})
+
+    items = client.fetch_calendar_events(
+        time_min="2025-01-01T00:00:00Z",
+        time_max="2025-01-02T00:00:00Z",
+    )
+
+    assert [ev["id"] for ev in items] == [f"ev{i}" for i in range(EVENTS_TOTAL)]
+    assert set(items[0]) == {"id", "summary", "start", "end"}
+    assert len(_CalendarHandler.requests) == 3  # paginated via nextPageToken
+    for req in _CalendarHandler.requests:
+        assert req["query"]["fields"] == "nextPageToken,items(id,iCalUID,summary,start,end)"
+        assert "gzip" in req["headers"]["Accept-Encoding"]
+
+    events = [client._to_event(ev) for ev in items]
+    assert events[0].title == "Meeting 0"
+
+
+def test_projection_and_gzip_shrink_what_the_client_receives(calendar_server):
+    client = GoogleClient(credentials={"access_token": "tok"})
+
+    items = client.fetch_calendar_events(
+        time_min="2025-01-01T00:00:00Z",
+        time_max="2025-01-02T00:00:00Z",
+    )
+
+    sent = _CalendarHandler.requests
+    assert sent and all(req["encoding"] == "gzip" for req in sent)
+    assert all(req["query"]["timeMin"] == "2025-01-01T00:00:00Z" for req in sent)
+    # クライアントが受け取った gzip 済みのバイト数 vs 射影なしの JSON
+    received = sum(req["bytes"] for req in sent)
+    unprojected = sum(req["full_bytes"] for req in sent)
+    assert received * 10 < unprojected
+    # 圧縮レスポンスを展開して射影済みの項目だけを読んでいる
+    assert len(items) == EVENTS_TOTAL
+    assert all("description" not in ev and "attendees" not in ev for ev in items)
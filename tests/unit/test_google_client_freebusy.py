@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from schedule_app.exceptions import APIError
+from schedule_app.services.google_client import GoogleClient
+
+
+class _Resp:
+    def __init__(self, payload: dict) -> None:
+        self._raw = json.dumps(payload).encode()
+        self.headers: dict[str, str] = {}
+
+    def read(self) -> bytes:
+        return self._raw
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        return False
+
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+END = datetime(2025, 1, 2, tzinfo=timezone.utc)
+
+
+def test_free_busy_queries_all_calendars_once(monkeypatch) -> None:
+    sent: list = []
+
+    def fake_urlopen(req, timeout=None):
+        sent.append(req)
+        return _Resp(
+            {
+                "calendars": {
+                    "primary": {"busy": [{"start": "2025-01-01T03:00:00Z", "end": "2025-01-01T04:00:00Z"}]},
+                    "team@example.com": {
+                        "busy": [{"start": "2025-01-01T10:00:00+09:00", "end": "2025-01-01T10:30:00+09:00"}]
+                    },
+                }
+            }
+        )
+
+    monkeypatch.setattr("schedule_app.services.google_client.request.urlopen", fake_urlopen)
+    client = GoogleClient(credentials={"access_token": "tok"})
+
+    busy = client.free_busy(time_min=START, time_max=END, calendar_ids=["primary", "team@example.com"])
+
+    assert len(sent) == 1
+    req = sent[0]
+    assert req.get_method() == "POST"
+    assert req.full_url.endswith("/freeBusy")
+    body = json.loads(req.data)
+    assert body["items"] == [{"id": "primary"}, {"id": "team@example.com"}]
+    assert body["timeMin"] == "2025-01-01T00:00:00Z"
+    assert busy == [
+        (datetime(2025, 1, 1, 1, 0, tzinfo=timezone.utc), datetime(2025, 1, 1, 1, 30, tzinfo=timezone.utc)),
+        (datetime(2025, 1, 1, 3, 0, tzinfo=timezone.utc), datetime(2025, 1, 1, 4, 0, tzinfo=timezone.utc)),
+    ]
+
+
+def test_free_busy_calendar_error(monkeypatch) -> None:
+    def fake_urlopen(req, timeout=None):
+        return _Resp({"calendars": {"x@example.com": {"errors": [{"reason": "notFound"}]}}})
+
+    monkeypatch.setattr("schedule_app.services.google_client.request.urlopen", fake_urlopen)
+    client = GoogleClient(credentials={"access_token": "tok"})
+
+    with pytest.raises(APIError, match="notFound"):
+        client.free_busy(time_min=START, time_max=END, calendar_ids=["x@example.com"])
@@ -9,7 +9,7 @@ def test_list_events_range(monkeypatch):
 
     captured = {}
 
-    def fake_fetch(*, time_min: str, time_max: str):
+    def fake_fetch(*, time_min: str, time_max: str, calendar_id: str = "primary"):
         captured["time_min"] = time_min
         captured["time_max"] = time_max
         return []
@@ -32,7 +32,7 @@ def test_list_events_dataclass(monkeypatch):
         "end": {"date": "2025-01-02"},
     }
 
-    def fake_fetch(*, time_min: str, time_max: str):
+    def fake_fetch(*, time_min: str, time_max: str, calendar_id: str = "primary"):
         return [sample]
 
     monkeypatch.setattr(client, "fetch_calendar_events", fake_fetch)
@@ -76,7 +76,7 @@ def test_list_events_all_day_filter(monkeypatch):
         },
     ]
 
-    def fake_fetch(*, time_min: str, time_max: str):
+    def fake_fetch(*, time_min: str, time_max: str, calendar_id: str = "primary"):
         return items
 
     monkeypatch.setattr(client, "fetch_calendar_events", fake_fetch)
@@ -89,3 +89,95 @@ def test_list_events_all_day_filter(monkeypatch):
     assert all(e.all_day for e in events if e.id != "d")
 
 
+def _item(id_: str, start: str, end: str, uid: str | None = None) -> dict:
+    return {
+        "id": id_,
+        "iCalUID": uid or f"{id_}@google.com",
+        "summary": id_,
+        "start": {"dateTime": start},
+        "end": {"dateTime": end},
+    }
+
+
+def test_list_events_merges_calendars(monkeypatch):
+    import threading
+    import time
+
+    from schedule_app.services import google_client
+
+    client = GoogleClient(credentials=None)
+    calendars = {
+        "primary": [
+            _item("p1", "2025-01-01T01:00:00Z", "2025-01-01T02:00:00Z", uid="shared"),
+            _item("p2", "2025-01-01T05:00:00Z", "2025-01-01T06:00:00Z"),
+        ],
+        "team@example.com": [
+            _item("t1", "2025-01-01T00:30:00Z", "2025-01-01T01:00:00Z"),
+            _item("t2", "2025-01-01T10:00:00+09:00", "2025-01-01T11:00:00+09:00", uid="shared"),
+        ],
+        "room@example.com": [
+            _item("r1", "2025-01-01T03:00:00Z", "2025-01-01T04:00:00Z"),
+        ],
+    }
+    threads: set[str] = set()
+
+    def fake_fetch(*, time_min: str, time_max: str, calendar_id: str = "primary"):
+        threads.add(threading.current_thread().name)
+        time.sleep(0.05)
+        return calendars[calendar_id]
+
+    monkeypatch.setattr(client, "fetch_calendar_events", fake_fetch)
+
+    # the pool is only created once several calendars are fetched
+    monkeypatch.setattr(google_client, "_CALENDAR_EXECUTOR", None)
+    client.list_events(date=datetime(2025, 1, 1, 9, 0), calendar_ids=["primary"])
+    assert google_client._CALENDAR_EXECUTOR is None
+    threads.clear()
+
+    events = client.list_events(date=datetime(2025, 1, 1, 9, 0), calendar_ids=list(calendars))
+    assert google_client._CALENDAR_EXECUTOR is not None
+
+    # sorted by start; the "shared" meeting appears once, from the first calendar
+    assert [e.id for e in events] == ["t1", "p1", "r1", "p2"]
+    assert len(threads) == 3
+
+
+def test_merge_event_streams_dedupes_by_ical_uid():
+    from schedule_app.services.google_client import merge_event_streams
+
+    client = GoogleClient(credentials=None)
+    a = [_item("a1", "2025-01-01T00:00:00Z", "2025-01-01T01:00:00Z", uid="x")]
+    b = [
+        _item("b1", "2025-01-01T00:00:00Z", "2025-01-01T01:00:00Z", uid="x"),
+        _item("b2", "2025-01-01T02:00:00Z", "2025-01-01T03:00:00Z"),
+    ]
+    streams = [[(client._to_event(i), i) for i in s] for s in (a, b)]
+
+    merged = [ev.id for ev, _item in merge_event_streams(streams)]
+    assert merged == ["a1", "b2"]
+
+
+def test_list_events_async_bounds_concurrency(monkeypatch):
+    import asyncio
+
+    from schedule_app.services import google_client
+
+    monkeypatch.setattr(google_client, "_calendar_workers", lambda: 2)
+    client = GoogleClient(credentials=None)
+    in_flight = peak = 0
+
+    async def fake_fetch(*, time_min: str, time_max: str, calendar_id: str = "primary", single_events=True):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return [_item(calendar_id, "2025-01-01T01:00:00Z", "2025-01-01T02:00:00Z")]
+
+    monkeypatch.setattr(client, "fetch_calendar_events_async", fake_fetch)
+
+    ids = [f"c{i}" for i in range(5)]
+    events = asyncio.run(client.list_events_async(date=datetime(2025, 1, 1, 9, 0), calendar_ids=ids))
+
+    assert sorted(e.id for e in events) == ids
+    assert peak == 2
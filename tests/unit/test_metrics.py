@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from schedule_app.services import metrics
+from schedule_app.services.metrics import Registry
+
+
+def test_counter_and_gauge_render() -> None:
+    reg = Registry()
+    hits = reg.counter("hits_total", "Hits.", ("route",))
+    hits.inc(route="/a")
+    hits.inc(2, route="/a")
+    hits.inc(route='/"b"')
+    gauge = reg.gauge("in_flight", "Open requests.")
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+
+    text = reg.render()
+
+    assert "# TYPE hits_total counter" in text
+    assert 'hits_total{route="/a"} 3' in text
+    assert 'hits_total{route="/\\"b\\""} 1' in text
+    assert "# TYPE in_flight gauge\nin_flight 1\n" in text
+    assert reg.counter("hits_total", "Hits.", ("route",)) is hits
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    reg = Registry()
+    hist = reg.histogram("latency_seconds", "Latency.", ("endpoint",), buckets=(0.1, 0.4))
+    for value in (0.05, 0.1, 0.3, 2.0):
+        hist.observe(value, endpoint="x")
+
+    assert hist.value(endpoint="x") == {"buckets": [2, 3, 4], "count": 4, "sum": pytest.approx(2.45)}
+    text = reg.render()
+    assert 'latency_seconds_bucket{endpoint="x",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{endpoint="x",le="0.4"} 3' in text
+    assert 'latency_seconds_bucket{endpoint="x",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{endpoint="x"} 4' in text
+    assert 'latency_seconds_sum{endpoint="x"} 2.45' in text
+
+
+def test_type_conflict_is_rejected() -> None:
+    reg = Registry()
+    reg.counter("x", "X.")
+    with pytest.raises(ValueError):
+        reg.gauge("x", "X.")
+
+
+def test_concurrent_increments_are_not_lost() -> None:
+    reg = Registry()
+    counter = reg.counter("n_total", "N.")
+
+    def work() -> None:
+        for _ in range(10_000):
+            counter.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert counter.value() == 80_000
+
+
+def test_collectors_run_at_scrape_time() -> None:
+    reg = Registry()
+    state = {"n": 1}
+    reg.add_collector(lambda: [("queue_depth", "gauge", "Depth.", [({"q": "a"}, state["n"])])])
+
+    assert 'queue_depth{q="a"} 1' in reg.render()
+    state["n"] = 5
+    assert 'queue_depth{q="a"} 5' in reg.render()
+
+
+def test_log_metric_counts_events_and_sums_numbers() -> None:
+    metrics.log_metric("unit_import", {"source": "sheet", "added": 2, "removed": 0})
+    metrics.log_metric("unit_import", {"source": "sheet", "added": 3, "removed": 1})
+
+    assert metrics.REGISTRY.get("unit_import_total").value(source="sheet") == 2
+    assert metrics.REGISTRY.get("unit_import_added_total").value(source="sheet") == 5
+    assert metrics.REGISTRY.get("unit_import_removed_total").value(source="sheet") == 1
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from schedule_app.services import recurrence
+from schedule_app.services.google_client import GoogleClient
+
+pytestmark = pytest.mark.skipif(not recurrence.available(), reason="python-dateutil missing")
+
+UTC = timezone.utc
+NY = ZoneInfo("America/New_York")
+
+
+def _utc(*args: int) -> datetime:
+    return datetime(*args, tzinfo=UTC)
+
+
+def test_occurrences_between_window() -> None:
+    occ = recurrence.occurrences_between(
+        ("RRULE:FREQ=DAILY",),
+        _utc(2025, 1, 1, 9),
+        timedelta(hours=1),
+        _utc(2025, 1, 3),
+        _utc(2025, 1, 6),
+    )
+    assert [s for s, _e in occ] == [_utc(2025, 1, 3, 9), _utc(2025, 1, 4, 9), _utc(2025, 1, 5, 9)]
+    assert occ[0][1] == _utc(2025, 1, 3, 10)
+
+
+def test_occurrence_overlapping_window_start_is_included() -> None:
+    occ = recurrence.occurrences_between(
+        ("RRULE:FREQ=DAILY",),
+        _utc(2025, 1, 1, 23),
+        timedelta(hours=2),
+        _utc(2025, 1, 3),
+        _utc(2025, 1, 4),
+    )
+    assert [s for s, _e in occ] == [_utc(2025, 1, 2, 23), _utc(2025, 1, 3, 23)]
+
+
+def test_expansion_is_memoized_per_day() -> None:
+    recurrence._day_starts.cache_clear()
+    args = (("RRULE:FREQ=WEEKLY;BYDAY=MO,WE",), _utc(2025, 1, 6, 1), timedelta(minutes=30))
+    recurrence.occurrences_between(*args, _utc(2025, 1, 6), _utc(2025, 1, 13))
+    misses = recurrence._day_starts.cache_info().misses
+
+    # an overlapping window only expands the days not seen before
+    recurrence.occurrences_between(*args, _utc(2025, 1, 8), _utc(2025, 1, 15))
+    info = recurrence._day_starts.cache_info()
+    assert info.misses - misses == 2
+    assert info.hits >= 5
+
+
+def test_wall_clock_kept_across_dst() -> None:
+    occ = recurrence.occurrences_between(
+        ("RRULE:FREQ=WEEKLY",),
+        datetime(2025, 3, 1, 9, tzinfo=NY),
+        timedelta(hours=1),
+        _utc(2025, 3, 1),
+        _utc(2025, 3, 16),
+    )
+    assert [s.astimezone(UTC).hour for s, _e in occ] == [14, 14, 13]
+
+
+def _master(**extra) -> dict:
+    item = {
+        "id": "m1",
+        "iCalUID": "m1@google.com",
+        "summary": "Standup",
+        "start": {"dateTime": "2025-01-01T09:00:00+09:00", "timeZone": "Asia/Tokyo"},
+        "end": {"dateTime": "2025-01-01T09:15:00+09:00", "timeZone": "Asia/Tokyo"},
+        "recurrence": ["RRULE:FREQ=DAILY", "EXDATE;TZID=Asia/Tokyo:20250103T090000"],
+    }
+    item.update(extra)
+    return item
+
+
+def test_expand_items_applies_exdate_and_overrides() -> None:
+    items = [
+        _master(),
+        {
+            "id": "m1_20250104T000000Z",
+            "status": "cancelled",
+            "recurringEventId": "m1",
+            "originalStartTime": {"dateTime": "2025-01-04T09:00:00+09:00"},
+        },
+        {
+            "id": "m1_20250105T000000Z",
+            "summary": "Standup (moved)",
+            "recurringEventId": "m1",
+            "originalStartTime": {"dateTime": "2025-01-05T09:00:00+09:00"},
+            "start": {"dateTime": "2025-01-05T11:00:00+09:00"},
+            "end": {"dateTime": "2025-01-05T11:15:00+09:00"},
+        },
+        {
+            "id": "single",
+            "summary": "One-off",
+            "start": {"dateTime": "2025-01-02T03:00:00Z"},
+            "end": {"dateTime": "2025-01-02T04:00:00Z"},
+        },
+    ]
+
+    out = recurrence.expand_items(items, _utc(2025, 1, 1), _utc(2025, 1, 6))
+
+    ids = sorted(i["id"] for i in out)
+    assert ids == [
+        "m1_20250101T000000Z",
+        "m1_20250102T000000Z",
+        "m1_20250105T000000Z",
+        "single",
+    ]
+    moved = next(i for i in out if i["id"] == "m1_20250105T000000Z")
+    assert moved["summary"] == "Standup (moved)"
+
+
+def test_expand_items_all_day_series() -> None:
+    items = [
+        {
+            "id": "h",
+            "summary": "Holiday",
+            "start": {"date": "2025-01-01"},
+            "end": {"date": "2025-01-02"},
+            "recurrence": ["RRULE:FREQ=WEEKLY"],
+        }
+    ]
+    out = recurrence.expand_items(items, _utc(2025, 1, 7, 15), _utc(2025, 1, 8, 15))
+    assert [(i["id"], i["start"], i["end"]) for i in out] == [
+        ("h_20250108", {"date": "2025-01-08"}, {"date": "2025-01-09"})
+    ]
+
+
+def test_series_start_reads_time_zone() -> None:
+    # naive の dateTime は timeZone の壁時計として読む
+    start = recurrence._local_start({"dateTime": "2025-01-06T09:00:00", "timeZone": "Asia/Tokyo"})
+    assert start == _utc(2025, 1, 6, 0)
+    assert start.utcoffset() == timedelta(hours=9)
+
+    # 未知のゾーンなら元のオフセットのまま
+    start = recurrence._local_start({"dateTime": "2025-01-06T08:00:00+09:00", "timeZone": "Nowhere/Unknown"})
+    assert start.utcoffset() == timedelta(hours=9)
+    assert start.weekday() == 0
+
+
+def test_list_events_expands_masters_locally(monkeypatch) -> None:
+    client = GoogleClient(credentials=None)
+    calls: list[bool] = []
+
+    def fake_fetch(*, time_min, time_max, calendar_id="primary", single_events=True):
+        calls.append(single_events)
+        return [_master()]
+
+    monkeypatch.setattr(client, "fetch_calendar_events", fake_fetch)
+    monkeypatch.setattr("schedule_app.services.google_client._expand_locally", lambda: True)
+
+    events = client.list_events(date=datetime(2025, 1, 2))
+
+    assert calls == [False]
+    assert [(e.id, e.start_utc) for e in events] == [("m1_20250102T000000Z", _utc(2025, 1, 2, 0))]
@@ -0,0 +1,138 @@
+import asyncio
+from urllib.error import HTTPError, URLError
+
+import pytest
+
+from schedule_app.services import resilience
+from schedule_app.services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    call_google,
+    call_google_async,
+)
+
+POLICY = RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=1.0)
+
+
+def _http_error(status: int, headers: dict | None = None) -> HTTPError:
+    return HTTPError("https://example.invalid", status, "", headers or {}, None)
+
+
+class Flaky:
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+def test_retries_retryable_errors_then_succeeds():
+    fn = Flaky(_http_error(503), URLError("reset"))
+    sleeps: list[float] = []
+
+    assert call_google("test", fn, policy=POLICY, sleep=sleeps.append) == "ok"
+    assert fn.calls == 3
+    assert len(sleeps) == 2
+    assert all(POLICY.base_delay <= d <= POLICY.max_delay for d in sleeps)
+    assert resilience.resilience_stats()["retries"] == {"test": 2}
+
+
+def test_retry_after_header_is_honoured():
+    fn = Flaky(_http_error(429, {"Retry-After": "0.5"}))
+    sleeps: list[float] = []
+
+    call_google("test", fn, policy=POLICY, sleep=sleeps.append)
+    assert sleeps == [0.5]
+
+
+def test_retry_after_beyond_cap_gives_up():
+    fn = Flaky(_http_error(429, {"Retry-After": "120"}))
+
+    with pytest.raises(HTTPError):
+        call_google("test", fn, policy=POLICY, sleep=lambda _d: None)
+    assert fn.calls == 1
+
+
+def test_non_retryable_errors_are_raised_immediately():
+    fn = Flaky(_http_error(403))
+
+    with pytest.raises(HTTPError):
+        call_google("test", fn, policy=POLICY, sleep=lambda _d: None)
+    assert fn.calls == 1
+    assert resilience.breaker_for("test").state == CircuitBreaker.CLOSED
+
+
+def test_breaker_opens_and_fails_fast(monkeypatch):
+    monkeypatch.setattr(resilience, "breaker_for", lambda _e: breaker)
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=60)
+    once = RetryPolicy(max_attempts=1)
+
+    for _ in range(2):
+        with pytest.raises(URLError):
+            call_google("test", Flaky(URLError("down")), policy=once)
+
+    assert breaker.state == CircuitBreaker.OPEN
+    fn = Flaky()
+    with pytest.raises(CircuitOpenError):
+        call_google("test", fn, policy=once)
+    assert fn.calls == 0
+
+
+def test_breaker_half_open_trial(monkeypatch):
+    now = {"t": 0.0}
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now["t"])
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=10)
+
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    now["t"] = 11.0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()  # only one trial at a time
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_probe_does_not_close_half_open_breaker(monkeypatch):
+    now = {"t": 0.0}
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now["t"])
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=10)
+    monkeypatch.setattr(resilience, "breaker_for", lambda _e: breaker)
+    breaker.record_failure()
+    now["t"] = 11.0
+
+    # 壊れた応答（JSON のデコード失敗など）は Google が健全な証拠にならない
+    with pytest.raises(ValueError):
+        call_google("test", Flaky(ValueError("bad json")), policy=POLICY)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    with pytest.raises(HTTPError):
+        call_google("test", Flaky(_http_error(404)), policy=POLICY)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_call_google_async_retries():
+    fn = Flaky(_http_error(503))
+    delays: list[float] = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    async def attempt():
+        return fn()
+
+    assert asyncio.run(call_google_async("test", attempt, policy=POLICY, sleep=sleep)) == "ok"
+    assert fn.calls == 2
+    assert len(delays) == 1
+
+
+def test_retry_budget_limits_retries():
+    budget = resilience.RetryBudget(ratio=0.0, capacity=1)
+    assert budget.withdraw()
+    assert not budget.withdraw()
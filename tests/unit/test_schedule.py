@@ -126,3 +126,105 @@ def test_all_day_event_ignored() -> None:
     assert len(slots) == 144
     assert all(s == 0 for s in slots)
 
+
+@freeze_time("2025-01-01T00:00:00Z")
+def test_freebusy_ranges_replace_events() -> None:
+    TASKS.clear()
+    BLOCKS.clear()
+    from schedule_app.api.calendar import EVENTS
+
+    EVENTS.clear()
+    EVENTS["e1"] = Event(
+        id="e1",
+        title="",
+        start_utc=_dt("2025-01-01T00:00:00Z"),
+        end_utc=_dt("2025-01-01T01:00:00Z"),
+    )
+    busy = [(_dt("2025-01-01T02:00:00Z"), _dt("2025-01-01T02:20:00Z"))]
+
+    result = schedule.generate_schedule(target_day=date(2025, 1, 1), busy=busy)
+    slots = result["slots"]
+    assert slots[:6] == [0] * 6
+    assert slots[12:14] == [1, 1]
+    assert slots[14] == 0
+    EVENTS.clear()
+
+
+@freeze_time("2025-01-01T00:00:00Z")
+def test_recurring_block_expanded_for_day() -> None:
+    TASKS.clear()
+    BLOCKS.clear()
+    from schedule_app.api.calendar import EVENTS
+
+    EVENTS.clear()
+    BLOCKS["weekly"] = Block(
+        id="weekly",
+        start_utc=_dt("2024-12-25T01:00:00Z"),
+        end_utc=_dt("2024-12-25T01:30:00Z"),
+        rrule="FREQ=WEEKLY",
+    )
+
+    result = schedule.generate_schedule(target_day=date(2025, 1, 1))
+    slots = result["slots"]
+    assert slots[6:9] == [1, 1, 1]
+    assert sum(slots) == 3
+
+    result = schedule.generate_schedule(target_day=date(2025, 1, 2))
+    assert all(s == 0 for s in result["slots"])
+    BLOCKS.clear()
+
+
+@freeze_time("2025-01-01T00:00:00Z")
+def test_generate_records_stats() -> None:
+    TASKS.clear()
+    BLOCKS.clear()
+    BLOCKS["b1"] = Block(
+        id="b1",
+        start_utc=_dt("2025-01-01T00:00:00Z"),
+        end_utc=_dt("2025-01-01T01:00:00Z"),
+    )
+    TASKS["A1"] = Task(id="A1", title="", category="", duration_min=30, duration_raw_min=30, priority="A")
+    TASKS["B1"] = Task(id="B1", title="", category="", duration_min=1500, duration_raw_min=1500, priority="B")
+
+    stats = schedule.ScheduleStats()
+    _slots, _grid, unplaced = schedule.compute_schedule(date(2025, 1, 1), stats=stats)
+
+    assert unplaced == ["B1"]
+    assert set(stats.phases) == {"busy_map", "sort", "place", "compact"}
+    # 0〜5 は先頭スロットで不可、6 で 3 スロット確認して配置
+    assert (stats.candidates_tried, stats.slots_scanned) == (7, 9)
+    assert (stats.placed, stats.unplaced) == (1, 1)
+    TASKS.clear()
+    BLOCKS.clear()
+
+
+def test_busy_map_phase_builds_map_and_memo_skips_store_scan(monkeypatch) -> None:
+    TASKS.clear()
+    BLOCKS.clear()
+    BLOCKS["b1"] = Block(id="b1", start_utc=_dt("2025-01-01T00:00:00Z"), end_utc=_dt("2025-01-01T01:00:00Z"))
+    scans: list[date] = []
+    day_inputs = schedule._day_inputs
+    monkeypatch.setattr(schedule, "_day_inputs", lambda day, busy=None: scans.append(day) or day_inputs(day, busy))
+    build = schedule._init_slot_map
+
+    def slow_build(*args, **kw):
+        clock = schedule.time.perf_counter
+        start = clock()
+        while clock() - start < 0.01:
+            pass
+        return build(*args, **kw)
+
+    monkeypatch.setattr(schedule, "_init_slot_map", slow_build)
+
+    stats = schedule.ScheduleStats()
+    slots, _grid, _unplaced = schedule.compute_schedule(date(2025, 1, 1), stats=stats)
+    # 未メモの構築は busy_map 区間に含まれる
+    assert stats.phases["busy_map"] >= 0.01
+    assert slots[:6] == [1] * 6
+    assert scans == [date(2025, 1, 1)]
+
+    stats = schedule.ScheduleStats()
+    again, _grid, _unplaced = schedule.compute_schedule(date(2025, 1, 1), stats=stats)
+    assert again == slots
+    assert scans == [date(2025, 1, 1)]
+    BLOCKS.clear()
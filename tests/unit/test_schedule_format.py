@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import pytest
+
+from schedule_app.services import schedule_format as sf
+
+GRID = [None] * 6 + ["t1"] * 3 + ["t2"] * 2 + [None] * 133
+SLOTS = [0] * 3 + [1] * 3 + [2] * 5 + [1] + [0] * 132
+
+
+def test_rle_round_trip() -> None:
+    spans = sf.rle_spans(SLOTS, GRID)
+    assert spans[:5] == [
+        [0, 3, 0, None],
+        [3, 3, 1, None],
+        [6, 3, 2, "t1"],
+        [9, 2, 2, "t2"],
+        [11, 1, 1, None],
+    ]
+    assert sf.expand_spans(spans) == (SLOTS, GRID)
+
+
+def test_packed_round_trip() -> None:
+    states = sf.pack_states(SLOTS)
+    # 144 スロット × 2 bit = 36 byte → base64 48 文字
+    assert len(states) == 48
+    assert sf.unpack_states(states, len(SLOTS)) == SLOTS
+    assert sf.placements(GRID) == [["t1", 6, 3], ["t2", 9, 2]]
+
+
+def test_encode_members() -> None:
+    assert sf.encode("slots", SLOTS, GRID) == {"slots": SLOTS}
+    assert set(sf.encode("packed", SLOTS, GRID)) == {"format", "bits", "states", "placements"}
+    with pytest.raises(ValueError):
+        sf.encode("xml", SLOTS, GRID)
+
+
+def test_diff_spans_cover_only_changed_slots() -> None:
+    new_grid = list(GRID)
+    new_slots = list(SLOTS)
+    new_grid[9:11] = [None, None]
+    new_slots[9:11] = [1, 1]
+    new_grid[20:23] = ["t2"] * 3
+    new_slots[20:23] = [2] * 3
+
+    spans = sf.diff_spans(SLOTS, GRID, new_slots, new_grid)
+
+    assert spans == [[9, 2, 1, None], [20, 3, 2, "t2"]]
+    assert sf.diff_spans(SLOTS, GRID, SLOTS, GRID) == []
@@ -1,4 +1,5 @@
 import importlib
+import json
 from datetime import datetime, timezone, timedelta
 
 from freezegun import freeze_time
@@ -7,37 +8,54 @@ import pytest
 import schedule_app.config as config_module
 
 
-class DummyService:
-    def __init__(self, rows):
-        self.rows = rows
-        self.calls = 0
+class DummyResponse:
+    def __init__(self, data: dict) -> None:
+        self._data = json.dumps(data).encode()
 
-    def spreadsheets(self):
-        return self
+    def read(self) -> bytes:  # pragma: no cover - simple stub
+        return self._data
 
-    def values(self):
+    def __enter__(self) -> "DummyResponse":  # pragma: no cover - simple stub
         return self
 
-    def get(self, spreadsheetId, range):  # noqa: D401 - simple stub
-        self.calls += 1
-        self.spreadsheetId = spreadsheetId
-        self.range = range
-        return self
+    def __exit__(self, *exc):  # pragma: no cover - simple stub
+        return False
+
+
+class DummyService:
+    """Stand-in for ``urlopen`` serving ``values.get`` / ``values:batchGet``."""
+
+    def __init__(self, rows, *extra_ranges):
+        self.rows = rows
+        self.extra_ranges = extra_ranges
+        self.calls = 0
+        self.urls: list[str] = []
+        self.headers: list[dict] = []
 
-    def execute(self):
-        return {"values": self.rows}
+    def __call__(self, req, timeout=None):  # noqa: D401 - simple stub
+        self.calls += 1
+        self.urls.append(req.full_url)
+        self.headers.append(dict(req.header_items()))
+        if "values:batchGet" in req.full_url:
+            ranges = [self.rows, *self.extra_ranges]
+            return DummyResponse({"valueRanges": [{"values": r} for r in ranges]})
+        return DummyResponse({"values": self.rows})
 
 
-def _setup(monkeypatch, values, cache_sec=60):
+def _setup(monkeypatch, values, cache_sec=60, stale_sec=0):
     monkeypatch.setenv("SHEETS_TASKS_SSID", "sheet-id")
     monkeypatch.setenv("SHEETS_TASKS_RANGE", "Tasks!A:G")
     monkeypatch.setenv("SHEETS_CACHE_SEC", str(cache_sec))
+    monkeypatch.setenv("SHEETS_STALE_SEC", str(stale_sec))
     importlib.reload(config_module)
+    import schedule_app.services.google_client as gc
     import schedule_app.services.sheets_tasks as st
     importlib.reload(st)
+    gc.config_module = config_module
     service = DummyService(values)
-    monkeypatch.setattr(st, "build", lambda *a, **k: service)
-    st._CACHE = None
+    monkeypatch.setattr(gc.request, "urlopen", service)
+    st.invalidate_cache()
+    gc.invalidate_blocks_cache()
     return st, service
 
 
@@ -69,6 +87,8 @@ def test_fetch_tasks_basic(monkeypatch):
     tasks = st.fetch_tasks_from_sheet(session, force=True)
 
     assert service.calls == 1
+    assert "/sheet-id/values/Tasks%21A%3AG" in service.urls[0]
+    assert service.headers[0]["Authorization"] == "Bearer tok"
     assert len(tasks) == 2
     t1 = tasks[0]
     assert t1.id == "t1"
@@ -100,7 +120,8 @@ def test_fetch_tasks_cache(monkeypatch):
 
         rows2 = [["id", "title", "category", "duration_min", "duration_raw_min", "priority"], ["b", "B", "c", "5", "5", "B"]]
         service2 = DummyService(rows2)
-        monkeypatch.setattr(st, "build", lambda *a, **k: service2)
+        import schedule_app.services.google_client as gc
+        monkeypatch.setattr(gc.request, "urlopen", service2)
 
         tasks2 = st.fetch_tasks_from_sheet(session)
         assert service2.calls == 0
@@ -112,7 +133,12 @@ def test_fetch_tasks_cache(monkeypatch):
         assert tasks3 != tasks1
 
 
-def test_to_task_uuid_and_round(monkeypatch):
+def _one_task(st, data: dict[str, str]):
+    """Parse ``data`` as the single data row under a header row."""
+    return st.parse_task_rows([list(data), list(data.values())])[0]
+
+
+def test_task_row_uuid_and_round(monkeypatch):
     st, _service = _setup(monkeypatch, [])
 
     data = {
@@ -124,38 +150,38 @@ def test_to_task_uuid_and_round(monkeypatch):
         "priority": "A",
     }
 
-    task = st._to_task(data)
+    task = _one_task(st, data)
     assert task.id
     assert task.duration_min == 30
     assert task.duration_raw_min == 25
 
 
-def test_to_task_priority_error(monkeypatch):
+def test_task_row_priority_error(monkeypatch):
     st, _ = _setup(monkeypatch, [])
     with pytest.raises(st.InvalidSheetRowError):
-        st._to_task({"priority": "C", "duration_min": "10", "duration_raw_min": "10"})
+        _one_task(st, {"priority": "C", "duration_min": "10", "duration_raw_min": "10"})
 
 
-def test_to_task_invalid_datetime(monkeypatch):
+def test_task_row_invalid_datetime(monkeypatch):
     st, _ = _setup(monkeypatch, [])
     with pytest.raises(st.InvalidSheetRowError):
-        st._to_task({"priority": "A", "duration_min": "10", "duration_raw_min": "10", "earliest_start_utc": "bad"})
+        _one_task(st, {"priority": "A", "duration_min": "10", "duration_raw_min": "10", "earliest_start_utc": "bad"})
 
 
 @pytest.mark.parametrize("val", ["9", "-5"])
-def test_to_task_invalid_duration(monkeypatch, val):
+def test_task_row_invalid_duration(monkeypatch, val):
     st, _ = _setup(monkeypatch, [])
     with pytest.raises(st.InvalidSheetRowError):
-        st._to_task({"priority": "A", "duration_min": val, "duration_raw_min": val})
+        _one_task(st, {"priority": "A", "duration_min": val, "duration_raw_min": val})
 
 
-def test_to_task_non_numeric_duration(monkeypatch):
+def test_task_row_non_numeric_duration(monkeypatch):
     st, _ = _setup(monkeypatch, [])
     with pytest.raises(st.InvalidSheetRowError):
-        st._to_task({"priority": "A", "duration_min": "abc", "duration_raw_min": "abc"})
+        _one_task(st, {"priority": "A", "duration_min": "abc", "duration_raw_min": "abc"})
 
 
-def test_to_task_naive_datetime(monkeypatch):
+def test_task_row_naive_datetime(monkeypatch):
     st, _ = _setup(monkeypatch, [])
 
     data = {
@@ -165,11 +191,11 @@ def test_to_task_naive_datetime(monkeypatch):
         "earliest_start_utc": "2025-01-01T09:00:00",
     }
 
-    task = st._to_task(data)
+    task = _one_task(st, data)
     assert task.earliest_start_utc == datetime(2025, 1, 1, 9, 0, tzinfo=timezone.utc)
 
 
-def test_to_task_datetime_whitespace(monkeypatch):
+def test_task_row_datetime_whitespace(monkeypatch):
     st, _ = _setup(monkeypatch, [])
 
     data = {
@@ -179,5 +205,171 @@ def test_to_task_datetime_whitespace(monkeypatch):
         "earliest_start_utc": " 2025-01-01T09:00:00Z ",
     }
 
-    task = st._to_task(data)
+    task = _one_task(st, data)
     assert task.earliest_start_utc == datetime(2025, 1, 1, 9, 0, tzinfo=timezone.utc)
+
+
+TASK_ROWS = [
+    ["id", "title", "category", "duration_min", "duration_raw_min", "priority"],
+    ["t1", "Task1", "gen", "10", "10", "A"],
+]
+BLOCK_ROWS = [
+    ["start_utc", "end_utc", "title"],
+    ["2025-01-01T00:00:00Z", "2025-01-01T00:10:00Z", "B1"],
+]
+
+
+def test_fetch_tasks_and_blocks_single_batch_get(monkeypatch):
+    monkeypatch.setenv("BLOCKS_SHEET_ID", "sheet-id")
+    monkeypatch.setenv("SHEETS_BLOCK_RANGE", "Blocks!A2:C")
+    st, _ = _setup(monkeypatch, [])
+    import schedule_app.services.google_client as gc
+
+    service = DummyService(TASK_ROWS, BLOCK_ROWS)
+    monkeypatch.setattr(gc.request, "urlopen", service)
+    session = {"credentials": {"access_token": "tok"}}
+
+    tasks, blocks = st.fetch_tasks_and_blocks(session)
+
+    assert service.calls == 1
+    assert "values:batchGet?ranges=Tasks%21A%3AG&ranges=Blocks%21A2%3AC" in service.urls[0]
+    assert [t.id for t in tasks] == ["t1"]
+    assert [b.title for b in blocks] == ["B1"]
+
+    # both caches were filled from the single response
+    assert st.fetch_tasks_from_sheet(session) == tasks
+    assert gc.fetch_blocks_from_sheet("sheet-id", "Blocks!A2:C") == blocks
+    assert service.calls == 1
+
+
+def test_fetch_tasks_and_blocks_single_flight(monkeypatch):
+    import threading
+
+    st, _ = _setup(monkeypatch, [])
+    import schedule_app.services.google_client as gc
+
+    service = DummyService(TASK_ROWS, BLOCK_ROWS)
+    release = threading.Event()
+
+    def slow(req, timeout=None):
+        release.wait(5)
+        return service(req, timeout)
+
+    monkeypatch.setattr(gc.request, "urlopen", slow)
+    session = {"credentials": {"access_token": "tok"}}
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(st.fetch_tasks_and_blocks(session)))
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert service.calls == 1
+    assert len(results) == 4 and all(r == results[0] for r in results)
+
+
+def test_fetch_tasks_and_blocks_stale_if_error(monkeypatch):
+    with freeze_time("2025-01-01T00:00:00Z") as frozen:
+        st, _ = _setup(monkeypatch, [], cache_sec=10)
+        import schedule_app.services.google_client as gc
+
+        service = DummyService(TASK_ROWS, BLOCK_ROWS)
+        monkeypatch.setattr(gc.request, "urlopen", service)
+        session = {"credentials": {"access_token": "tok"}}
+        tasks, blocks = st.fetch_tasks_and_blocks(session)
+
+        def down(req, timeout=None):
+            raise OSError("sheets down")
+
+        monkeypatch.setattr(gc.request, "urlopen", down)
+        frozen.tick(delta=timedelta(seconds=11))
+
+        assert st.fetch_tasks_and_blocks(session) == (tasks, blocks)
+
+
+def test_fetch_tasks_and_blocks_different_sheets(monkeypatch):
+    monkeypatch.setenv("BLOCKS_SHEET_ID", "other-sheet")
+    st, _ = _setup(monkeypatch, [])
+    import schedule_app.services.google_client as gc
+
+    service = DummyService(TASK_ROWS)
+    monkeypatch.setattr(gc.request, "urlopen", service)
+    monkeypatch.setattr(st, "fetch_blocks_from_sheet", lambda *_a, **_k: ["blocks"])
+
+    tasks, blocks = st.fetch_tasks_and_blocks({"credentials": {"access_token": "tok"}})
+
+    assert service.calls == 1
+    assert "values:batchGet" not in service.urls[0]
+    assert [t.id for t in tasks] == ["t1"]
+    assert blocks == ["blocks"]
+
+
+def test_fetch_tasks_cache_is_per_user(monkeypatch):
+    st, service = _setup(monkeypatch, TASK_ROWS)
+
+    st.fetch_tasks_from_sheet({"credentials": {"access_token": "alice"}})
+    st.fetch_tasks_from_sheet({"credentials": {"access_token": "bob"}})
+    st.fetch_tasks_from_sheet({"credentials": {"access_token": "alice"}})
+
+    assert service.calls == 2
+    assert [h["Authorization"] for h in service.headers] == ["Bearer alice", "Bearer bob"]
+
+
+def test_parse_task_rows_collects_every_invalid_row(monkeypatch):
+    st, _ = _setup(monkeypatch, [])
+
+    rows = [
+        ["id", "title", "duration_min", "priority", "earliest_start_utc"],
+        ["t1", "ok", "25", "a", "2025-01-01T00:00:00Z"],
+        ["t2", "bad duration", "abc", "A"],
+        ["t3", "bad priority", "10", "C", "bad"],
+    ]
+    with pytest.raises(st.InvalidSheetRowError) as info:
+        st.parse_task_rows(rows)
+
+    assert info.value.errors == [
+        {"row": 3, "field": "duration_min", "detail": "invalid duration"},
+        {"row": 4, "field": "priority", "detail": "invalid priority"},
+        {"row": 4, "field": "earliest_start_utc", "detail": "invalid datetime"},
+    ]
+    assert str(info.value) == "2 invalid rows (first: row 3: invalid duration)"
+
+    tasks = st.parse_task_rows(rows[:2])
+    assert (tasks[0].duration_min, tasks[0].duration_raw_min, tasks[0].priority) == (30, 25, "A")
+
+
+def test_parse_datetime_column_parses_repeated_cells_once(monkeypatch):
+    from schedule_app.utils import sheet_rows
+
+    calls: list[str] = []
+    real = sheet_rows.parse_utc
+    monkeypatch.setattr(sheet_rows, "parse_utc", lambda text: calls.append(text) or real(text))
+
+    cols = sheet_rows.Columns([["at"], *([["2025-01-01T00:00:00Z"]] * 50), [""]])
+    values = sheet_rows.parse_datetime_column(cols, "at")
+
+    assert calls == ["2025-01-01T00:00:00Z"]
+    assert values[0] == datetime(2025, 1, 1, tzinfo=timezone.utc)
+    assert values[-1] is None and not cols.errors
+
+
+def test_parse_task_rows_ids_are_stable(monkeypatch):
+    st, _ = _setup(monkeypatch, [])
+
+    rows = [
+        ["id", "title", "category", "duration_min"],
+        ["", "Write", "work", "10"],
+        ["", "Write", "work", "20"],
+        ["fixed", "Read", "", "10"],
+    ]
+    first = st.parse_task_rows(rows)
+    second = st.parse_task_rows([rows[0], ["", "Write", "work", "30"], *rows[2:]])
+
+    assert [t.id for t in first] == [t.id for t in second]
+    assert len({t.id for t in first}) == 3
+    assert first[2].id == "fixed"
+    assert _one_task(st, {"title": "Write", "category": "work", "duration_min": "10"}).id == first[0].id
@@ -0,0 +1,77 @@
+"""パッケージの import を軽く保つための回帰テスト.
+
+実時間を測るテストは ``benchmark`` マーカー付きで、``RUN_BENCHMARKS=1`` の
+ときだけ実行される (README の Benchmarks を参照)。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+import platform
+import subprocess
+import sys
+
+import pytest
+
+import schedule_app
+
+BENCH = pathlib.Path(__file__).resolve().parents[2] / "benchmarks" / "bench_startup.py"
+BASELINE = BENCH.parent / "baselines" / "startup.json"
+
+_PROBE = """
+import json, sys
+import schedule_app
+heavy = ("flask", "werkzeug", "google_auth_oauthlib", "requests", "pytz")
+print(json.dumps([m for m in heavy if m in sys.modules]))
+"""
+
+
+def _loaded_after_import() -> list[str]:
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=os.path.dirname(os.path.dirname(schedule_app.__file__)),
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(out)
+
+
+def test_import_defers_heavy_modules() -> None:
+    assert _loaded_after_import() == []
+
+
+@pytest.mark.benchmark
+def test_cold_start_does_not_regress_against_baseline() -> None:
+    baseline = json.loads(BASELINE.read_text(encoding="utf-8"))
+    # 別バージョンの Python では import の中身が変わるので比較しない
+    if baseline["python"].rsplit(".", 1)[0] != platform.python_version().rsplit(".", 1)[0]:
+        pytest.skip(f"baseline recorded on Python {baseline['python']}")
+    if baseline["platform"] != sys.platform:
+        pytest.skip(f"baseline recorded on {baseline['platform']}")
+
+    proc = subprocess.run(
+        [sys.executable, str(BENCH), "--check", "--repeat", "2"],
+        capture_output=True,
+        text=True,
+    )
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+
+
+def test_module_app_is_built_once_on_first_access() -> None:
+    app = schedule_app.app
+    assert app is schedule_app.app
+    assert "gclient" in app.extensions
+
+
+def test_flow_is_resolved_lazily() -> None:
+    from google_auth_oauthlib.flow import Flow
+
+    assert schedule_app.Flow is Flow
+
+
+def test_unknown_attribute_raises() -> None:
+    with pytest.raises(AttributeError):
+        schedule_app.no_such_name
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+
+from schedule_app.api.blocks import BLOCKS
+from schedule_app.models import Block, Event, Task
+from schedule_app.services import changes, schedule
+from schedule_app.services.store_diff import apply_diff
+
+
+def _task(id: str, title: str = "t", minutes: int = 10) -> Task:
+    return Task(id=id, title=title, category="", duration_min=minutes, duration_raw_min=minutes, priority="A")
+
+
+def _block(id: str, day: int, hour: int = 1, rrule: str | None = None) -> Block:
+    return Block(
+        id=id,
+        start_utc=datetime(2025, 1, day, hour, tzinfo=timezone.utc),
+        end_utc=datetime(2025, 1, day, hour + 1, tzinfo=timezone.utc),
+        rrule=rrule,
+    )
+
+
+def test_apply_diff_reports_added_changed_removed() -> None:
+    kept = _task("a")
+    store = {"a": kept, "b": _task("b"), "c": _task("c")}
+
+    diff = apply_diff(store, [_task("a"), _task("b", minutes=20), _task("d")])
+
+    assert diff.to_dict() == {"added": ["d"], "changed": ["b"], "removed": ["c"]}
+    assert list(store) == ["a", "b", "d"]
+    assert store["a"] is kept
+    assert {t.id for t in diff.touched} == {"b", "c", "d"}
+
+
+def test_apply_diff_unchanged_is_empty() -> None:
+    store = {"a": _task("a")}
+    diff = apply_diff(store, [_task("a")])
+    assert not diff
+    assert diff.counts() == {"added": 0, "changed": 0, "removed": 0}
+
+
+DAYS = (date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 3))
+
+
+def test_block_diff_invalidates_only_touched_days() -> None:
+    BLOCKS.update({"x": _block("x", 1), "y": _block("y", 2)})
+    for day in DAYS:
+        schedule.store_busy_map(day)
+
+    diff = apply_diff(BLOCKS, [_block("x", 1), _block("y", 2, hour=5)])
+    changes.publish("blocks", days=schedule.span_days(diff.touched))
+
+    assert diff.changed == ("y",)
+    assert set(schedule._DAY_MAPS) == {date(2025, 1, 1), date(2025, 1, 3)}
+    assert schedule.store_busy_map(date(2025, 1, 2))[5 * 6] is True
+
+
+def test_recurring_block_invalidates_every_day() -> None:
+    for day in DAYS:
+        schedule.store_busy_map(day)
+
+    assert schedule.span_days([_block("x", 1), _block("r", 5, rrule="FREQ=DAILY")]) is None
+    changes.publish("blocks", days=None)
+    assert not schedule._DAY_MAPS
+
+
+def test_event_change_invalidates_old_and_new_day() -> None:
+    from schedule_app.api.calendar import EVENTS, remember_events
+
+    start = datetime(2025, 1, 1, 1, tzinfo=timezone.utc)
+    EVENTS.clear()
+    remember_events([Event(id="e", start_utc=start, end_utc=start + timedelta(hours=1), title="x")])
+    for day in DAYS:
+        schedule.store_busy_map(day)
+
+    moved = start + timedelta(days=1)
+    remember_events([Event(id="e", start_utc=moved, end_utc=moved + timedelta(hours=1), title="x")])
+    EVENTS.clear()
+
+    assert set(schedule._DAY_MAPS) == {date(2025, 1, 3)}
+
+
+def test_publish_drops_busy_maps() -> None:
+    schedule.store_busy_map(date(2025, 1, 1))
+    BLOCKS["x"] = _block("x", 1)
+
+    changes.publish("tasks")
+    assert schedule.store_busy_map(date(2025, 1, 1))[6] is False
+    changes.publish("blocks")
+    assert schedule.store_busy_map(date(2025, 1, 1))[6] is True
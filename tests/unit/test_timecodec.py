@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from schedule_app.utils import timecodec
+from schedule_app.utils.timecodec import format_utc, get_zone, localize, parse_date, parse_utc, to_utc
+
+UTC = timezone.utc
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("2025-01-01T09:00:00Z", datetime(2025, 1, 1, 9, tzinfo=UTC)),
+        ("2025-01-01T09:00:00+00:00", datetime(2025, 1, 1, 9, tzinfo=UTC)),
+        ("2025-01-01T09:00:00+09:00", datetime(2025, 1, 1, 0, tzinfo=UTC)),
+        ("2025-01-01T09:00:00.250Z", datetime(2025, 1, 1, 9, 0, 0, 250000, tzinfo=UTC)),
+        ("2025-01-01T09:00:00", datetime(2025, 1, 1, 9, tzinfo=UTC)),
+        ("2025-01-01", datetime(2025, 1, 1, tzinfo=UTC)),
+    ],
+)
+def test_parse_utc(raw: str, expected: datetime) -> None:
+    value = parse_utc(raw)
+    assert value == expected
+    assert value.tzinfo is UTC
+
+
+@pytest.mark.parametrize("raw", ["bad", "2025-13-01T00:00:00Z", "2025-01-01T00:00:00+09:00Z"])
+def test_parse_utc_rejects_invalid(raw: str) -> None:
+    with pytest.raises(ValueError):
+        parse_utc(raw)
+
+
+def test_parse_utc_empty_and_memoized() -> None:
+    assert parse_utc(None) is None
+    assert parse_utc("") is None
+    assert parse_utc("2025-02-03T04:05:06Z") is parse_utc("2025-02-03T04:05:06Z")
+
+
+def test_naive_values_use_given_zone() -> None:
+    assert parse_utc("2025-01-01T09:00:00", zone="Asia/Tokyo") == datetime(2025, 1, 1, tzinfo=UTC)
+    # 夏時間の切り替えをまたいでも壁時計の時刻として解釈される
+    assert parse_utc("2025-07-01T09:00:00", zone="America/New_York").hour == 13
+
+
+def test_to_utc_calendar_objects() -> None:
+    assert to_utc({"dateTime": "2025-01-01T09:00:00", "timeZone": "Asia/Tokyo"}) == datetime(
+        2025, 1, 1, tzinfo=UTC
+    )
+    assert to_utc({"dateTime": "2025-01-01T09:00:00+09:00", "timeZone": "UTC"}) == datetime(
+        2025, 1, 1, tzinfo=UTC
+    )
+    assert to_utc({"date": "2025-01-02"}) == datetime(2025, 1, 2, tzinfo=UTC)
+    assert to_utc({}) == datetime.min.replace(tzinfo=UTC)
+
+
+def test_get_zone_is_cached() -> None:
+    assert get_zone("Asia/Tokyo") is get_zone("Asia/Tokyo")
+    with pytest.raises(KeyError):
+        get_zone("Not/AZone")
+
+
+def test_pytz_fallback_localizes(monkeypatch) -> None:
+    import pytz
+
+    monkeypatch.setattr(timecodec, "get_zone", lambda name: pytz.timezone(name))
+    timecodec._parse.cache_clear()
+    try:
+        # replace(tzinfo=) だと LMT (+09:19) になるが localize なら +09:00
+        assert parse_utc("2025-01-01T09:00:00", zone="Asia/Tokyo") == datetime(2025, 1, 1, tzinfo=UTC)
+    finally:
+        timecodec._parse.cache_clear()
+
+
+def test_localize_accepts_names_and_either_zone_kind() -> None:
+    import pytz
+
+    expected = datetime(2025, 1, 1, tzinfo=UTC)
+    naive = datetime(2025, 1, 1, 9)
+    assert localize(naive, "Asia/Tokyo") == expected
+    assert localize(naive, get_zone("Asia/Tokyo")) == expected
+    assert localize(naive, pytz.timezone("Asia/Tokyo")).utcoffset() == timedelta(hours=9)
+
+
+@pytest.mark.parametrize(
+    "value, timespec, expected",
+    [
+        (datetime(2025, 1, 1, 9, tzinfo=UTC), "auto", "2025-01-01T09:00:00Z"),
+        (datetime(2025, 1, 1, 9, 0, 0, 5, tzinfo=UTC), "auto", "2025-01-01T09:00:00.000005Z"),
+        (datetime(2025, 1, 1, 9, 0, 0, 5, tzinfo=UTC), "seconds", "2025-01-01T09:00:00Z"),
+        (datetime(2025, 1, 1, 18, tzinfo=timezone(timedelta(hours=9))), "seconds", "2025-01-01T09:00:00Z"),
+        (datetime(2025, 1, 1, 9), "seconds", "2025-01-01T09:00:00Z"),
+    ],
+)
+def test_format_utc(value: datetime, timespec: str, expected: str) -> None:
+    assert format_utc(value, timespec=timespec) == expected
+
+
+def test_parse_date() -> None:
+    assert parse_date("2025-01-02") == date(2025, 1, 2)
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from schedule_app.services import metrics, resilience, tracing
+
+
+class _Memory:
+    def __init__(self) -> None:
+        self.spans: list[tracing.Span] = []
+
+    def export(self, spans) -> None:
+        self.spans.extend(spans)
+
+
+@pytest.fixture()
+def exporter():
+    memory = _Memory()
+    tracer = tracing.configure(memory, sample_rate=1.0, interval=0.01)
+    yield memory
+    tracer.flush()
+    tracing.shutdown()
+
+
+def _by_name(spans) -> dict[str, tracing.Span]:
+    return {s.name: s for s in spans}
+
+
+def test_nested_spans_share_the_trace(exporter) -> None:
+    with tracing.span("root", kind="server") as root:
+        with tracing.span("child", rows=3) as child:
+            child.set_attribute("done", True)
+        assert tracing.current_span() is root
+    tracing._TRACER.flush()
+
+    spans = _by_name(exporter.spans)
+    assert spans["child"].trace_id == spans["root"].trace_id
+    assert spans["child"].parent_id == spans["root"].span_id
+    assert spans["root"].parent_id is None
+    assert spans["child"].attributes == {"rows": 3, "done": True}
+    assert spans["root"].end_ns >= spans["child"].end_ns >= spans["child"].start_ns
+
+
+def test_unsampled_trace_records_nothing(exporter) -> None:
+    tracing._TRACER.sample_rate = 0.0
+    with tracing.span("root") as root:
+        with tracing.span("child") as child:
+            pass
+    tracing._TRACER.flush()
+
+    assert not root.recording
+    assert child is tracing._NOOP
+    assert exporter.spans == []
+
+
+def test_traceparent_is_continued(exporter) -> None:
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    with tracing.span("root", traceparent=f"00-{trace_id}-00f067aa0ba902b7-01") as root:
+        assert root.traceparent().startswith(f"00-{trace_id}-{root.span_id}")
+    with tracing.span("off", traceparent=f"00-{trace_id}-00f067aa0ba902b7-00") as off:
+        pass
+    tracing._TRACER.flush()
+
+    assert [s.name for s in exporter.spans] == ["root"]
+    assert exporter.spans[0].trace_id == trace_id
+    assert exporter.spans[0].parent_id == "00f067aa0ba902b7"
+    assert not off.recording
+
+
+def test_disabled_tracing_returns_noop() -> None:
+    tracing.shutdown()
+    assert tracing.span("x") is tracing._NOOP
+    tracing.add_span("y", 0.0, 1.0)
+
+
+def test_add_span_converts_perf_counter(exporter) -> None:
+    with tracing.span("root"):
+        start = time.perf_counter()
+        end = start + 0.25
+        tracing.add_span("phase", start, end, step=1)
+    tracing._TRACER.flush()
+
+    phase = _by_name(exporter.spans)["phase"]
+    assert phase.end_ns - phase.start_ns == pytest.approx(250_000_000, abs=1000)
+    assert phase.attributes == {"step": 1}
+
+
+def test_async_children_keep_their_parent(exporter) -> None:
+    @tracing.traced("leaf")
+    async def leaf() -> int:
+        await asyncio.sleep(0)
+        return tracing.current_span().parent_id
+
+    async def main():
+        with tracing.span("root") as root:
+            parents = await asyncio.gather(leaf(), leaf())
+        return root, parents
+
+    root, parents = asyncio.run(main())
+
+    assert parents == [root.span_id, root.span_id]
+
+
+def test_google_calls_are_client_spans(exporter) -> None:
+    resilience.reset()
+    calls = iter([ConnectionResetError(), "ok"])
+
+    def fn():
+        item = next(calls)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    with tracing.span("root"):
+        assert resilience.call_google("test.trace", fn, sleep=lambda _d: None) == "ok"
+    tracing._TRACER.flush()
+
+    google = _by_name(exporter.spans)["google test.trace"]
+    assert google.kind == "client"
+    assert google.attributes == {"attempts": 2}
+    resilience.reset()
+
+
+def test_failed_span_keeps_error(exporter) -> None:
+    with pytest.raises(ValueError):
+        with tracing.span("boom"):
+            raise ValueError("bad row")
+    tracing._TRACER.flush()
+
+    assert exporter.spans[0].error == "ValueError: bad row"
+
+
+def test_jsonl_and_otlp_encodings(tmp_path) -> None:
+    path = tmp_path / "traces.jsonl"
+    tracer = tracing.configure(tracing.JsonlExporter(str(path)), interval=0.01)
+    with tracing.span("root", kind="server", route="/x"):
+        with tracing.span("child"):
+            pass
+    tracing.shutdown()
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert {r["name"] for r in records} == {"root", "child"}
+    assert all(r["duration_ms"] >= 0 for r in records)
+
+    root = tracing.Span(tracer, "root", trace_id="a" * 32, parent_id="b" * 16, kind="server", attributes={"n": 1, "ok": True})
+    root.end_ns = root.start_ns + 5
+    payload = tracing.OtlpExporter("http://collector/v1/traces").payload([root])
+    otlp = payload["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert otlp["kind"] == 2
+    assert otlp["parentSpanId"] == "b" * 16
+    assert otlp["attributes"] == [
+        {"key": "n", "value": {"intValue": "1"}},
+        {"key": "ok", "value": {"boolValue": True}},
+    ]
+
+
+def test_export_errors_are_counted() -> None:
+    class Broken:
+        def export(self, spans):
+            raise OSError("disk full")
+
+    tracer = tracing.configure(Broken(), interval=0.01)
+    with tracing.span("root"):
+        pass
+    assert tracer.flush()
+    tracing.shutdown()
+
+    assert metrics.REGISTRY.get("trace_export_error_total").value(error="OSError") >= 1
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+
+import pytest
+import pytz
+
+from schedule_app.api.calendar import EVENTS
+from schedule_app.models import Event
+from schedule_app.services import google_client, resilience, schedule, warmer as warmer_module
+from schedule_app.services.google_client import GoogleAPIUnauthorized, load_day_events
+from schedule_app.services.warmer import Warmer
+
+JST = pytz.timezone("Asia/Tokyo")
+SESSION = {"credentials": {"access_token": "tok"}}
+
+
+class FakeClient:
+    calls: list[datetime] = []
+    raise_exc: Exception | None = None
+
+    def __init__(self, _creds) -> None:
+        pass
+
+    def list_events(self, *, date: datetime) -> list[Event]:
+        type(self).calls.append(date)
+        if self.raise_exc:
+            raise self.raise_exc
+        start = date.astimezone(timezone.utc)
+        return [Event(id=f"e-{date.date()}", start_utc=start, end_utc=start, title="x")]
+
+
+def _clock(now: datetime):
+    return lambda tz: now.astimezone(tz)
+
+
+@pytest.fixture()
+def fake_google(monkeypatch):
+    FakeClient.calls = []
+    FakeClient.raise_exc = None
+    sheets: list[dict] = []
+    monkeypatch.setattr(warmer_module, "GoogleClient", FakeClient)
+    monkeypatch.setattr(
+        "schedule_app.services.sheets_tasks.fetch_tasks_and_blocks",
+        lambda session, force=False: sheets.append(session) or ([], []),
+    )
+    EVENTS.clear()
+    yield sheets
+    EVENTS.clear()
+
+
+def _warmer(now: datetime, **kw) -> Warmer:
+    return Warmer(times=[dt_time(6, 0), dt_time(21, 0)], clock=_clock(now), pause_sec=0, **kw)
+
+
+def test_next_run_picks_upcoming_time() -> None:
+    w = _warmer(JST.localize(datetime(2025, 1, 1, 7, 0)))
+    assert w.next_run() == JST.localize(datetime(2025, 1, 1, 21, 0))
+
+    w = _warmer(JST.localize(datetime(2025, 1, 1, 22, 0)))
+    assert w.next_run() == JST.localize(datetime(2025, 1, 2, 6, 0))
+
+
+def test_run_once_warms_calendar_sheets_and_busy_map(fake_google) -> None:
+    w = _warmer(JST.localize(datetime(2025, 1, 1, 6, 0)))
+    w.remember(SESSION)
+
+    result = w.run_once()
+
+    assert result["state"] == "warm"
+    assert {k: v["status"] for k, v in result["sources"].items()} == {
+        "calendar": "ok",
+        "sheets": "ok",
+        "busy_map": "ok",
+    }
+    assert [d.date() for d in FakeClient.calls] == [date(2025, 1, 1), date(2025, 1, 2)]
+    assert set(EVENTS) == {"e-2025-01-01", "e-2025-01-02"}
+    assert fake_google == [SESSION]
+    assert set(schedule._DAY_MAPS) == {date(2025, 1, 1), date(2025, 1, 2)}
+
+    # the first request of the day is served from the warmed cache
+    events = load_day_events(FakeClient(None), JST.localize(datetime(2025, 1, 1)), token="tok")
+    assert [e.id for e in events] == ["e-2025-01-01"]
+    assert len(FakeClient.calls) == 2
+
+
+def test_warmed_events_are_held_until_next_run(fake_google) -> None:
+    from freezegun import freeze_time
+
+    with freeze_time("2025-01-01T06:00:00+09:00") as frozen:
+        w = _warmer(JST.localize(datetime(2025, 1, 1, 6, 0)))
+        w.remember(SESSION)
+        w.run_once()
+
+        # 60 秒の TTL を過ぎても、次の実行 (21:00) までは先読み分が返る
+        frozen.tick(delta=timedelta(hours=14))
+        client = FakeClient(None)
+        events = load_day_events(client, JST.localize(datetime(2025, 1, 1)), token="tok")
+        assert [e.id for e in events] == ["e-2025-01-01"]
+        assert google_client._EVENT_CACHE.stats()["stale_hits"] >= 1
+
+
+def test_run_once_skips_open_breaker(fake_google) -> None:
+    breaker = resilience.breaker_for("calendar.events")
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+    w = _warmer(JST.localize(datetime(2025, 1, 1, 6, 0)))
+    w.remember(SESSION)
+    result = w.run_once()
+
+    assert result["state"] == "partial"
+    assert result["sources"]["calendar"] == {
+        "status": "skipped",
+        "detail": "circuit open",
+        "at": result["sources"]["calendar"]["at"],
+    }
+    assert FakeClient.calls == []
+    assert result["sources"]["sheets"]["status"] == "ok"
+
+
+def test_run_once_reports_unauthorized(fake_google) -> None:
+    FakeClient.raise_exc = GoogleAPIUnauthorized()
+    w = _warmer(JST.localize(datetime(2025, 1, 1, 6, 0)))
+    w.remember(SESSION)
+
+    result = w.run_once()
+    assert result["sources"]["calendar"]["status"] == "unauthorized"
+
+
+def test_run_once_without_users_is_idle(fake_google) -> None:
+    w = _warmer(JST.localize(datetime(2025, 1, 1, 6, 0)))
+    assert w.run_once()["state"] == "idle"
+    assert FakeClient.calls == []
+
+
+def test_ready_endpoint_reports_warmer(monkeypatch) -> None:
+    from schedule_app import create_app
+
+    monkeypatch.setattr(warmer_module, "_WARMER", None)
+    client = create_app(testing=True).test_client()
+    assert client.get("/api/ready").get_json() == {"status": "ready", "warmer": {"enabled": False}}
+
+    monkeypatch.setenv("WARMER_ENABLED", "1")
+    app = create_app(testing=True)
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["credentials"] = {"access_token": "tok"}
+
+    data = client.get("/api/ready").get_json()
+    assert data["warmer"]["enabled"] is True
+    assert data["warmer"]["users"] == 1
+    assert app.extensions["warmer"] is warmer_module.get_warmer()
+    google_client.invalidate_events_cache()